@@ -1,7 +1,11 @@
-import pandas as pd
+import sys
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-from matplotlib.lines import Line2D
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "python"))
+from processed_store import ProcessedStore
+from reports import plot_phase_ewma
 
 def classify_fatigue_phase(slope, tol=5):
     if slope > tol:
@@ -12,23 +16,11 @@ def classify_fatigue_phase(slope, tol=5):
         return "stable"
 
 def main():
-    phase_colors = {
-        "accumulating": "red",
-        "stable": "gray",
-        "recovering": "green",
-    }
-
-    legend_elements = [
-        Line2D([0], [0], color="red", lw=2, label="Accumulating"),
-        Line2D([0], [0], color="gray", lw=2, label="Stable"),
-        Line2D([0], [0], color="green", lw=2, label="Recovering"),
-    ]
-    
-    
-    df = pd.read_csv("data/processed/training_lift_day_aggregates.csv")
-    df["date"] = pd.to_datetime(df["date"])
-
-    bench = df[df["exercise"].str.contains("bench press", na=False)].sort_values("date").sort_values("date")
+    bench = ProcessedStore().read(
+        "lift_day",
+        columns=["date", "ewma_stress"],
+        filters=[("exercise", "contains", "bench press")]
+    ).sort_values("date")
 
     bench["ewma_smooth"] = (
         bench["ewma_stress"]
@@ -49,21 +41,10 @@ def main():
 
     fig, ax1 = plt.subplots(figsize=(12,6))
 
-    # EWMA level
-    for i in range(1, len(bench)):
-        phase = bench.iloc[i]["fatigue_phase"]
-        color = phase_colors[phase]
-
-        ax1.plot(
-            bench["date"].iloc[i-1:i+1],
-            bench["ewma_smooth"].iloc[i-1:i+1],
-            color=color,
-            linewidth=1.5
-        )
-
+    # EWMA level, one polyline per phase run in a single collection
+    plot_phase_ewma(ax1, bench["date"], bench["ewma_smooth"], bench["fatigue_phase"])
 
     ax1.set_ylabel("Fatigue Level (EWMA)")
-    ax1.legend(handles=legend_elements, title="Fatigue Phase", loc="upper left")
 
     # Secondary axis for slope
     ax2 = ax1.twinx()
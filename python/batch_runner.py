@@ -0,0 +1,243 @@
+import hashlib
+import json
+import pickle
+import shutil
+import traceback
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from load_data import DATA_DIR
+from pipeline_dag import atomic_write, file_checksum, resolve_keys
+from quantile_sketch import merge_sketch_files
+from quantile_sketch import COHORT_MERGED_FILE
+from run_pipeline import COHORT_SKETCH_FILE, PROCESSED_DIR, build_pipeline_stages, write_feature_outputs
+
+RUNS_DIR = Path(__file__).resolve().parents[1] / "data" / "runs"
+EXPORT_UNIT = "export"
+SETUP_UNIT = "setup" # Building the stages and their keys, recorded as a unit so its failures are reported
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+class RunManifest:
+    """
+    Record of the completed (partition, stage) units of one batch run, kept in "<run_dir>/manifest.json".
+
+    A unit counts as complete only if its recorded key matches the current stage key and every file it
+    recorded still has the recorded checksum, so edited code or parameters, and truncated or tampered
+    checkpoints, are recomputed instead of trusted. The manifest is rewritten atomically after every unit.
+    """
+
+    def __init__(self, run_dir: Path):
+        self.run_dir = Path(run_dir)
+        self.path = self.run_dir / "manifest.json"
+
+        if self.path.exists():
+            with open(self.path) as f:
+                state = json.load(f)
+        else:
+            state = {"created_at": _now(), "units": {}, "failures": {}}
+
+        self.created_at = state["created_at"]
+        self.units: dict = state["units"]
+        self.failures: dict = state["failures"]
+
+    @staticmethod
+    def _unit(partition: str, stage: str) -> str:
+        return f"{partition}/{stage}"
+
+    def save(self) -> None:
+        state = {"created_at": self.created_at, "updated_at": _now(), "units": self.units, "failures": self.failures}
+        atomic_write(self.path, lambda f: json.dump(state, f, indent=2), mode="w")
+
+    def is_complete(self, partition: str, stage: str, key: str) -> bool:
+        entry = self.units.get(self._unit(partition, stage))
+        if entry is None or entry["key"] != key:
+            return False
+
+        for path, checksum in entry["files"].items():
+            path = Path(path)
+            if not path.exists() or file_checksum(path) != checksum:
+                return False
+
+        return True
+
+    def record(self, partition: str, stage: str, key: str, files: dict) -> None:
+        self.units[self._unit(partition, stage)] = {
+            "partition": partition,
+            "stage": stage,
+            "key": key,
+            "files": {str(path): checksum for path, checksum in files.items()},
+            "completed_at": _now(),
+        }
+        self.failures.pop(partition, None)
+        self.save()
+
+    def record_failure(self, partition: str, stage: str, error: BaseException) -> None:
+        self.failures[partition] = {
+            "stage": stage,
+            "error": "".join(traceback.format_exception_only(type(error), error)).strip(),
+            "failed_at": _now(),
+        }
+        self.save()
+
+def discover_partitions(pattern: str = "*.csv", raw_dir: Path = DATA_DIR) -> dict:
+    """
+    Treats every raw export (e.g. one per athlete) under "data/raw/" as one batch partition.
+
+    :param pattern: Glob pattern for raw exports
+    :param raw_dir: Raw data directory
+    :return: Returns a dict of partition name -> filename, sorted by name
+    :rtype: dict
+    """
+    return {path.stem: path.name for path in sorted(Path(raw_dir).glob(pattern))}
+
+def run_partition(manifest: RunManifest, partition: str, filename: str, out_dir: Path, verbose: bool = True, **stage_params) -> str:
+    """
+    Runs the feature pipeline for one partition, skipping units the manifest already holds.
+
+    Stage outputs are checkpointed as "<run_dir>/<partition>/<stage>.pkl". A checkpoint is only loaded when a
+    stage still to be run needs it, so resuming a run that failed late reads just the inputs of the failed stage.
+
+    :param manifest: Manifest of the run
+    :type manifest: RunManifest
+    :param partition: Partition name
+    :param filename: Raw export under "data/raw/"
+    :param out_dir: Directory for this partition's processed files
+    :param verbose: Print whether each unit was run or resumed
+    :param stage_params: Keyword arguments passed to build_pipeline_stages()
+    :return: Returns "resumed" if every unit was already complete, else "completed"
+    :rtype: str
+    """
+    checkpoint_dir = manifest.run_dir / partition
+    stages: dict = {}
+    keys: dict = {}
+    outputs: dict[str, Any] = {}
+    ran = False
+    current = SETUP_UNIT
+
+    def materialize(name: str) -> Any:
+        nonlocal ran, current
+        if name in outputs:
+            return outputs[name]
+
+        path = checkpoint_dir / f"{name}.pkl"
+        if manifest.is_complete(partition, name, keys[name]):
+            with open(path, "rb") as f:
+                outputs[name] = pickle.load(f)
+            return outputs[name]
+
+        stage = stages[name]
+        inputs = [materialize(d) for d in stage.inputs]
+        current = name
+        value = stage.func(*inputs, **stage.params)
+        checksum = atomic_write(path, lambda f: pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL))
+        manifest.record(partition, name, keys[name], {path: checksum})
+        if verbose:
+            print(f"[run]    {partition}/{name}")
+
+        ran = True
+        outputs[name] = value
+        return value
+
+    try:
+        # Inside the recorded block: a raw file removed after discovery fails here, while hashing sources
+        stages = {s.name: s for s in build_pipeline_stages(filename=filename, **stage_params)}
+        keys = resolve_keys(list(stages.values()))
+
+        for name in keys:
+            current = name
+            if not manifest.is_complete(partition, name, keys[name]):
+                materialize(name)
+            elif verbose:
+                print(f"[resume] {partition}/{name}")
+
+        current = EXPORT_UNIT
+        export_key = hashlib.sha256((str(Path(out_dir).resolve()) + "".join(keys.values())).encode()).hexdigest()
+        if not manifest.is_complete(partition, EXPORT_UNIT, export_key):
+            checksums = write_feature_outputs({name: materialize(name) for name in keys}, out_dir)
+            manifest.record(partition, EXPORT_UNIT, export_key, {Path(out_dir) / f: c for f, c in checksums.items()})
+            ran = True
+        elif verbose:
+            print(f"[resume] {partition}/{EXPORT_UNIT}")
+    except Exception as error:
+        manifest.record_failure(partition, current, error)
+        raise
+
+    return "completed" if ran else "resumed"
+
+def run_batch(
+    partitions: Optional[dict] = None,
+    run_id: str = "nightly",
+    restart: bool = False,
+    stop_on_error: bool = False,
+    out_dir: Path = PROCESSED_DIR,
+    runs_dir: Path = RUNS_DIR,
+    verbose: bool = True,
+    **stage_params
+) -> dict:
+    """
+    Runs the feature pipeline over many partitions with a checkpoint after every (partition, stage) unit.
+
+    Rerunning with the same `run_id` after a crash resumes from the last completed unit: finished partitions
+    are skipped and a partially finished one restarts at the stage that failed. A failing partition is
+    recorded in the manifest and, unless `stop_on_error`, the remaining partitions still run.
+
+    :param partitions: Dict of partition name -> raw filename, default=discover_partitions()
+    :param run_id: Name of the run; its checkpoints and manifest live in "data/runs/<run_id>/"
+    :param restart: Discard the run's existing checkpoints and start over
+    :param stop_on_error: Raise on the first failing partition instead of continuing
+    :param out_dir: Processed outputs are written to "<out_dir>/<partition>/"
+    :param runs_dir: Directory holding run checkpoints
+    :param verbose: Print progress per unit
+    :param stage_params: Keyword arguments passed to build_pipeline_stages()
+    :return: Returns a dict of partition name -> "completed", "resumed" or "failed"
+    :rtype: dict
+    """
+    partitions = discover_partitions() if partitions is None else partitions
+    run_dir = Path(runs_dir) / run_id
+
+    if restart and run_dir.exists():
+        shutil.rmtree(run_dir)
+
+    manifest = RunManifest(run_dir)
+    status = {}
+
+    for partition, filename in partitions.items():
+        try:
+            status[partition] = run_partition(
+                manifest, partition, filename, Path(out_dir) / partition, verbose=verbose, **stage_params
+            )
+        except Exception as error:
+            status[partition] = "failed"
+            print(f"[failed] {partition}/{manifest.failures[partition]['stage']}: {error}")
+            if stop_on_error:
+                raise
+
+    merge_cohort_sketches([p for p, s in status.items() if s != "failed"], out_dir)
+    return status
+
+def merge_cohort_sketches(partitions: list, out_dir: Path = PROCESSED_DIR):
+    """
+    Merges the per-partition cohort sketches into "<out_dir>/cohort_sketches_merged.json", so percentile lookups
+    cover every athlete without rereading any partition's feature rows. The merged cohort has its own file so a
+    plain `features` run, which writes its single-athlete "cohort_sketches.json" there, never replaces it.
+
+    :param partitions: Partition names whose sketches to merge
+    :param out_dir: Directory holding the "<partition>/" output directories
+    :return: Returns the merged CohortSketches, or None if no partition has sketches
+    """
+    paths = [Path(out_dir) / p / COHORT_SKETCH_FILE for p in partitions]
+    return merge_sketch_files([p for p in paths if p.exists()], Path(out_dir) / COHORT_MERGED_FILE)
+
+def failed_partitions(run_id: str = "nightly", runs_dir: Path = RUNS_DIR) -> dict:
+    """
+    Reads the failures recorded by the last attempt of a run.
+
+    :param run_id: Name of the run
+    :param runs_dir: Directory holding run checkpoints
+    :return: Returns a dict of partition name -> {"stage", "error", "failed_at"}
+    :rtype: dict
+    """
+    return RunManifest(Path(runs_dir) / run_id).failures
@@ -0,0 +1,133 @@
+import numpy as np
+
+def _noise_scale(y: np.ndarray) -> float:
+    """
+    Robust noise estimate from second differences, so trends in the EWMA do not inflate it.
+    """
+    if len(y) < 3:
+        return float(np.std(y))
+
+    d2 = np.diff(y, n=2)
+    sigma = np.median(np.abs(d2 - np.median(d2))) / 0.6745 / np.sqrt(6)
+    return float(sigma) if sigma > 0 else float(np.std(d2) / np.sqrt(6))
+
+def pelt_linear(y: np.ndarray, penalty: float, min_size: int = 3) -> np.ndarray:
+    """
+    Segments a series into piecewise-linear trends with PELT (pruned exact linear time).
+
+    Segment cost is the residual sum of squares of a least squares line, evaluated in O(1) from cumulative
+    sums. Candidates whose cost can no longer lead to an optimal split are pruned (min_size steps after they are
+    dominated, as in min-segment-length PELT), so the result equals exhaustive optimal partitioning while the work
+    stays close to linear in the series length; each step evaluates all surviving candidates as one array operation.
+
+    :param y: Series to segment
+    :type y: np.ndarray
+    :param penalty: Cost added per segment
+    :param min_size: Minimum segment length
+    :return: Returns the sorted segment end offsets (exclusive), the last one equal to len(y)
+    :rtype: np.ndarray
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= min_size:
+        return np.array([n])
+
+    x = np.arange(n, dtype=float)
+    zero = np.zeros(1)
+    cx = np.concatenate((zero, np.cumsum(x)))
+    cxx = np.concatenate((zero, np.cumsum(x * x)))
+    cy = np.concatenate((zero, np.cumsum(y)))
+    cyy = np.concatenate((zero, np.cumsum(y * y)))
+    cxy = np.concatenate((zero, np.cumsum(x * y)))
+
+    def cost(s: np.ndarray, t: int) -> np.ndarray:
+        m = t - s
+        sx, sy = cx[t] - cx[s], cy[t] - cy[s]
+        var_x = (cxx[t] - cxx[s]) - sx * sx / m
+        cov = (cxy[t] - cxy[s]) - sx * sy / m
+        var_y = (cyy[t] - cyy[s]) - sy * sy / m
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fit = np.where(var_x > 0, cov * cov / var_x, 0.0)
+        return np.maximum(var_y - fit, 0.0)
+
+    best = np.full(n + 1, np.inf)
+    best[0] = -penalty
+    last = np.zeros(n + 1, dtype=np.int64)
+    candidates = np.array([0], dtype=np.int64)
+    # Step from which each candidate is pruned. A candidate dominated by t at step t is only dominated for ends
+    # T >= t + min_size, where t itself can be a split point, so its removal is delayed until then.
+    drop_at = np.array([n + 1], dtype=np.int64)
+
+    for t in range(min_size, n + 1):
+        alive = drop_at > t
+        candidates, drop_at = candidates[alive], drop_at[alive]
+
+        evaluated = t - candidates >= min_size
+        eligible = candidates[evaluated]
+        if len(eligible):
+            total = best[eligible] + cost(eligible, t)
+            i = np.argmin(total)
+            best[t] = total[i] + penalty
+            last[t] = eligible[i]
+
+            # Candidates that cannot beat t as a split point for any end t can reach
+            dominated = np.flatnonzero(evaluated)[total > best[t]]
+            drop_at[dominated] = np.minimum(drop_at[dominated], t + min_size)
+
+        if t + min_size <= n and np.isfinite(best[t]):
+            candidates = np.append(candidates, t)
+            drop_at = np.append(drop_at, n + 1)
+
+    ends = []
+    t = n
+    while t > 0:
+        ends.append(t)
+        t = last[t]
+
+    return np.array(ends[::-1])
+
+def segment_trends(values: np.ndarray, group_starts: np.ndarray, penalty: float = 3.0, min_size: int = 3) -> dict:
+    """
+    Runs PELT on every group of a stacked series and describes each row's segment.
+
+    The penalty is `penalty * sigma^2 * log(n)` with sigma a robust noise estimate per group, which makes
+    segmentation independent of the lift's stress scale.
+
+    :param values: Series values (e.g. ewma_stress), sorted by group then date
+    :type values: np.ndarray
+    :param group_starts: Row offsets at which each group starts
+    :type group_starts: np.ndarray
+    :param penalty: Penalty multiplier (BIC-like)
+    :param min_size: Minimum segment length in sessions
+    :return: Returns per-row arrays: `segment` (global segment id), `delta` (fitted change across the segment)
+        and `scale` (standard deviation of the row's group)
+    :rtype: dict
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    bounds = np.append(group_starts, n)
+
+    segment = np.empty(n, dtype=np.int64)
+    delta = np.empty(n)
+    scale = np.empty(n)
+    next_id = 0
+
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        y = values[start:stop]
+        y = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+        m = len(y)
+
+        sigma = _noise_scale(y)
+        ends = pelt_linear(y, penalty * max(sigma, 1e-12) ** 2 * np.log(max(m, 2)), min_size)
+        seg_starts = np.concatenate(([0], ends[:-1]))
+
+        for s, e in zip(seg_starts, ends):
+            x = np.arange(e - s)
+            slope = np.polyfit(x, y[s:e], 1)[0] if e - s > 1 else 0.0
+            segment[start + s:start + e] = next_id
+            delta[start + s:start + e] = slope * (e - s - 1)
+            next_id += 1
+
+        scale[start:stop] = np.std(y)
+
+    return {"segment": segment, "delta": delta, "scale": scale}
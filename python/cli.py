@@ -0,0 +1,204 @@
+"""
+Unified command line entry point: fitness-analytics features|batch|ingest|forecast|reports|train|load-db|db-features|startup
+
+Run as `python python/cli.py <command>` from the repository root. Each command imports only what it
+needs, so the feature rebuild never pays for matplotlib, sklearn or psycopg2.
+"""
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PYTHON_DIR = Path(__file__).resolve().parent
+
+# Cold start budget for `features`, measured from interpreter launch to the pipeline modules being importable
+FEATURE_STARTUP_BUDGET_S = 2.0
+HEAVY_MODULES = ("matplotlib", "sklearn", "psycopg2", "scipy")
+
+def cmd_features(args: argparse.Namespace) -> None:
+    from run_pipeline import build_features
+
+    build_features(use_cache=not args.no_cache, snapshot=not args.no_snapshot)
+
+def cmd_batch(args: argparse.Namespace) -> None:
+    from batch_runner import discover_partitions, run_batch
+
+    partitions = discover_partitions(args.pattern)
+    status = run_batch(partitions, run_id=args.run_id, restart=args.restart, stop_on_error=args.stop_on_error)
+
+    for partition, state in status.items():
+        print(f"{partition}: {state}")
+    if "failed" in status.values():
+        sys.exit(1)
+
+def cmd_ingest(args: argparse.Namespace) -> None:
+    from ingest import SetFingerprintIndex, ingest_directory
+
+    kwargs = {"pattern": args.pattern, "max_workers": args.workers}
+    if args.raw_dir is not None:
+        kwargs["raw_dir"] = Path(args.raw_dir)
+
+    new_sets = ingest_directory(**kwargs)
+    print(f"Ingested {len(new_sets)} new sets ({len(SetFingerprintIndex())} sets indexed)")
+
+def cmd_forecast(args: argparse.Namespace) -> None:
+    from models.ewma_forecast import main as forecast_main
+
+    forecast_main(plot=args.plot)
+
+def cmd_reports(args: argparse.Namespace) -> None:
+    from reports import render_reports
+
+    processed_dirs = None
+    if args.batch:
+        from batch_runner import discover_partitions
+        from run_pipeline import PROCESSED_DIR
+
+        processed_dirs = {p: PROCESSED_DIR / p for p in discover_partitions(args.pattern) if (PROCESSED_DIR / p).is_dir()}
+
+    kwargs = {"exercises": args.exercise, "max_workers": args.workers, "dpi": args.dpi}
+    if args.out_dir is not None:
+        kwargs["out_dir"] = Path(args.out_dir)
+
+    written = render_reports(processed_dirs, **kwargs)
+    print(f"Rendered {sum(len(paths) for paths in written.values())} figures for {len(written)} lifts")
+
+def cmd_train(args: argparse.Namespace) -> None:
+    import pandas as pd
+    from run_pipeline import PROCESSED_DIR, processed_feature_version, train_models
+
+    if args.version is not None or args.as_of is not None:
+        from feature_store import FeatureStore
+
+        store = FeatureStore()
+        version = store.resolve(args.version, args.as_of)
+        print(f"Training on feature version {version}")
+        lift_day = store.read("lift_day", version=version)
+    else:
+        version = processed_feature_version()
+        lift_day = pd.read_csv(
+            PROCESSED_DIR / "training_lift_day_aggregates.csv",
+            parse_dates=["date"]
+        )
+    train_models(lift_day, feature_version=version)
+
+def cmd_load_db(args: argparse.Namespace) -> None:
+    from db import load_lift_day
+
+    kwargs = {"truncate": not args.append}
+    if args.path is not None:
+        kwargs["path"] = Path(args.path)
+
+    rows = load_lift_day(**kwargs)
+    print(f"Loaded {rows} rows into analytics.training_lift_day")
+
+def cmd_db_features(args: argparse.Namespace) -> None:
+    from db import load_training_sets, refresh_lift_day_features
+
+    if not args.skip_load:
+        print(f"Loaded {load_training_sets()} rows into analytics.training_sets")
+
+    rows = refresh_lift_day_features(exit_tol=args.exit_tol)
+    print(f"Computed {rows} lift-day rows in analytics.training_lift_day")
+
+def measure_feature_startup() -> tuple[float, list]:
+    """
+    Times a fresh interpreter importing the feature path and reports any heavy modules it pulled in.
+
+    :return: Returns (seconds, heavy modules loaded)
+    :rtype: tuple[float, list]
+    """
+    probe = (
+        "import sys; import run_pipeline; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=PYTHON_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    elapsed = time.perf_counter() - start
+
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return elapsed, loaded
+
+def cmd_startup(args: argparse.Namespace) -> None:
+    elapsed, loaded = measure_feature_startup()
+
+    print(f"Feature path cold start: {elapsed:.2f}s (budget {args.budget:.2f}s)")
+    if loaded:
+        print(f"Heavy modules imported eagerly: {', '.join(loaded)}")
+
+    if elapsed > args.budget or loaded:
+        sys.exit(1)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="fitness-analytics")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    features = sub.add_parser("features", help="Rebuild processed feature outputs")
+    features.add_argument("--no-cache", action="store_true", help="Ignore cached stage outputs")
+    features.add_argument("--no-snapshot", action="store_true", help="Do not commit a feature store version")
+    features.set_defaults(func=cmd_features)
+
+    batch = sub.add_parser("batch", help="Rebuild features for every raw export, resuming an interrupted run")
+    batch.add_argument("--run-id", default="nightly", help="Run name; rerun with the same name to resume")
+    batch.add_argument("--pattern", default="*.csv", help="Glob pattern for raw exports under data/raw/")
+    batch.add_argument("--restart", action="store_true", help="Discard checkpoints and start the run over")
+    batch.add_argument("--stop-on-error", action="store_true", help="Stop at the first failing partition")
+    batch.set_defaults(func=cmd_batch)
+
+    ingest = sub.add_parser("ingest", help="Ingest a directory of exports, keeping only sets not seen before")
+    ingest.add_argument("--raw-dir", default=None, help="Directory of exports, default=data/raw/")
+    ingest.add_argument("--pattern", default="*.csv", help="Glob pattern for exports")
+    ingest.add_argument("--workers", type=int, default=None, help="Worker processes, default=CPU count")
+    ingest.set_defaults(func=cmd_ingest)
+
+    forecast = sub.add_parser("forecast", help="Run bench press fatigue forecast scenarios")
+    forecast.add_argument("--plot", action="store_true", help="Show the forecast figure")
+    forecast.set_defaults(func=cmd_forecast)
+
+    reports = sub.add_parser("reports", help="Render per-lift report figures to data/reports/ without a display")
+    reports.add_argument("--batch", action="store_true", help="Render every batch partition under data/processed/<export>/")
+    reports.add_argument("--pattern", default="*.csv", help="Glob pattern for raw exports, with --batch")
+    reports.add_argument("--exercise", action="append", default=None, help="Only render this exercise (repeatable)")
+    reports.add_argument("--workers", type=int, default=None, help="Worker processes, default=CPU count")
+    reports.add_argument("--dpi", type=int, default=100)
+    reports.add_argument("--out-dir", default=None, help="Output directory, default=data/reports/")
+    reports.set_defaults(func=cmd_reports)
+
+    train = sub.add_parser("train", help="Train the performance model on processed features")
+    train.add_argument("--version", type=int, default=None, help="Train on this feature store version")
+    train.add_argument("--as-of", default=None, help="Train on the feature version current at this time, e.g. 2026-06-01")
+    train.set_defaults(func=cmd_train)
+
+    load_db = sub.add_parser("load-db", help="Load lift-day aggregates into Postgres")
+    load_db.add_argument("--path", default=None, help="Lift-day CSV, default=data/processed/training_lift_day_aggregates.csv")
+    load_db.add_argument("--append", action="store_true", help="Append instead of truncating the table first")
+    load_db.set_defaults(func=cmd_load_db)
+
+    db_features = sub.add_parser("db-features", help="Compute lift-day features inside Postgres from set-level data")
+    db_features.add_argument("--skip-load", action="store_true", help="Use the sets already in analytics.training_sets")
+    db_features.add_argument("--exit-tol", type=float, default=None, help="Phase hysteresis exit tolerance")
+    db_features.set_defaults(func=cmd_db_features)
+
+    startup = sub.add_parser("startup", help="Measure feature path cold start against its budget")
+    startup.add_argument("--budget", type=float, default=FEATURE_STARTUP_BUDGET_S)
+    startup.set_defaults(func=cmd_startup)
+
+    return parser
+
+def main(argv=None) -> None:
+    if str(PYTHON_DIR) not in sys.path:
+        sys.path.insert(0, str(PYTHON_DIR))
+
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
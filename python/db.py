@@ -1,18 +1,44 @@
+import io
 import os
-import psycopg2
 import pandas as pd
-from dotenv import load_dotenv
+from pathlib import Path
 
-load_dotenv()
+PROCESSED_DIR = Path(__file__).resolve().parents[1] / "data" / "processed"
+
+LIFT_DAY_TABLE = "analytics.training_lift_day"
+LIFT_DAY_COLUMNS = [
+    "date", "exercise", "total_volume", "max_weight", "max_e1rm", "total_sets", "total_reps",
+    "mean_rpe", "rpe_coverage", "stress_volume", "stress_rpe", "stress",
+    "rolling_stress_7d", "rolling_stress_14d", "ewma_stress", "days_since_last_session",
+    "ewma_smooth", "ewma_slope", "ewma_slope_smooth", "fatigue_phase", "phase_group",
+    "phase_method", "sessions_in_phase", "ewma_slope_magnitude",
+]
+
+SETS_TABLE = "analytics.training_sets"
+# CSV column -> table column; "set" is renamed because it is a reserved word in SQL
+SETS_COLUMNS = {
+    "date": "date", "datetime": "datetime", "workout": "workout", "duration_min": "duration_min",
+    "exercise": "exercise", "set": "set_order", "weight": "weight", "reps": "reps", "rpe": "rpe",
+    "volume": "volume", "e1rm": "e1rm",
+}
+
+def connection_params() -> dict:
+    # dotenv is only needed once a connection is actually opened
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return {
+        "dbname": os.getenv("PGDATABASE"),
+        "user": os.getenv("PGUSER"),
+        "password": os.getenv("PGPASSWORD"),
+        "host": os.getenv("PGHOST"),
+        "port": os.getenv("PGPORT"),
+    }
 
 def get_connection():
-    return psycopg2.connect(
-        dbname=os.getenv("PGDATABASE"),
-        user=os.getenv("PGUSER"),
-        password=os.getenv("PGPASSWORD"),
-        host=os.getenv("PGHOST"),
-        port=os.getenv("PGPORT")
-    )
+    import psycopg2
+
+    return psycopg2.connect(**connection_params())
 
 def read_sql(query: str) -> pd.DataFrame:
     conn = get_connection()
@@ -20,7 +46,97 @@ def read_sql(query: str) -> pd.DataFrame:
     conn.close()
     return df
 
+def _copy_frame(df: pd.DataFrame, table: str, columns: list, truncate: bool) -> int:
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
+    conn = get_connection()
+    try:
+        with conn, conn.cursor() as cur:
+            if truncate:
+                cur.execute(f"TRUNCATE {table};")
+            cur.copy_expert(
+                f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+    finally:
+        conn.close()
+
+    return len(df)
+
+def load_lift_day(path: Path = PROCESSED_DIR / "training_lift_day_aggregates.csv", truncate: bool = True) -> int:
+    """
+    Bulk loads the processed lift-day aggregates into analytics.training_lift_day with COPY.
+
+    :param path: Path to the lift-day CSV written by run_pipeline
+    :type path: Path
+    :param truncate: Empty the table before loading
+    :return: Returns the number of rows loaded
+    :rtype: int
+    """
+    df = pd.read_csv(path, usecols=LIFT_DAY_COLUMNS)[LIFT_DAY_COLUMNS]
+    return _copy_frame(df, LIFT_DAY_TABLE, LIFT_DAY_COLUMNS, truncate)
+
+def load_training_sets(path: Path = PROCESSED_DIR / "training_sets_normalized.csv", truncate: bool = True) -> int:
+    """
+    Bulk loads normalized set-level data into analytics.training_sets with COPY, for the in-database feature engine.
+
+    :param path: Path to the normalized sets CSV written by run_pipeline
+    :type path: Path
+    :param truncate: Empty the table before loading
+    :return: Returns the number of rows loaded
+    :rtype: int
+    """
+    df = pd.read_csv(path, usecols=list(SETS_COLUMNS))[list(SETS_COLUMNS)]
+    return _copy_frame(df, SETS_TABLE, list(SETS_COLUMNS.values()), truncate)
+
+def _feature_args(ewma_span: int, phase_ewma_span: int, slope_smooth_span: int, tol: float, exit_tol: float | None) -> tuple:
+    return (ewma_span, phase_ewma_span, slope_smooth_span, float(tol), None if exit_tol is None else float(exit_tol))
+
+def read_lift_day_features(ewma_span: int = 7, phase_ewma_span: int = 14, slope_smooth_span: int = 7, tol: float = 5, exit_tol: float | None = None) -> pd.DataFrame:
+    """
+    Computes lift-day features inside Postgres (sql/07_feature_engine.sql) from analytics.training_sets.
+
+    Parameters match add_rolling_load() (`ewma_span`) and add_fatigue_phase() (the rest, method="slope").
+
+    :return: Returns the columns of training_lift_day_aggregates.csv, sorted by exercise and date
+    :rtype: DataFrame
+    """
+    conn = get_connection()
+    try:
+        df = pd.read_sql(
+            "SELECT * FROM analytics.lift_day_features(%s, %s, %s, %s, %s);",
+            conn,
+            params=_feature_args(ewma_span, phase_ewma_span, slope_smooth_span, tol, exit_tol),
+            parse_dates=["date"]
+        )
+    finally:
+        conn.close()
+
+    return df
+
+def refresh_lift_day_features(ewma_span: int = 7, phase_ewma_span: int = 14, slope_smooth_span: int = 7, tol: float = 5, exit_tol: float | None = None) -> int:
+    """
+    Rebuilds analytics.training_lift_day from analytics.training_sets without moving rows through Python.
+
+    :return: Returns the number of lift-day rows written
+    :rtype: int
+    """
+    conn = get_connection()
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT analytics.refresh_training_lift_day(%s, %s, %s, %s, %s);",
+                _feature_args(ewma_span, phase_ewma_span, slope_smooth_span, tol, exit_tol)
+            )
+            rows = cur.fetchone()[0]
+    finally:
+        conn.close()
+
+    return rows
+
 if __name__ == "__main__":
     query = "SELECT * FROM analytics.training_lift_day LIMIT 5;"
     df = read_sql(query)
-    print(df.head())
\ No newline at end of file
+    print(df.head())
@@ -0,0 +1,238 @@
+"""
+Asynchronous read path for the analytics database, for pages that fan out several queries at once.
+
+psycopg2 is blocking, so each query runs on a worker thread holding a pooled connection while the event loop
+waits on all of them together; page latency is then the slowest query rather than the sum.
+"""
+import asyncio
+import weakref
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from db import connection_params
+
+# Statement name -> (parameter types, SQL). Each pooled connection prepares a statement on first use, so
+# repeated page loads skip parsing and planning.
+PREPARED_QUERIES = {
+    "lift_day": (("text", "date", "date"), """
+        SELECT date, exercise, max_weight, max_e1rm, stress, ewma_stress, days_since_last_session,
+               ewma_slope_smooth, fatigue_phase, phase_group, sessions_in_phase
+        FROM analytics.training_lift_day
+        WHERE exercise = $1 AND date BETWEEN $2 AND $3
+        ORDER BY date
+    """),
+    "phases": (("text",), """
+        SELECT exercise, phase_group, fatigue_phase,
+               MIN(date) AS start_date, MAX(date) AS end_date, MAX(date) - MIN(date) + 1 AS calendar_days,
+               AVG(ewma_stress) AS mean_ewma, AVG(stress) AS mean_stress, COUNT(*) AS sessions
+        FROM analytics.training_lift_day
+        WHERE exercise = $1
+        GROUP BY exercise, phase_group, fatigue_phase
+        ORDER BY start_date
+    """),
+    "daily": (("date", "date"), """
+        SELECT date, SUM(stress) AS total_stress, AVG(ewma_stress) AS ewma_stress,
+               COUNT(DISTINCT exercise) AS num_lifts,
+               SUM(rolling_stress_7d) AS rolling_stress_7d, SUM(rolling_stress_14d) AS rolling_stress_14d
+        FROM analytics.training_lift_day
+        WHERE date BETWEEN $1 AND $2
+        GROUP BY date
+        ORDER BY date
+    """),
+    "latest_state": ((), """
+        SELECT DISTINCT ON (exercise) exercise, date, ewma_stress, ewma_slope_smooth, fatigue_phase, sessions_in_phase
+        FROM analytics.training_lift_day
+        ORDER BY exercise, date DESC
+    """),
+}
+
+# Postgres type OID -> numpy dtype for typed array results; other types stay object arrays
+PG_DTYPES = {
+    16: np.bool_,
+    20: np.int64, 21: np.int64, 23: np.int64,
+    700: np.float64, 701: np.float64, 1700: np.float64,
+    1082: "datetime64[D]",
+    1114: "datetime64[us]",
+}
+
+DEFAULT_MAX_CONNECTIONS = 8
+
+def _column_array(values: list, type_code: int) -> np.ndarray:
+    dtype = np.dtype(PG_DTYPES.get(type_code, object))
+
+    # NULLs have no integer or boolean representation, so such columns widen to float / object
+    if dtype.kind in "iu" and any(v is None for v in values):
+        dtype = np.dtype(np.float64)
+    elif dtype.kind == "b" and any(v is None for v in values):
+        dtype = np.dtype(object)
+
+    return np.array(values, dtype=dtype)
+
+def to_arrays(rows: list, description) -> dict:
+    """
+    Converts fetched rows to one typed numpy array per column.
+
+    :param rows: Rows from cursor.fetchall()
+    :param description: cursor.description
+    :return: Returns a dict of column name -> np.ndarray
+    :rtype: dict
+    """
+    columns = list(zip(*rows)) if rows else [()] * len(description)
+    return {col.name: _column_array(list(values), col.type_code) for col, values in zip(description, columns)}
+
+class AsyncAnalyticsDB:
+    """
+    Bounded connection pool with prepared statements and concurrent, time-limited queries.
+
+    At most `max_connections` queries run at once; further queries wait for a free connection. A query that
+    exceeds its timeout is cancelled on the server (and bounded by statement_timeout as a backstop), so its
+    connection returns to the pool instead of staying busy.
+
+    The pool keeps `min_connections` connections open between queries (default: all of them). psycopg2 closes
+    connections returned beyond that minimum, together with the statements they prepared, so a smaller minimum
+    re-connects and re-prepares under load.
+
+    Usage:
+        async with AsyncAnalyticsDB() as db:
+            page = await db.fetch_many({"lifts": ("lift_day", (exercise, start, end)), "daily": ("daily", (start, end))})
+    """
+
+    def __init__(self, max_connections: int = DEFAULT_MAX_CONNECTIONS, min_connections: Optional[int] = None):
+        self.max_connections = max_connections
+        self.min_connections = max_connections if min_connections is None else min_connections
+        self._pool = None
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="analytics-db")
+        self._slots = asyncio.Semaphore(max_connections)
+        # Connection -> names prepared on it; entries disappear with their connection, so a new connection that
+        # reuses a closed one's address never inherits its prepared statements
+        self._prepared: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    async def open(self) -> "AsyncAnalyticsDB":
+        from psycopg2.pool import ThreadedConnectionPool
+
+        if self._pool is None:
+            loop = asyncio.get_running_loop()
+            self._pool = await loop.run_in_executor(
+                self._executor,
+                lambda: ThreadedConnectionPool(self.min_connections, self.max_connections, **connection_params())
+            )
+        return self
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+            self._prepared.clear()
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> "AsyncAnalyticsDB":
+        return await self.open()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _execute(self, conn, name: str, params: tuple, timeout: Optional[float]) -> tuple[list, tuple]:
+        if name not in PREPARED_QUERIES:
+            raise KeyError(f"Unknown prepared query: {name}. Queries: {list(PREPARED_QUERIES)}")
+
+        # Read-only statements: autocommit avoids an open transaction holding the connection between queries
+        conn.autocommit = True
+        prepared = self._prepared.setdefault(conn, set())
+
+        with conn.cursor() as cur:
+            if name not in prepared:
+                types, sql = PREPARED_QUERIES[name]
+                signature = f" ({', '.join(types)})" if types else ""
+                cur.execute(f"PREPARE {name}{signature} AS {sql}")
+                prepared.add(name)
+
+            cur.execute("SET statement_timeout = %s", (int(timeout * 1000) if timeout else 0,))
+            placeholders = f" ({', '.join(['%s'] * len(params))})" if params else ""
+            cur.execute(f"EXECUTE {name}{placeholders}", tuple(params))
+
+            return cur.fetchall(), cur.description
+
+    async def fetch(self, name: str, params: tuple = (), timeout: Optional[float] = None, as_frame: bool = True):
+        """
+        Runs one prepared query.
+
+        :param name: Query name from PREPARED_QUERIES
+        :param params: Query parameters, in statement order
+        :param timeout: Seconds before the query is cancelled, default=None (no limit)
+        :param as_frame: Return a DataFrame, otherwise a dict of typed numpy arrays
+        :return: Returns the query result
+        :rtype: DataFrame | dict
+        :raises asyncio.TimeoutError: When the query exceeds `timeout`
+        """
+        if self._pool is None:
+            await self.open()
+
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            conn = await loop.run_in_executor(self._executor, self._pool.getconn)
+            try:
+                future = loop.run_in_executor(self._executor, self._execute, conn, name, params, timeout)
+                done, _ = await asyncio.wait({future}, timeout=timeout)
+
+                if not done:
+                    conn.cancel()
+                    await asyncio.gather(future, return_exceptions=True)
+                    raise asyncio.TimeoutError(f"Query {name} exceeded {timeout}s")
+
+                rows, description = future.result()
+            finally:
+                broken = conn.closed != 0
+                if broken:
+                    self._prepared.pop(conn, None)
+                self._pool.putconn(conn, close=broken)
+
+        arrays = to_arrays(rows, description)
+        return pd.DataFrame(arrays) if as_frame else arrays
+
+    async def fetch_many(self, requests: dict, timeout: Optional[float] = None, as_frame: bool = True) -> dict:
+        """
+        Runs several prepared queries concurrently.
+
+        A failed or timed-out query does not fail the others; its entry holds the exception instead.
+
+        :param requests: Dict of result key -> (query name, params)
+        :param timeout: Per-query timeout in seconds
+        :param as_frame: Return DataFrames, otherwise dicts of typed numpy arrays
+        :return: Returns a dict of result key -> result or exception
+        :rtype: dict
+        """
+        results = await asyncio.gather(
+            *(self.fetch(name, params, timeout=timeout, as_frame=as_frame) for name, params in requests.values()),
+            return_exceptions=True
+        )
+        return dict(zip(requests, results))
+
+    async def athlete_page(self, exercise: str, start, end, timeout: Optional[float] = 2.0) -> dict:
+        """
+        Fetches everything a lift dashboard page shows in one concurrent fan-out.
+
+        :param exercise: Normalized exercise name
+        :param start: Inclusive start date
+        :param end: Inclusive end date
+        :param timeout: Per-query timeout in seconds
+        :return: Returns a dict with "lift_day", "phases", "daily" and "latest_state" results
+        :rtype: dict
+        """
+        start, end = pd.Timestamp(start).date(), pd.Timestamp(end).date()
+        return await self.fetch_many({
+            "lift_day": ("lift_day", (exercise, start, end)),
+            "phases": ("phases", (exercise,)),
+            "daily": ("daily", (start, end)),
+            "latest_state": ("latest_state", ()),
+        }, timeout=timeout)
+
+def read_athlete_page(exercise: str, start, end, timeout: Optional[float] = 2.0, max_connections: int = 4) -> dict:
+    """
+    Synchronous entry point for athlete_page(), for scripts without an event loop.
+    """
+    async def run() -> dict:
+        async with AsyncAnalyticsDB(max_connections=max_connections) as db:
+            return await db.athlete_page(exercise, start, end, timeout=timeout)
+
+    return asyncio.run(run())
@@ -1,6 +1,7 @@
 # This file defines the v1 feature schema. Changes should be intentional and model-driven.
 import pandas as pd
 import numpy as np
+from changepoint import segment_trends
 
 def aggregate_lift_day(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -8,7 +9,7 @@ def aggregate_lift_day(df: pd.DataFrame) -> pd.DataFrame:
     
     :param df: The raw DataFrame loaded from load_training_data()
     :type df: pd.DataFrame
-    :return: Returns data grouped and sorted appropriately with sums for volume, weight maxes, total reps, mean rpe
+    :return: Returns data grouped and sorted appropriately with sums for volume, weight and e1RM maxes, total reps, mean rpe
     :rtype: DataFrame
     """
     agg = (
@@ -16,6 +17,7 @@ def aggregate_lift_day(df: pd.DataFrame) -> pd.DataFrame:
         .agg(
             total_volume=("volume", "sum"),
             max_weight=("weight", "max"),
+            max_e1rm=("e1rm", "max"),
             total_sets=("set", "count"),
             total_reps=("reps", "sum"),
             mean_rpe=("rpe", "mean"),
@@ -74,6 +76,47 @@ def add_rolling_load(df: pd.DataFrame, windows=(7, 14), ewma_span=7) -> pd.DataF
 
     return df
 
+def grouped_ewma(values: np.ndarray, alphas, group_starts: np.ndarray) -> np.ndarray:
+    """
+    Computes EWMA (adjust=False) of one or more stacked series for several smoothing factors at once.
+
+    The recursion is stepped by position within group, so every group and every row of the stack advances
+    together; the Python loop runs once per session of the longest group rather than once per row.
+    Leading NaNs in a group are skipped, matching pandas ewm(adjust=False).
+
+    :param values: Array of shape (n,) or (m, n), sorted by group then date
+    :type values: np.ndarray
+    :param alphas: Smoothing factor(s) 2 / (span + 1), scalar or shape (m,) / (k,) for 1-D values
+    :param group_starts: Row offsets at which each group starts, from group_offsets()
+    :type group_starts: np.ndarray
+    :return: Returns an array of shape (m, n), or (k, n) when 1-D values are smoothed with k alphas
+    :rtype: np.ndarray
+    """
+    alphas = np.atleast_1d(np.asarray(alphas, dtype=float))
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = np.broadcast_to(values, (len(alphas), len(values)))
+
+    m, n = values.shape
+    alphas = np.broadcast_to(alphas, (m,))[:, None]
+    out = np.empty((m, n))
+
+    sizes = np.diff(np.append(group_starts, n))
+    state = np.full((m, len(group_starts)), np.nan)
+
+    for step in range(int(sizes.max()) if n else 0):
+        active = np.flatnonzero(sizes > step)
+        rows = group_starts[active] + step
+
+        x = values[:, rows]
+        prev = state[:, active]
+        y = np.where(np.isnan(prev), x, np.where(np.isnan(x), prev, alphas * x + (1 - alphas) * prev))
+
+        state[:, active] = y
+        out[:, rows] = y
+
+    return out
+
 def add_time_since_last_session(df: pd.DataFrame) -> pd.DataFrame:
     """
     Adds a column for the length of time in days since the last time that exercise was performed.
@@ -95,29 +138,170 @@ def add_time_since_last_session(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
-def add_fatigue_phase(df: pd.DataFrame, ewma_span: int = 14, slope_smooth_span: int = 7, tol: float = 5) -> pd.DataFrame:
+PHASE_LABELS = np.array(["accumulating", "recovering", "stable"])
+PHASE_ACCUMULATING, PHASE_RECOVERING, PHASE_STABLE = 0, 1, 2
+
+def group_offsets(keys: np.ndarray) -> np.ndarray:
+    """
+    Finds the start offset of each contiguous block of equal keys.
+
+    :param keys: Group keys (e.g. exercise names), already sorted so each group is contiguous
+    :type keys: np.ndarray
+    :return: Returns the row offsets at which each group starts
+    :rtype: np.ndarray
+    """
+    keys = np.asarray(keys)
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    return np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+
+def _last_true_index(mask: np.ndarray, group_starts: np.ndarray) -> np.ndarray:
+    """
+    For each row, returns the index of the most recent row where mask is True within the same group, or -1.
+    """
+    n = len(mask)
+    idx = np.where(mask, np.arange(n), -1)
+    idx = np.maximum.accumulate(idx) if n else idx
+
+    row_group_start = np.repeat(group_starts, np.diff(np.append(group_starts, n)))
+    return np.where(idx >= row_group_start, idx, -1)
+
+def classify_phase_codes(slope: np.ndarray, group_starts: np.ndarray, tol: float = 5, exit_tol: float | None = None) -> np.ndarray:
     """
-    Classifies fatigue phase based on EWMA slope of EWMA stress.
+    Classifies smoothed EWMA slopes into integer phase codes (see PHASE_LABELS).
+
+    Without hysteresis a slope above `tol` is accumulating, below `-tol` is recovering, and anything else
+    (including NaN) is stable. With `exit_tol < tol`, a phase is entered once the slope crosses `tol` but is
+    only left once it falls back inside `exit_tol`, which stops the label flickering around the threshold.
+
+    :param slope: Smoothed slope values, sorted by group then date
+    :type slope: np.ndarray
+    :param group_starts: Row offsets at which each group starts, from group_offsets()
+    :type group_starts: np.ndarray
+    :param tol: Slope magnitude required to enter accumulating/recovering
+    :param exit_tol: Slope magnitude below which accumulating/recovering is left, default=tol (no hysteresis)
+    :return: Returns an int8 array of phase codes
+    :rtype: np.ndarray
+    """
+    slope = np.asarray(slope, dtype=float)
+
+    codes = np.full(len(slope), PHASE_STABLE, dtype=np.int8)
+    codes[slope > tol] = PHASE_ACCUMULATING
+    codes[slope < -tol] = PHASE_RECOVERING
+
+    if exit_tol is None or exit_tol >= tol:
+        return codes
+
+    # Inside a band the phase is held only if the row just before the band run had entered that phase
+    for band, entered, code in (
+        ((slope > exit_tol) & (slope <= tol), slope > tol, PHASE_ACCUMULATING),
+        ((slope < -exit_tol) & (slope >= -tol), slope < -tol, PHASE_RECOVERING),
+    ):
+        anchor = _last_true_index(~band, group_starts)
+        held = band & (anchor >= 0) & entered[np.maximum(anchor, 0)]
+        codes[held] = code
+
+    return codes
+
+def phase_runs(codes: np.ndarray, group_starts: np.ndarray) -> dict:
+    """
+    Labels the runs of consecutive equal phase codes within each group.
+
+    :param codes: Phase codes, sorted by group then date
+    :type codes: np.ndarray
+    :param group_starts: Row offsets at which each group starts, from group_offsets()
+    :type group_starts: np.ndarray
+    :return: Returns a dict of `phase_group` (1-based run id per group), `phase_transition` (first row of a run)
+        and `sessions_in_phase` (1-based position within the run) arrays
+    :rtype: dict
+    """
+    codes = np.asarray(codes)
+    n = len(codes)
+
+    transition = np.ones(n, dtype=bool)
+    if n:
+        transition[1:] = codes[1:] != codes[:-1]
+        transition[group_starts] = True
+
+    run_count = np.cumsum(transition)
+    sizes = np.diff(np.append(group_starts, n))
+    runs_before_group = np.repeat(run_count[group_starts] - 1, sizes) if n else run_count
+
+    run_start = np.maximum.accumulate(np.where(transition, np.arange(n), 0)) if n else run_count
+
+    return {
+        "phase_group": run_count - runs_before_group,
+        "phase_transition": transition,
+        "sessions_in_phase": np.arange(n) - run_start + 1,
+    }
+
+def fatigue_phase_engine(slope: np.ndarray, group_starts: np.ndarray, tol: float = 5, exit_tol: float | None = None) -> dict:
+    """
+    Computes phase codes, phase groups, transition flags and sessions in phase in one vectorized pass.
+
+    :param slope: Smoothed slope values, sorted by group then date
+    :type slope: np.ndarray
+    :param group_starts: Row offsets at which each group starts, from group_offsets()
+    :type group_starts: np.ndarray
+    :param tol: Tolerance for classifying stable phase
+    :param exit_tol: Optional hysteresis exit tolerance, see classify_phase_codes()
+    :return: Returns a dict of arrays: `phase_code` plus the outputs of phase_runs()
+    :rtype: dict
+    """
+    codes = classify_phase_codes(slope, group_starts, tol=tol, exit_tol=exit_tol)
+    return {"phase_code": codes, **phase_runs(codes, group_starts)}
+
+def _phase_codes_from_labels(labels: pd.Series) -> np.ndarray:
+    codes = pd.Categorical(labels, categories=PHASE_LABELS).codes
+    return np.where(codes < 0, PHASE_STABLE, codes).astype(np.int8)
+
+def changepoint_phase_codes(values: np.ndarray, group_starts: np.ndarray, penalty: float = 3.0, min_size: int = 3, stable_frac: float = 0.25) -> np.ndarray:
+    """
+    Classifies phases from a penalized change-point segmentation of each group's series.
+
+    Each PELT trend segment is accumulating or recovering when its fitted change exceeds `stable_frac` standard
+    deviations of the group's series, and stable otherwise, so the threshold scales with the lift.
+
+    :param values: Series to segment (e.g. ewma_stress), sorted by group then date
+    :type values: np.ndarray
+    :param group_starts: Row offsets at which each group starts, from group_offsets()
+    :type group_starts: np.ndarray
+    :param penalty: Penalty multiplier passed to segment_trends()
+    :param min_size: Minimum segment length in sessions
+    :param stable_frac: Fitted change, in standard deviations, below which a segment is stable
+    :return: Returns an int8 array of phase codes
+    :rtype: np.ndarray
+    """
+    segments = segment_trends(values, group_starts, penalty=penalty, min_size=min_size)
+    threshold = stable_frac * segments["scale"]
+
+    codes = np.full(len(values), PHASE_STABLE, dtype=np.int8)
+    codes[segments["delta"] > threshold] = PHASE_ACCUMULATING
+    codes[segments["delta"] < -threshold] = PHASE_RECOVERING
+    return codes
+
+def add_fatigue_phase(df: pd.DataFrame, ewma_span: int = 14, slope_smooth_span: int = 7, tol: float = 5, exit_tol: float | None = None, method: str = "slope", penalty: float = 3.0) -> pd.DataFrame:
+    """
+    Classifies fatigue phase based on EWMA slope of EWMA stress, or on change-point segments of EWMA stress.
     
     :param df: The DataFrame produced from add_rolling_load()
     :type df: pd.DataFrame
     :param ewma_span: Span for EWMA smoothing of stress levels
     :param slope_smooth_span: Span for EWMA smoothing of slope
     :param tol: Tolerance for classifying stable phase
-    :return: Returns the original DataFrame with an additional column classifying fatigue phase.
+    :param exit_tol: Optional hysteresis tolerance for leaving accumulating/recovering, default=None (same as tol)
+    :param method: "slope" (threshold the smoothed slope) or "changepoint" (PELT segments of ewma_stress).
+        Change-point labels are fitted on the whole history, so earlier sessions can be relabelled as it grows;
+        every row records its method in a `phase_method` column, and change-point rows are rejected by incremental
+        and backtesting consumers.
+    :param penalty: Change-point penalty multiplier, used when method="changepoint"
+    :return: Returns the original DataFrame with additional columns classifying fatigue phase and recording the method.
     :rtype: DataFrame
     """
     df = df.copy()
     df = df.sort_values(["exercise", "date"])
 
-    def classify_fatigue_phase(slope):
-        if slope > tol:
-            return "accumulating"
-        elif slope < -tol:
-            return "recovering"
-        else:
-            return "stable"
-
     df["ewma_smooth"] = (
         df
         .groupby("exercise")["ewma_stress"]
@@ -132,16 +316,42 @@ def add_fatigue_phase(df: pd.DataFrame, ewma_span: int = 14, slope_smooth_span:
         .transform(lambda x: x.ewm(span=slope_smooth_span, adjust=False).mean())
     )
 
-    df["fatigue_phase"] = df["ewma_slope_smooth"].apply(classify_fatigue_phase)
+    group_starts = group_offsets(df["exercise"].to_numpy())
 
-    # Identify phase transitions
-    df["phase_group"] = (
-        df.groupby("exercise")["fatigue_phase"]
-          .transform(lambda x: (x != x.shift()).cumsum())
-    )
+    if method == "slope":
+        codes = classify_phase_codes(df["ewma_slope_smooth"].to_numpy(), group_starts, tol=tol, exit_tol=exit_tol)
+    elif method == "changepoint":
+        codes = changepoint_phase_codes(df["ewma_stress"].to_numpy(), group_starts, penalty=penalty)
+    else:
+        raise ValueError(f"Unknown phase method: {method}")
+
+    df["fatigue_phase"] = PHASE_LABELS[codes]
+    df["phase_group"] = phase_runs(codes, group_starts)["phase_group"]
+    df["phase_method"] = method
 
     return df
 
+def require_causal_phases(df: pd.DataFrame, caller: str) -> None:
+    """
+    Rejects phase labels from method="changepoint", whose PELT segments are refitted on the whole history, for
+    consumers that assume labels of earlier sessions never change.
+
+    The method is read from the `phase_method` column written by add_fatigue_phase(), so it survives CSV files,
+    ProcessedStore reads and the database.
+
+    :raises ValueError: When df has no phase_method column, or any row was labelled with method="changepoint"
+    """
+    if "phase_method" not in df:
+        raise ValueError(
+            f"{caller} needs causal phase labels, but the frame has no phase_method column to tell how its phases "
+            f"were labelled. Rebuild the features with add_fatigue_phase()."
+        )
+    if df["phase_method"].eq("changepoint").any():
+        raise ValueError(
+            f"{caller} needs causal phase labels, but these come from method=\"changepoint\", which relabels "
+            f"earlier sessions as history grows. Label phases with method=\"slope\"."
+        )
+
 def add_phase_dynamics(df: pd.DataFrame) -> pd.DataFrame:
     """
     Adds phase depth and slope magnitude features.
@@ -153,39 +363,107 @@ def add_phase_dynamics(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     df = df.sort_values(["exercise", "date"])
     
-    df["sessions_in_phase"] = (
-        df.groupby(["exercise", "phase_group"])
-        .cumcount() + 1
+    runs = phase_runs(
+        _phase_codes_from_labels(df["fatigue_phase"]),
+        group_offsets(df["exercise"].to_numpy())
     )
+    df["sessions_in_phase"] = runs["sessions_in_phase"]
 
     # Rate of change w/o direction
     df["ewma_slope_magnitude"] = df["ewma_slope_smooth"].abs()
 
     return df
 
+def _run_sum(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    if len(starts) == 0:
+        return np.zeros(0)
+    return np.add.reduceat(values, starts)
+
 def aggregate_fatigue_phases(df: pd.DataFrame) -> pd.DataFrame:
     """
     Aggregate consecutive fatigue phases into duration-based summaries.
 
-    :param df: DataFrame with `fatigue_phase`, `ewma_stress`, and `stress`.
+    Phases are summarized straight from their run-length structure: each run of equal `phase_group`
+    within an exercise is a contiguous slice once sorted, so sums and counts come from np.add.reduceat
+    over the run start offsets rather than a keyed groupby.
+
+    :param df: DataFrame with `fatigue_phase`, `phase_group`, `ewma_stress`, and `stress`.
     :return: DataFrame summarizing fatigue phases.
     """
-    df = df.copy()
     df = df.sort_values(["exercise", "date"])
 
-    # Aggregate phase metrics
-    phase_summary = (
-        df.groupby(["exercise", "phase_group", "fatigue_phase"], as_index=False)
-          .agg(
-              start_date=("date", "min"),
-              end_date=("date", "max"),
-              calendar_days=("date", lambda x: (x.max() - x.min()).days + 1),
-              mean_ewma=("ewma_stress", "mean"),
-              mean_stress=("stress", "mean"),
-              sessions = ("date", "count")
-          )
+    exercise = df["exercise"].to_numpy()
+    phase_group = df["phase_group"].to_numpy()
+    dates = df["date"].to_numpy(dtype="datetime64[ns]")
+    n = len(df)
+
+    is_start = np.ones(n, dtype=bool)
+    if n:
+        is_start[1:] = (phase_group[1:] != phase_group[:-1]) | (exercise[1:] != exercise[:-1])
+    starts = np.flatnonzero(is_start)
+    ends = np.append(starts[1:], n) - 1
+    sessions = ends - starts + 1
+
+    start_date = dates[starts]
+    end_date = dates[ends]
+
+    return pd.DataFrame({
+        "exercise": exercise[starts],
+        "phase_group": phase_group[starts],
+        "fatigue_phase": df["fatigue_phase"].to_numpy()[starts],
+        "start_date": start_date,
+        "end_date": end_date,
+        "calendar_days": (end_date - start_date).astype("timedelta64[D]").astype(np.int64) + 1,
+        "mean_ewma": _run_sum(df["ewma_stress"].to_numpy(dtype=float), starts) / sessions,
+        "mean_stress": _run_sum(df["stress"].to_numpy(dtype=float), starts) / sessions,
+        "sessions": sessions,
+    })
+
+def update_fatigue_phase_summary(summary: pd.DataFrame, new_rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Incrementally folds newly labelled lift-day rows into an existing phase summary.
+
+    New rows that continue an exercise's current phase extend its last run; rows in a new phase_group close
+    it and open a new run. Because the EWMA features are causal, phase labels of earlier sessions do not
+    change when history grows, so only the tail needs to be summarized. This holds only for method="slope":
+    change-point labels can change retroactively, so rows labelled with method="changepoint" are rejected and
+    their summary must be rebuilt with aggregate_fatigue_phases().
+
+    :param summary: The DataFrame produced from aggregate_fatigue_phases()
+    :type summary: pd.DataFrame
+    :param new_rows: Lift-day rows dated after the summary, labelled on the extended history (add_fatigue_phase())
+    :type new_rows: pd.DataFrame
+    :return: Returns the updated phase summary
+    :rtype: DataFrame
+    """
+    require_causal_phases(new_rows, "update_fatigue_phase_summary()")
+    if new_rows.empty:
+        return summary
+
+    keys = ["exercise", "phase_group", "fatigue_phase"]
+    combined = pd.concat([summary, aggregate_fatigue_phases(new_rows)], ignore_index=True)
+
+    # Means are carried as sums so runs spanning both frames merge exactly
+    combined["ewma_sum"] = combined["mean_ewma"] * combined["sessions"]
+    combined["stress_sum"] = combined["mean_stress"] * combined["sessions"]
+
+    merged = (
+        combined
+        .groupby(keys, as_index=False, sort=True)
+        .agg(
+            start_date=("start_date", "min"),
+            end_date=("end_date", "max"),
+            ewma_sum=("ewma_sum", "sum"),
+            stress_sum=("stress_sum", "sum"),
+            sessions=("sessions", "sum"),
+        )
     )
-    return phase_summary
+
+    merged["calendar_days"] = (merged["end_date"] - merged["start_date"]).dt.days + 1
+    merged["mean_ewma"] = merged["ewma_sum"] / merged["sessions"]
+    merged["mean_stress"] = merged["stress_sum"] / merged["sessions"]
+
+    return merged[summary.columns]
 
 def aggregate_global_daily_fatigue(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -231,7 +509,12 @@ def add_phase_transition_flags(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     df = df.sort_values(["exercise", "date"])
     
-    df["phase_transition"] = df["fatigue_phase"] != df["fatigue_phase"].shift()
+    # Transitions are flagged per exercise so the first session of each lift starts a new phase
+    runs = phase_runs(
+        _phase_codes_from_labels(df["fatigue_phase"]),
+        group_offsets(df["exercise"].to_numpy())
+    )
+    df["phase_transition"] = runs["phase_transition"]
     return df
 
 def add_stress_deviation(df: pd.DataFrame) -> pd.DataFrame:
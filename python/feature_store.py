@@ -0,0 +1,238 @@
+"""
+Versioned snapshots of the processed feature tables, stored as deltas.
+
+Each table is split into partitions (per exercise, per group, or per month), and each partition is stored once
+as a content-addressed segment. A pipeline run commits a version manifest listing the segment of every
+partition; partitions whose content did not change point at the segment an earlier version already wrote, so a
+run only stores what changed. Any version, or the version current at a given time, is rebuilt by reading its
+segments back in order.
+
+Layout under "data/feature_store/":
+    versions/NNNNNN.json                  manifest per version
+    segments/<table>/<hash>.pkl           one partition's rows, shared by every version containing them
+"""
+import hashlib
+import json
+import pickle
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from pipeline_dag import atomic_write
+
+FEATURE_STORE_DIR = Path(__file__).resolve().parents[1] / "data" / "feature_store"
+
+# Table -> partition spec: a column name, or ("month", date column). Tables not listed are one partition.
+PARTITIONS = {
+    "sets": ("month", "date"),
+    "lift_day": "exercise",
+    "daily": ("month", "date"),
+    "phase_summary": "exercise",
+    "muscle_group_daily": "muscle_group",
+    "movement_pattern_daily": "movement_pattern",
+    "personal_records": ("month", "date"),
+}
+
+def _partition_keys(df: pd.DataFrame, spec) -> Optional[np.ndarray]:
+    if spec is None:
+        return None
+    if isinstance(spec, tuple):
+        _, col = spec
+        return np.datetime_as_string(pd.to_datetime(df[col]).to_numpy().astype("datetime64[M]"))
+    return df[spec].astype(str).to_numpy()
+
+def _split(df: pd.DataFrame, spec) -> list:
+    """
+    Splits a table into (key, rows) partitions in row order.
+
+    Partitions must be contiguous blocks so that concatenating them restores the table exactly; a table whose
+    key is interleaved (or has missing keys) is kept as a single partition.
+    """
+    keys = _partition_keys(df, spec)
+    if keys is None or len(df) == 0:
+        return [("all", df)]
+
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    if len(set(keys[starts])) != len(starts):
+        return [("all", df)]
+
+    ends = np.append(starts[1:], len(df))
+    return [(str(keys[s]), df.iloc[s:e]) for s, e in zip(starts, ends)]
+
+def segment_hash(df: pd.DataFrame) -> str:
+    """
+    Content hash of a partition: its columns, dtypes and row values.
+
+    :rtype: str
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps([list(map(str, df.columns)), list(map(str, df.dtypes))]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+@lru_cache(maxsize=1024)
+def _load_segment(path: str) -> pd.DataFrame:
+    # Segments are immutable once written, so repeated as-of reads share them
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+class FeatureStore:
+    """
+    Versioned feature snapshots with delta storage and as-of reads.
+
+    Usage:
+        store = FeatureStore()
+        version = store.commit({"lift_day": lift_day, "daily": daily})
+        lift_day = store.read("lift_day", as_of="2026-06-01")
+    """
+
+    def __init__(self, root: Path = FEATURE_STORE_DIR):
+        self.root = Path(root)
+        self.versions_dir = self.root / "versions"
+        self.segments_dir = self.root / "segments"
+
+    def _segment_path(self, table: str, digest: str) -> Path:
+        return self.segments_dir / table / f"{digest}.pkl"
+
+    def _manifest_path(self, version: int) -> Path:
+        return self.versions_dir / f"{version:06d}.json"
+
+    def version_ids(self) -> list:
+        return sorted(int(p.stem) for p in self.versions_dir.glob("*.json")) if self.versions_dir.exists() else []
+
+    def manifest(self, version: int) -> dict:
+        path = self._manifest_path(version)
+        if not path.exists():
+            raise KeyError(f"Unknown feature version: {version}. Versions: {self.version_ids()}")
+        with open(path) as f:
+            return json.load(f)
+
+    def commit(self, tables: dict, params: Optional[dict] = None, created_at=None) -> int:
+        """
+        Stores a snapshot of the given tables as a new version, writing only partitions not stored before.
+
+        :param tables: Dict of table name -> DataFrame
+        :param params: Optional JSON-serializable metadata kept in the manifest (e.g. pipeline parameters)
+        :param created_at: Snapshot time, default=now (UTC); as-of reads resolve against it
+        :return: Returns the new version id
+        :rtype: int
+        """
+        created_at = pd.Timestamp(created_at if created_at is not None else datetime.now(timezone.utc))
+        if created_at.tzinfo is None:
+            created_at = created_at.tz_localize("UTC")
+
+        written = reused = 0
+        entries = {}
+
+        for table, df in tables.items():
+            partitions = []
+            for key, rows in _split(df, PARTITIONS.get(table)):
+                digest = segment_hash(rows)
+                path = self._segment_path(table, digest)
+
+                if path.exists():
+                    reused += 1
+                else:
+                    part = rows.reset_index(drop=True)
+                    atomic_write(path, lambda f: pickle.dump(part, f, protocol=pickle.HIGHEST_PROTOCOL))
+                    written += 1
+
+                partitions.append([key, digest])
+
+            entries[table] = {
+                "rows": len(df),
+                "columns": list(map(str, df.columns)),
+                "partition_by": PARTITIONS.get(table),
+                "partitions": partitions,
+            }
+
+        ids = self.version_ids()
+        version = ids[-1] + 1 if ids else 1
+        manifest = {
+            "version": version,
+            "parent": ids[-1] if ids else None,
+            "created_at": created_at.isoformat(),
+            "params": params or {},
+            "segments_written": written,
+            "segments_reused": reused,
+            "tables": entries,
+        }
+        atomic_write(self._manifest_path(version), lambda f: json.dump(manifest, f, indent=2), mode="w")
+
+        return version
+
+    def versions(self) -> pd.DataFrame:
+        """
+        :return: Returns one row per version with its time and how many segments it wrote and reused
+        :rtype: DataFrame
+        """
+        rows = []
+        for version in self.version_ids():
+            m = self.manifest(version)
+            rows.append({
+                "version": version,
+                "created_at": pd.Timestamp(m["created_at"]),
+                "tables": len(m["tables"]),
+                "segments_written": m["segments_written"],
+                "segments_reused": m["segments_reused"],
+            })
+        return pd.DataFrame(rows, columns=["version", "created_at", "tables", "segments_written", "segments_reused"])
+
+    def resolve(self, version: Optional[int] = None, as_of=None) -> int:
+        """
+        Picks a version: `version` if given, else the latest version committed at or before `as_of`, else the latest.
+
+        :raises LookupError: When no version qualifies
+        """
+        if version is not None:
+            self.manifest(version)
+            return version
+
+        ids = self.version_ids()
+        if as_of is not None:
+            as_of = pd.Timestamp(as_of)
+            as_of = as_of.tz_localize("UTC") if as_of.tzinfo is None else as_of
+            ids = [v for v in ids if pd.Timestamp(self.manifest(v)["created_at"]) <= as_of]
+
+        if not ids:
+            raise LookupError(f"No feature version{f' as of {as_of}' if as_of is not None else ''} in {self.root}")
+        return ids[-1]
+
+    def read(self, table: str, version: Optional[int] = None, as_of=None, partitions: Optional[list] = None) -> pd.DataFrame:
+        """
+        Rebuilds a table as it was in one version.
+
+        :param table: Table name, e.g. "lift_day"
+        :param version: Version id, default=resolved from `as_of`, else the latest
+        :param as_of: Timestamp or date string; reads the latest version committed at or before it
+        :param partitions: Only read these partition keys (e.g. exercise names, or "YYYY-MM" months)
+        :return: Returns the table rows in their original order
+        :rtype: DataFrame
+        """
+        m = self.manifest(self.resolve(version, as_of))
+        if table not in m["tables"]:
+            raise KeyError(f"Table {table} not in feature version {m['version']}. Tables: {list(m['tables'])}")
+
+        entry = m["tables"][table]
+        wanted = None if partitions is None else set(map(str, partitions))
+        frames = [
+            _load_segment(str(self._segment_path(table, digest)))
+            for key, digest in entry["partitions"]
+            if wanted is None or key in wanted
+        ]
+
+        if not frames:
+            return pd.DataFrame(columns=entry["columns"])
+        return pd.concat(frames, ignore_index=True)
+
+    def changed_partitions(self, table: str, old: int, new: int) -> list:
+        """
+        :return: Returns the partition keys of `table` added or changed between two versions
+        :rtype: list
+        """
+        before = dict(self.manifest(old)["tables"].get(table, {}).get("partitions", []))
+        after = self.manifest(new)["tables"][table]["partitions"]
+        return [key for key, digest in after if before.get(key) != digest]
@@ -0,0 +1,170 @@
+"""
+Export importers: one plugin per logging app, each mapping that app's CSV export to the raw set schema.
+
+Every plugin declares its columns, their types and its datetime format, so parsing never infers anything:
+only the needed columns are read, as text, and numbers and datetimes are converted afterwards with one fixed
+rule each, so a malformed cell (e.g. "12.5kg") becomes NaN instead of failing the whole export. Numbers are
+converted once per distinct value. With pyarrow installed the file is parsed by Arrow's multithreaded CSV
+reader, otherwise by pandas' C parser with the same explicit schema.
+
+Raw set schema produced by every importer (normalized further by load_data.normalize_sets()):
+    datetime (datetime64), workout, exercise, set, weight, reps, rpe,
+    and either duration (text such as "1h 5m") or duration_min (float)
+"""
+import csv
+import pandas as pd
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+from load_data import map_unique
+
+@dataclass(frozen=True)
+class ExportImporter:
+    """
+    Description of one app's export format.
+
+    :param name: Plugin name, e.g. "strong"
+    :param columns: Source column -> raw schema column, for every column read
+    :param numeric: Source columns converted to float64, unparseable values becoming NaN (e.g. Strong's "W"
+        warm-up set order)
+    :param datetime_column: Source column holding the set timestamp
+    :param datetime_format: strptime format of datetime_column
+    :param transform: Optional app-specific fix-up applied to the renamed frame
+    """
+    name: str
+    columns: dict
+    numeric: tuple
+    datetime_column: str
+    datetime_format: str
+    transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = field(default=None, compare=False)
+
+    def matches(self, header: list) -> bool:
+        return set(self.columns) <= set(header)
+
+    def read(self, path: Path, engine: Optional[str] = None) -> pd.DataFrame:
+        """
+        Parses an export into the raw set schema.
+
+        :param path: Export csv
+        :param engine: "arrow" or "pandas", default=arrow when pyarrow is installed
+        :return: Returns the raw sets
+        :rtype: DataFrame
+        """
+        engine = engine or ("arrow" if _has_pyarrow() else "pandas")
+        df = self._read_arrow(path) if engine == "arrow" else self._read_pandas(path)
+
+        for col in self.numeric:
+            df[col] = map_unique(df[col], lambda s: pd.to_numeric(s, errors="coerce").astype(float))
+
+        df = df.rename(columns=self.columns)[list(self.columns.values())]
+        return self.transform(df) if self.transform is not None else df
+
+    def _read_pandas(self, path: Path) -> pd.DataFrame:
+        df = pd.read_csv(path, usecols=list(self.columns), dtype=str, engine="c")
+        df[self.datetime_column] = pd.to_datetime(df[self.datetime_column], format=self.datetime_format, errors="coerce")
+        return df
+
+    def _read_arrow(self, path: Path) -> pd.DataFrame:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        from pyarrow import csv as pa_csv
+
+        table = pa_csv.read_csv(
+            path,
+            convert_options=pa_csv.ConvertOptions(
+                column_types={col: pa.string() for col in self.columns},
+                include_columns=list(self.columns),
+                strings_can_be_null=True
+            )
+        )
+
+        # Parsed as text and converted here so one malformed timestamp becomes null instead of failing the file
+        i = table.schema.get_field_index(self.datetime_column)
+        stamps = pc.strptime(table.column(i), format=self.datetime_format, unit="us", error_is_null=True)
+        table = table.set_column(i, self.datetime_column, stamps)
+
+        return table.to_pandas()
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+IMPORTERS: dict = {}
+
+def register_importer(importer: ExportImporter) -> ExportImporter:
+    """
+    Adds an importer plugin; detect_importer() tries plugins in registration order.
+    """
+    IMPORTERS[importer.name] = importer
+    return importer
+
+def read_header(path: Path) -> list:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), [])
+
+def detect_importer(path: Path) -> ExportImporter:
+    """
+    Picks the importer whose columns the export's header contains.
+
+    :raises ValueError: When no plugin matches
+    """
+    header = read_header(path)
+    for importer in IMPORTERS.values():
+        if importer.matches(header):
+            return importer
+
+    raise ValueError(f"No importer matches the columns of {path}: {header}. Importers: {list(IMPORTERS)}")
+
+def get_importer(name: str) -> ExportImporter:
+    if name not in IMPORTERS:
+        raise KeyError(f"Unknown importer: {name}. Importers: {list(IMPORTERS)}")
+    return IMPORTERS[name]
+
+STRONG = register_importer(ExportImporter(
+    name="strong",
+    columns={
+        "Date": "datetime",
+        "Workout Name": "workout",
+        "Duration": "duration",
+        "Exercise Name": "exercise",
+        "Set Order": "set",
+        "Weight": "weight",
+        "Reps": "reps",
+        "RPE": "rpe",
+    },
+    numeric=("Set Order", "Weight", "Reps", "RPE"),
+    datetime_column="Date",
+    datetime_format="%Y-%m-%d %H:%M:%S",
+))
+
+def _hevy_transform(df: pd.DataFrame) -> pd.DataFrame:
+    # Hevy numbers every set from 0, warm-ups included, and flags warm-ups in set_type. Strong-style numbering
+    # leaves warm-ups unnumbered and counts working sets from 1 within each exercise of a workout.
+    working = df.pop("set_type").ne("warmup")
+    df["set"] = df["set"].where(working).groupby([df["datetime"], df["exercise"]]).rank(method="first")
+
+    end_time = pd.to_datetime(df.pop("end_time"), format="%d %b %Y, %H:%M", errors="coerce")
+    df["duration_min"] = (end_time - df["datetime"]).dt.total_seconds() / 60
+    return df
+
+HEVY = register_importer(ExportImporter(
+    name="hevy",
+    columns={
+        "start_time": "datetime",
+        "end_time": "end_time",
+        "title": "workout",
+        "exercise_title": "exercise",
+        "set_index": "set",
+        "set_type": "set_type",
+        "weight_kg": "weight",
+        "reps": "reps",
+        "rpe": "rpe",
+    },
+    numeric=("set_index", "weight_kg", "reps", "rpe"),
+    datetime_column="start_time",
+    datetime_format="%d %b %Y, %H:%M",
+    transform=_hevy_transform,
+))
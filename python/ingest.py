@@ -0,0 +1,180 @@
+"""
+Directory ingestion of overlapping exports, emitting each set once.
+
+Users re-upload full exports that repeat most earlier sets. Every normalized set is fingerprinted from
+(datetime, exercise, set, weight, reps) plus its occurrence among identical rows of the same export, and checked
+against a persistent index, so only sets never seen before go downstream, and files whose content was already
+ingested are not parsed again.
+
+Layout under "data/ingest/":
+    manifest.json        commit point: ingested file checksums, batch files and fingerprint count
+    fingerprints.npy     sorted uint64 fingerprints of every ingested set (a cache of the batch files)
+    batches/NNNNNN.csv   the new sets of each ingestion, with their fingerprint
+"""
+import json
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from load_data import DATA_DIR, read_training_export
+from pipeline_dag import atomic_write, file_checksum
+
+INGEST_DIR = Path(__file__).resolve().parents[1] / "data" / "ingest"
+FINGERPRINT_COLUMNS = ["datetime", "exercise", "set", "weight", "reps"]
+FINGERPRINT_VERSION = 2 # Bumped whenever set_fingerprints() changes; indexes of another version are not comparable
+
+def set_fingerprints(sets: pd.DataFrame) -> np.ndarray:
+    """
+    Hashes each normalized set row of one export to a 64-bit fingerprint.
+
+    Fingerprints are computed on normalized values (parsed datetimes, lower-cased exercise names, numeric
+    weights), so the same set hashes identically in every export it appears in. Distinct sets can share every
+    fingerprint column (e.g. left and right arm with the same set order, or several unnumbered "F" sets), so
+    the n-th repeat of a row within the export is hashed with ordinal n and each repeat stays a separate set.
+
+    :param sets: Sets of one export, from read_training_export()
+    :return: Returns one uint64 fingerprint per row
+    :rtype: np.ndarray
+    """
+    keyed = sets[FINGERPRINT_COLUMNS].assign(occurrence=sets.groupby(FINGERPRINT_COLUMNS, dropna=False, sort=False).cumcount())
+    return pd.util.hash_pandas_object(keyed, index=False).to_numpy(dtype=np.uint64)
+
+class SetFingerprintIndex:
+    """
+    Persistent record of every ingested set, kept as a sorted fingerprint array for vectorized lookups.
+
+    manifest.json is rewritten last on every commit, so an ingestion interrupted before it leaves the
+    previous state intact; a fingerprint cache that disagrees with the manifest is rebuilt from the batches.
+    """
+
+    def __init__(self, index_dir: Path = INGEST_DIR):
+        self.index_dir = Path(index_dir)
+        self.manifest_path = self.index_dir / "manifest.json"
+        self.fingerprints_path = self.index_dir / "fingerprints.npy"
+
+        if self.manifest_path.exists():
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"fingerprint_version": FINGERPRINT_VERSION, "files": {}, "batches": [], "fingerprints": 0}
+
+        version = self.manifest.get("fingerprint_version", 1)
+        if version != FINGERPRINT_VERSION:
+            raise ValueError(
+                f"Ingest index {self.index_dir} holds version {version} fingerprints, but this code computes version "
+                f"{FINGERPRINT_VERSION}. Remove the directory and re-ingest the exports to rebuild it."
+            )
+
+        self.fingerprints = self._load_fingerprints()
+
+    def _load_fingerprints(self) -> np.ndarray:
+        if self.fingerprints_path.exists():
+            fingerprints = np.load(self.fingerprints_path)
+            if len(fingerprints) == self.manifest["fingerprints"]:
+                return fingerprints
+
+        batches = [
+            pd.read_csv(self.index_dir / batch, usecols=["fingerprint"], dtype={"fingerprint": np.uint64})["fingerprint"].to_numpy()
+            for batch in self.manifest["batches"]
+        ]
+        return np.sort(np.concatenate(batches)) if batches else np.zeros(0, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    def contains(self, fingerprints: np.ndarray) -> np.ndarray:
+        """
+        :return: Returns a boolean mask of fingerprints already in the index
+        :rtype: np.ndarray
+        """
+        if len(self.fingerprints) == 0:
+            return np.zeros(len(fingerprints), dtype=bool)
+
+        pos = np.searchsorted(self.fingerprints, fingerprints)
+        return self.fingerprints[np.minimum(pos, len(self.fingerprints) - 1)] == fingerprints
+
+    def is_ingested(self, path: Path, checksum: str) -> bool:
+        return self.manifest["files"].get(Path(path).name) == checksum
+
+    def commit(self, new_sets: pd.DataFrame, files: dict) -> Optional[Path]:
+        """
+        Persists a batch of new sets and the files they came from.
+
+        :param new_sets: New sets with a `fingerprint` column
+        :param files: Dict of filename -> checksum of the files read in this ingestion
+        :return: Returns the batch file written, or None if there were no new sets
+        :rtype: Path | None
+        """
+        batch_path = None
+        if len(new_sets):
+            name = f"batches/{len(self.manifest['batches']):06d}.csv"
+            batch_path = self.index_dir / name
+            atomic_write(batch_path, lambda f: new_sets.to_csv(f, index=False), mode="w")
+
+            self.fingerprints = np.union1d(self.fingerprints, new_sets["fingerprint"].to_numpy(dtype=np.uint64))
+            atomic_write(self.fingerprints_path, lambda f: np.save(f, self.fingerprints))
+            self.manifest["batches"].append(name)
+
+        self.manifest["files"].update(files)
+        self.manifest["fingerprints"] = len(self.fingerprints)
+        self.manifest["updated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        atomic_write(self.manifest_path, lambda f: json.dump(self.manifest, f, indent=2), mode="w")
+
+        return batch_path
+
+    def ingested_sets(self) -> pd.DataFrame:
+        """
+        :return: Returns every set ingested so far, in ingestion order
+        :rtype: DataFrame
+        """
+        batches = [pd.read_csv(self.index_dir / b, parse_dates=["date", "datetime"]) for b in self.manifest["batches"]]
+        return pd.concat(batches, ignore_index=True) if batches else pd.DataFrame()
+
+def _read_fingerprinted(path: Path, e1rm_formula: str) -> pd.DataFrame:
+    sets = read_training_export(path, e1rm_formula=e1rm_formula)
+    sets["fingerprint"] = set_fingerprints(sets)
+    return sets
+
+def ingest_directory(
+    raw_dir: Path = DATA_DIR,
+    pattern: str = "*.csv",
+    index_dir: Path = INGEST_DIR,
+    max_workers: Optional[int] = None,
+    e1rm_formula: str = "epley"
+) -> pd.DataFrame:
+    """
+    Ingests every export in a directory and returns only sets the index has not seen.
+
+    Files already ingested with the same content are skipped without parsing; the rest are parsed in
+    parallel worker processes. Sets repeated across the new files, or already in the index, are dropped, and
+    the remaining sets are committed to the index as one batch.
+
+    :param raw_dir: Directory of raw exports
+    :param pattern: Glob pattern for exports
+    :param index_dir: Directory holding the fingerprint index
+    :param max_workers: Worker processes, default=CPU count
+    :param e1rm_formula: `e1rm_formula` passed to read_training_export()
+    :return: Returns the new sets, with a `fingerprint` column, sorted like load_training_data()
+    :rtype: DataFrame
+    """
+    index = SetFingerprintIndex(index_dir)
+
+    checksums = {path: file_checksum(path) for path in sorted(Path(raw_dir).glob(pattern))}
+    pending = [path for path, checksum in checksums.items() if not index.is_ingested(path, checksum)]
+
+    if len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            frames = list(pool.map(_read_fingerprinted, pending, [e1rm_formula] * len(pending)))
+    else:
+        frames = [_read_fingerprinted(path, e1rm_formula) for path in pending]
+
+    sets = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=FINGERPRINT_COLUMNS + ["fingerprint"])
+    sets = sets.drop_duplicates("fingerprint")
+    new_sets = sets[~index.contains(sets["fingerprint"].to_numpy(dtype=np.uint64))]
+    new_sets = new_sets.sort_values(["datetime", "exercise", "set"]).reset_index(drop=True)
+
+    index.commit(new_sets, {path.name: checksums[path] for path in pending})
+    return new_sets
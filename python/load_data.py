@@ -1,33 +1,108 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
 DATA_DIR = Path(__file__).resolve().parents[1] / "data" / "raw"
 
-def load_training_data(filename: str = "strong_workouts.csv") -> pd.DataFrame:
+def map_unique(values: pd.Series, func) -> pd.Series:
+    """
+    Applies a Series transform once per distinct value and broadcasts the result back to every row.
+
+    Exports repeat a few hundred exercise names, workout names and durations across every set, so string
+    parsing on the distinct values is far cheaper than on each row. Missing values stay missing.
+
+    :param values: Input column
+    :param func: Vectorized transform taking and returning a Series
+    :return: Returns func(values), aligned to values.index
+    :rtype: Series
+    """
+    codes, uniques = pd.factorize(values)
+    mapped = func(pd.Series(uniques, dtype=values.dtype))
+    return mapped.reindex(codes).set_axis(values.index)
+
+def parse_duration_minutes(duration: pd.Series) -> pd.Series:
+    """
+    Parses Strong workout durations such as "1h 23m", "54m" or "2h" into minutes.
+
+    :param duration: Raw Duration column
+    :type duration: pd.Series
+    :return: Returns workout duration in minutes (NaN when missing or unparseable)
+    :rtype: Series
+    """
+    parts = duration.astype("string").str.extract(r"^\s*(?:(\d+)h)?\s*(?:(\d+)m)?\s*$")
+    hours = pd.to_numeric(parts[0], errors="coerce")
+    minutes = pd.to_numeric(parts[1], errors="coerce")
+
+    total = hours.fillna(0) * 60 + minutes.fillna(0)
+    return total.where(hours.notna() | minutes.notna()).astype(float)
+
+def estimate_1rm(weight, reps, formula: str = "epley") -> np.ndarray:
+    """
+    Estimates one-rep max per set, so a heavy triple and a light single are comparable.
+
+    Singles are their own 1RM. Brzycki is undefined from 37 reps upward and returns NaN there.
+
+    :param weight: Set weights
+    :param reps: Set reps
+    :param formula: "epley" (w * (1 + r / 30)) or "brzycki" (w * 36 / (37 - r))
+    :return: Returns estimated 1RM per set
+    :rtype: np.ndarray
+    """
+    weight = np.asarray(weight, dtype=float)
+    reps = np.asarray(reps, dtype=float)
+
+    if formula == "epley":
+        e1rm = weight * (1 + reps / 30)
+    elif formula == "brzycki":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            e1rm = np.where(reps < 37, weight * 36 / (37 - reps), np.nan)
+    else:
+        raise ValueError(f"Unknown e1RM formula: {formula}")
+
+    return np.where(reps == 1, weight, e1rm)
+
+def load_training_data(filename: str = "strong_workouts.csv", e1rm_formula: str = "epley") -> pd.DataFrame:
     """
     Ingests the raw DataFrame exported from Strong exercise tracking app, and sorts it into appropriate columns.
     
     :param filename: The filename of the csv to ingest, under the path "data/raw/---.csv"
     :type filename: str
-    :return: Returns a DataFrame containing Date, Workout Name, Exercise Name, Sets, Weight, Reps, and RPE
+    :param e1rm_formula: Formula for the per-set estimated 1RM, "epley" or "brzycki"
+    :return: Returns a DataFrame containing Date, Workout Name, Duration (minutes), Exercise Name, Sets, Weight, Reps, and RPE
     :rtype: DataFrame
     """
     path = DATA_DIR / filename
     if not path.exists():
         raise FileNotFoundError(f"File not found: {path}")
 
-    df = pd.read_csv(path)
+    return read_training_export(path, e1rm_formula=e1rm_formula)
 
-    df = df.rename(columns={
-        "Date": "datetime",
-        "Workout Name": "workout",
-        "Exercise Name": "exercise",
-        "Set Order": "set",
-        "Weight": "weight",
-        "Reps": "reps",
-        "RPE": "rpe",
-    })
+def read_training_export(path: Path, e1rm_formula: str = "epley", importer: str | None = None, engine: str | None = None) -> pd.DataFrame:
+    """
+    Reads and normalizes one export from any path; see load_training_data().
 
+    :param path: Path of the export csv
+    :param e1rm_formula: Formula for the per-set estimated 1RM, "epley" or "brzycki"
+    :param importer: Importer plugin name (see importers.IMPORTERS), default=detected from the header
+    :param engine: Parser, "arrow" or "pandas", default=arrow when pyarrow is installed
+    :return: Returns the normalized sets
+    :rtype: DataFrame
+    """
+    from importers import detect_importer, get_importer
+
+    importer = detect_importer(path) if importer is None else get_importer(importer)
+    return normalize_sets(importer.read(path, engine=engine), e1rm_formula=e1rm_formula)
+
+def normalize_sets(df: pd.DataFrame, e1rm_formula: str = "epley") -> pd.DataFrame:
+    """
+    Normalizes raw sets from any importer into the set schema used by the pipeline.
+
+    :param df: Raw sets from an importers.ExportImporter
+    :type df: pd.DataFrame
+    :param e1rm_formula: Formula for the per-set estimated 1RM, "epley" or "brzycki"
+    :return: Returns a DataFrame containing Date, Workout Name, Duration (minutes), Exercise Name, Sets, Weight, Reps, and RPE
+    :rtype: DataFrame
+    """
     required_cols = {
         "datetime", "workout", "exercise", "set", "weight", "reps", "rpe"
     }
@@ -36,32 +111,34 @@ def load_training_data(filename: str = "strong_workouts.csv") -> pd.DataFrame:
     if missing:
         raise ValueError(f"Missing expected columns after rename: {missing}")
 
-    df["datetime"] = pd.to_datetime(df["datetime"], errors="coerce")
-    df["date"] = pd.to_datetime(df["datetime"].values.astype("datetime64[D]"))
+    df["date"] = df["datetime"].dt.floor("D")
 
-    df["exercise"] = (df["exercise"].str.lower().str.strip())
+    df["exercise"] = map_unique(df["exercise"], lambda s: s.str.lower().str.strip())
 
-    df["workout"] = (df["workout"].fillna("unknown").str.lower().str.strip())
+    df["workout"] = map_unique(df["workout"].fillna("unknown"), lambda s: s.str.lower().str.strip())
 
-    numeric_cols = ["weight", "reps", "rpe", "set"]
-    df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors="coerce")
+    if "duration_min" not in df:
+        df["duration_min"] = map_unique(df["duration"], parse_duration_minutes) if "duration" in df else np.nan
 
     # Drop cardio, etc
     df = df[(df["reps"] > 0) & (df["weight"] > 0)]
 
     df["volume"] = df["weight"] * df["reps"]
+    df["e1rm"] = estimate_1rm(df["weight"], df["reps"], formula=e1rm_formula)
 
     df = df[
         [
             "date",
             "datetime",
             "workout",
+            "duration_min",
             "exercise",
             "set",
             "weight",
             "reps",
             "rpe",
-            "volume"
+            "volume",
+            "e1rm"
         ]
     ]
 
@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+from joblib import Parallel, delayed
+from feature_engineering import group_offsets, require_causal_phases
+from models.online_regression import OnlineRidge
+
+# Every lift-day feature (rolling sums, EWMAs, slopes, phases, days since last session) only looks backwards,
+# so features computed once on the full history equal those recomputed at any cutoff. The backtests below
+# therefore score against one feature frame instead of rebuilding features per cutoff. Phases from
+# add_fatigue_phase(method="changepoint") are the exception: PELT segments are fitted on the whole history and
+# would leak future sessions into past labels, so backtest_performance_model() rejects them.
+
+def walk_forward_cutoffs(dates: pd.Series, min_train_sessions: int = 30, step_days: int = 28) -> pd.DatetimeIndex:
+    """
+    Builds evenly spaced cutoff dates after an initial training period.
+
+    :param dates: Sorted session dates of one exercise
+    :param min_train_sessions: Number of sessions before the first cutoff
+    :param step_days: Days between cutoffs (also the length of each test window)
+    :return: Returns the cutoff dates
+    :rtype: DatetimeIndex
+    """
+    dates = pd.to_datetime(pd.Series(dates)).reset_index(drop=True)
+    if len(dates) <= min_train_sessions:
+        return pd.DatetimeIndex([])
+
+    return pd.date_range(
+        start=dates.iloc[min_train_sessions],
+        end=dates.iloc[-1],
+        freq=f"{step_days}D"
+    )
+
+def _backtest_exercise(history: pd.DataFrame, features: list, target: str, alpha: float, min_train_sessions: int, step_days: int, window_days: Optional[int], phase_baseline: str) -> list:
+    history = history.sort_values("date")
+    dates = history["date"]
+
+    model = OnlineRidge(features, target=target, alpha=alpha, phase_baseline=phase_baseline)
+    key = tuple(history[model.group_cols].iloc[0])
+
+    rows = []
+    added_until = dates.min()
+    removed_until = dates.min()
+
+    for cutoff in walk_forward_cutoffs(dates, min_train_sessions, step_days):
+        # Fold in only the sessions since the previous cutoff, and drop those that left a sliding window
+        model.partial_fit(history[(dates >= added_until) & (dates < cutoff)])
+        added_until = cutoff
+
+        if window_days is not None:
+            window_start = cutoff - pd.Timedelta(days=window_days)
+            if window_start > removed_until:
+                model.downdate(history[(dates >= removed_until) & (dates < window_start)])
+                removed_until = window_start
+
+        test = history[(dates >= cutoff) & (dates < cutoff + pd.Timedelta(days=step_days))]
+        if key not in model.stats or model.stats[key].n < 2 or test.empty:
+            continue
+
+        predicted = model.predict(test)
+        actual = test[target].to_numpy(dtype=float)
+        scored = ~np.isnan(predicted) & ~np.isnan(actual)
+        if not scored.any():
+            continue
+
+        errors = predicted[scored] - actual[scored]
+        rows.append({
+            **dict(zip(model.group_cols, key)),
+            "cutoff": cutoff,
+            "n_train": model.stats[key].n,
+            "n_test": int(scored.sum()),
+            "mse": float(np.mean(errors ** 2)),
+            "mae": float(np.mean(np.abs(errors))),
+            "bias": float(np.mean(errors)),
+        })
+
+    return rows
+
+def backtest_performance_model(
+    lift_day: pd.DataFrame,
+    features: list,
+    target: str = "max_weight",
+    alpha: float = 1.0,
+    min_train_sessions: int = 30,
+    step_days: int = 28,
+    window_days: Optional[int] = None,
+    exercises: Optional[list] = None,
+    phase_baseline: str = "accumulating",
+    n_jobs: int = -1
+) -> pd.DataFrame:
+    """
+    Walk-forward backtest of the per-exercise Ridge model.
+
+    At each cutoff the model is trained only on sessions before the cutoff (all of them, or the last
+    `window_days` if given) and scored on the following `step_days`. Training state is carried between
+    cutoffs with OnlineRidge, so each cutoff only adds (and for sliding windows removes) the sessions that
+    changed. Exercises are backtested in parallel.
+
+    :param lift_day: The DataFrame produced by the feature pipeline
+    :type lift_day: pd.DataFrame
+    :param features: Model features, as passed to train_ridge_regression()
+    :param target: Target column
+    :param alpha: Ridge alpha
+    :param min_train_sessions: Sessions required before the first cutoff
+    :param step_days: Days between cutoffs and length of each test window
+    :param window_days: Sliding training window in days, default=None (expanding window)
+    :param exercises: Exercises to backtest, default=all
+    :param phase_baseline: Baseline phase for one-hot encoding
+    :param n_jobs: Number of worker processes, default=-1 (all cores)
+    :return: Returns one row per (exercise, cutoff) with train/test sizes and error metrics
+    :rtype: DataFrame
+    """
+    require_causal_phases(lift_day, "backtest_performance_model()")
+    if exercises is not None:
+        lift_day = lift_day[lift_day["exercise"].isin(exercises)]
+
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_backtest_exercise)(history, features, target, alpha, min_train_sessions, step_days, window_days, phase_baseline)
+        for _, history in lift_day.groupby("exercise")
+    )
+
+    return pd.DataFrame([row for rows in results for row in rows])
+
+def backtest_fatigue_forecast(
+    lift_day: pd.DataFrame,
+    horizon: int = 7,
+    ewma_span: int = 7,
+    mode: str = "maintain",
+    scale: float = 0.7,
+    lookback: int = 7
+) -> pd.DataFrame:
+    """
+    Scores forecast_fatigue_scenario() from every session of every exercise against the realized EWMA.
+
+    A constant-stress scenario has the closed form c + (ewma - c)(1 - alpha)^k, so forecasts from all cutoffs are
+    computed at once. Step k is compared with the realized `ewma_stress` k sessions later.
+
+    :param lift_day: The DataFrame produced by the feature pipeline
+    :type lift_day: pd.DataFrame
+    :param horizon: Number of steps ahead to score
+    :param ewma_span: Span used for the forecast, as in forecast_fatigue_scenario()
+    :param mode: Scenario mode, as in make_stress_scenario()
+    :param scale: Scale for the "reduce" mode
+    :param lookback: Number of recent sessions averaged for the scenario stress
+    :return: Returns one row per step ahead with n, MAE, RMSE, bias and MAPE
+    :rtype: DataFrame
+    """
+    df = lift_day.sort_values(["exercise", "date"])
+    starts = group_offsets(df["exercise"].to_numpy())
+    n = len(df)
+
+    stress = df["stress"].to_numpy(dtype=float)
+    ewma = df["ewma_stress"].to_numpy(dtype=float)
+
+    group_start = np.repeat(starts, np.diff(np.append(starts, n)))
+    group_end = np.repeat(np.append(starts[1:], n), np.diff(np.append(starts, n)))
+    idx = np.arange(n)
+
+    csum = np.concatenate(([0.0], np.cumsum(stress)))
+    has_lookback = idx - lookback + 1 >= group_start
+    recent_mean = (csum[idx + 1] - csum[np.maximum(idx - lookback + 1, 0)]) / lookback
+
+    if mode == "maintain":
+        scenario = recent_mean
+    elif mode == "reduce":
+        scenario = recent_mean * scale
+    elif mode == "deload":
+        scenario = np.zeros(n)
+    else:
+        raise ValueError(f"Unknown scenario mode: {mode}")
+
+    alpha = 2 / (ewma_span + 1)
+    rows = []
+
+    for k in range(1, horizon + 1):
+        valid = has_lookback & (idx + k < group_end)
+        forecast = scenario[valid] + (ewma[valid] - scenario[valid]) * (1 - alpha) ** k
+        realized = ewma[idx[valid] + k]
+        errors = forecast - realized
+
+        rows.append({
+            "day_ahead": k,
+            "n": int(valid.sum()),
+            "mae": float(np.mean(np.abs(errors))) if len(errors) else np.nan,
+            "rmse": float(np.sqrt(np.mean(errors ** 2))) if len(errors) else np.nan,
+            "bias": float(np.mean(errors)) if len(errors) else np.nan,
+            "mape": float(np.mean(np.abs(errors) / np.abs(realized))) * 100 if len(errors) else np.nan,
+        })
+
+    return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    from pathlib import Path
+
+    processed_path = Path(__file__).resolve().parents[2] / "data" / "processed"
+    lift_day = pd.read_csv(processed_path / "training_lift_day_aggregates.csv", parse_dates=["date"])
+
+    print("Fatigue forecast backtest (maintain):")
+    print(backtest_fatigue_forecast(lift_day))
+
+    results = backtest_performance_model(
+        lift_day,
+        features=["ewma_stress", "fatigue_phase", "sessions_in_phase", "days_since_last_session"],
+        alpha=1e4,
+        exercises=[e for e in lift_day["exercise"].unique() if "bench press" in e]
+    )
+
+    print("\nWalk-forward Ridge backtest:")
+    print(results.groupby("exercise")[["n_test", "mse", "mae"]].mean())
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from joblib import Parallel, delayed
+from models.regression import encode_fatigue_phase
+
+DEFAULT_REPLICATES = 1000
+DEFAULT_CHUNK = 250
+
+@dataclass
+class RidgeBootstrap:
+    """
+    Bootstrap replicates of a Ridge fit: one coefficient vector and intercept per resample.
+    """
+    feature_names: list
+    coef: np.ndarray        # (n_boot, p)
+    intercept: np.ndarray   # (n_boot,)
+    point_coef: np.ndarray  # (p,) fit on the original rows
+    point_intercept: float
+
+    def coef_samples(self, feature: str) -> np.ndarray:
+        return self.coef[:, self.feature_names.index(feature)]
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Predicts every row of X under every replicate with one matrix product.
+
+        :param X: Feature matrix with columns in feature_names order
+        :return: Returns an array of shape (n_boot, len(X))
+        :rtype: np.ndarray
+        """
+        X = np.asarray(X, dtype=float)
+        return self.intercept[:, None] + self.coef @ X.T
+
+    def coefficient_intervals(self, level: float = 0.95) -> pd.DataFrame:
+        """
+        Percentile intervals for each coefficient.
+
+        :param level: Interval coverage
+        :return: Returns one row per feature with the point estimate, bootstrap std and interval bounds
+        :rtype: DataFrame
+        """
+        lower, upper = percentile_interval(self.coef, level, axis=0)
+        return pd.DataFrame({
+            "feature": self.feature_names,
+            "coefficient": self.point_coef,
+            "std": self.coef.std(axis=0, ddof=1),
+            "lower": lower,
+            "upper": upper,
+        })
+
+def percentile_interval(samples: np.ndarray, level: float = 0.95, axis: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    tail = (1 - level) / 2 * 100
+    lower, upper = np.percentile(samples, [tail, 100 - tail], axis=axis)
+    return lower, upper
+
+def weighted_ridge_solve(X: np.ndarray, y: np.ndarray, weights: np.ndarray, alpha: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Solves one Ridge problem per row of `weights` as a stack of p x p systems.
+
+    Each weight row is a bootstrap resample expressed as row multiplicities, so resampling never copies X. The
+    weighted Gram matrices and cross products of the whole stack come from two einsum reductions, and the
+    centered systems (intercept unpenalized, as in sklearn's Ridge) are solved together by np.linalg.solve.
+
+    :param X: Design matrix (n, p)
+    :param y: Target (n,)
+    :param weights: Row weights (b, n)
+    :param alpha: Ridge penalty
+    :return: Returns (coef (b, p), intercept (b,))
+    :rtype: tuple[np.ndarray, np.ndarray]
+    """
+    n_w = weights.sum(axis=1)
+    mean_x = weights @ X / n_w[:, None]
+    mean_y = weights @ y / n_w
+
+    xtx = np.einsum("bn,ni,nj->bij", weights, X, X, optimize=True)
+    xty = weights @ (X * y[:, None])
+
+    p = X.shape[1]
+    gram = xtx - n_w[:, None, None] * mean_x[:, :, None] * mean_x[:, None, :] + alpha * np.eye(p)
+    rhs = xty - n_w[:, None] * mean_x * mean_y[:, None]
+
+    coef = np.linalg.solve(gram, rhs[:, :, None])[:, :, 0]
+    intercept = mean_y - np.einsum("bi,bi->b", mean_x, coef)
+    return coef, intercept
+
+def _bootstrap_chunk(X: np.ndarray, y: np.ndarray, alpha: float, size: int, seed) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    n = len(y)
+    weights = rng.multinomial(n, np.full(n, 1.0 / n), size=size).astype(float)
+    return weighted_ridge_solve(X, y, weights, alpha)
+
+def bootstrap_ridge(
+    X: pd.DataFrame,
+    y,
+    alpha: float = 1.0,
+    n_boot: int = DEFAULT_REPLICATES,
+    seed: int = 42,
+    n_jobs: int = -1,
+    chunk: int = DEFAULT_CHUNK
+) -> RidgeBootstrap:
+    """
+    Nonparametric (row resampling) bootstrap of a Ridge fit.
+
+    Replicates are solved in chunks of `chunk` stacked systems, and chunks run in parallel with joblib. Each
+    chunk draws from its own child seed, so results do not depend on n_jobs.
+
+    :param X: Encoded feature matrix, e.g. X_train from ridge_train_test_split()
+    :type X: pd.DataFrame
+    :param y: Target values
+    :param alpha: Ridge penalty, as passed to train_ridge_regression()
+    :param n_boot: Number of bootstrap replicates
+    :param seed: Random seed
+    :param n_jobs: joblib workers, default=-1 (all cores)
+    :param chunk: Replicates solved per stacked batch
+    :return: Returns the replicate coefficients and intercepts
+    :rtype: RidgeBootstrap
+    """
+    names = list(X.columns)
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    sizes = [min(chunk, n_boot - start) for start in range(0, n_boot, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    parts = Parallel(n_jobs=n_jobs if len(sizes) > 1 else 1)(
+        delayed(_bootstrap_chunk)(X, y, alpha, size, s) for size, s in zip(sizes, seeds)
+    )
+
+    point_coef, point_intercept = weighted_ridge_solve(X, y, np.ones((1, len(y))), alpha)
+
+    return RidgeBootstrap(
+        feature_names=names,
+        coef=np.concatenate([c for c, _ in parts]),
+        intercept=np.concatenate([b for _, b in parts]),
+        point_coef=point_coef[0],
+        point_intercept=float(point_intercept[0]),
+    )
+
+def bootstrap_ridge_by_group(
+    data: pd.DataFrame,
+    target: str,
+    features: list,
+    alpha: float = 1.0,
+    group_col: str = "exercise",
+    n_boot: int = DEFAULT_REPLICATES,
+    seed: int = 42,
+    n_jobs: int = -1,
+    phase_baseline: str = "accumulating",
+    min_rows: int = 20
+) -> dict:
+    """
+    Bootstraps one Ridge fit per lift, with lifts processed in parallel.
+
+    :param data: Lift-day rows for every lift
+    :param target: Target column, e.g. "max_weight"
+    :param features: Raw feature columns, as passed to train_ridge_regression()
+    :param alpha: Ridge penalty
+    :param group_col: Column identifying one model
+    :param n_boot: Bootstrap replicates per lift
+    :param seed: Random seed
+    :param n_jobs: joblib workers across lifts
+    :param phase_baseline: Baseline phase for the fatigue_phase dummies
+    :param min_rows: Lifts with fewer complete rows are skipped
+    :return: Returns a dict of group value -> RidgeBootstrap
+    :rtype: dict
+    """
+    jobs = []
+    for key, rows in data.groupby(group_col, sort=True):
+        df = rows[features + [target]].dropna()
+        if len(df) < min_rows:
+            continue
+
+        X = encode_fatigue_phase(df[features], baseline=phase_baseline) if "fatigue_phase" in features else df[features]
+        jobs.append((key, X, df[target]))
+
+    # Lifts are the parallel unit here, so each lift's chunks run serially inside its worker
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(bootstrap_ridge)(X, y, alpha=alpha, n_boot=n_boot, seed=seed, n_jobs=1) for _, X, y in jobs
+    )
+    return {key: result for (key, _, _), result in zip(jobs, results)}
@@ -2,8 +2,6 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 from typing import Optional
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 
 def forecast_ewma(last_ewma: float, future_stress: np.ndarray, alpha: float) -> np.ndarray:
     ewma_forecast = []
@@ -120,14 +118,168 @@ def required_scale_for_recovery(
 
     return low
 
+def ewma_weight_matrix(horizon: int, alpha: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Unrolls the EWMA recursion over a horizon into a linear map.
+
+    forecasted_ewma = last_ewma * decay + stress_paths @ weights.T, so many paths are forecast in one matrix product.
+
+    :param horizon: Number of days to forecast
+    :param alpha: EWMA smoothing factor
+    :return: Returns (decay, weights) with decay[t] = (1 - alpha)^(t + 1) and weights[t, j] = alpha * (1 - alpha)^(t - j) for j <= t
+    :rtype: tuple[np.ndarray, np.ndarray]
+    """
+    steps = np.arange(horizon)
+    lag = steps[:, None] - steps[None, :]
+
+    weights = np.where(lag >= 0, alpha * (1 - alpha) ** np.maximum(lag, 0), 0.0)
+    decay = (1 - alpha) ** (steps + 1)
+
+    return decay, weights
+
+def sample_stress_paths(df: pd.DataFrame, horizon: int, n_samples: int, method: str = "empirical", stress_col: str = "stress", history_days: int = 90, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Samples future daily stress paths from recent training history.
+
+    "empirical" bootstraps each day's stress from the recent lift-day stress values, like make_stress_scenario's
+    maintain mode with noise. "frequency" treats each day as a training day with the recent session frequency
+    and draws session stress from the recent sessions, leaving rest days at zero.
+
+    :param df: Lift-day rows for one exercise, sorted by date, with `date` and stress_col
+    :param horizon: Number of days to forecast
+    :param n_samples: Number of paths to draw
+    :param method: "empirical" or "frequency"
+    :param history_days: Calendar days of history the distributions are fitted on
+    :param rng: Random generator, default=np.random.default_rng()
+    :return: Returns an array of shape (n_samples, horizon)
+    :rtype: np.ndarray
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+
+    dates = pd.to_datetime(df["date"])
+    recent = df[dates >= dates.iloc[-1] - pd.Timedelta(days=history_days)]
+    stress = recent[stress_col].to_numpy(dtype=float)
+
+    if len(stress) == 0:
+        raise ValueError("No recent stress history to sample from.")
+
+    paths = rng.choice(stress, size=(n_samples, horizon), replace=True)
+
+    if method == "empirical":
+        return paths
+
+    if method == "frequency":
+        span_days = max((pd.to_datetime(recent["date"]).iloc[-1] - pd.to_datetime(recent["date"]).iloc[0]).days + 1, 1)
+        p_session = min(len(stress) / span_days, 1.0)
+        return np.where(rng.random((n_samples, horizon)) < p_session, paths, 0.0)
+
+    raise ValueError(f"Unknown sampling method: {method}")
+
+def monte_carlo_fatigue_forecast(
+    df: pd.DataFrame,
+    threshold: float,
+    stress_col: str = "stress",
+    ewma_col: str = "ewma_stress",
+    ewma_span: int = 7,
+    horizon: int = 21,
+    n_samples: int = 10_000,
+    method: str = "empirical",
+    quantiles=(0.05, 0.25, 0.5, 0.75, 0.95),
+    chunk_size: int = 50_000,
+    n_bins: int = 4096,
+    seed: Optional[int] = None
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Forecasts EWMA fatigue under sampled stress paths and summarizes the spread of outcomes.
+
+    Paths are pushed through the EWMA recursion in chunks of `chunk_size` as one matrix product each.
+    Every forecast EWMA is a convex combination of the last EWMA and sampled stresses, so it lies within
+    known bounds; per-day quantiles are read from fixed histograms over that range, which keeps memory
+    independent of `n_samples` (resolution is range / n_bins).
+
+    :param df: Lift-day rows for one exercise, sorted by date
+    :param threshold: EWMA level counted as recovered, as in days_until_recovery()
+    :param horizon: Number of days to forecast
+    :param n_samples: Number of sampled paths
+    :param method: Stress sampling method, see sample_stress_paths()
+    :param quantiles: Quantiles reported per day
+    :param chunk_size: Maximum number of paths held in memory at once
+    :param n_bins: Histogram resolution for quantiles
+    :param seed: Random seed
+    :return: Returns (bands, recovery): per-day quantiles, mean and probability of having recovered by that day,
+        and the distribution of days until recovery (day_ahead None for paths that never recover)
+    :rtype: tuple[DataFrame, DataFrame]
+    """
+    rng = np.random.default_rng(seed)
+    alpha = 2 / (ewma_span + 1)
+    last_ewma = float(df[ewma_col].iloc[-1])
+
+    decay, weights = ewma_weight_matrix(horizon, alpha)
+
+    stress_values = df[stress_col].to_numpy(dtype=float)
+    lo = min(last_ewma, 0.0, stress_values.min())
+    hi = max(last_ewma, stress_values.max())
+    width = (hi - lo) / n_bins if hi > lo else 1.0
+
+    hist = np.zeros((horizon, n_bins), dtype=np.int64)
+    ewma_sum = np.zeros(horizon)
+    recovery_counts = np.zeros(horizon + 1, dtype=np.int64)
+    day_offsets = np.arange(horizon) * n_bins
+
+    for start in range(0, n_samples, chunk_size):
+        size = min(chunk_size, n_samples - start)
+
+        paths = sample_stress_paths(df, horizon, size, method=method, stress_col=stress_col, rng=rng)
+        ewma = last_ewma * decay + paths @ weights.T
+
+        bins = np.clip(((ewma - lo) / width).astype(np.int64), 0, n_bins - 1)
+        hist += np.bincount((bins + day_offsets).ravel(), minlength=horizon * n_bins).reshape(horizon, n_bins)
+        ewma_sum += ewma.sum(axis=0)
+
+        # argmax finds the first day below threshold; paths that never recover land in the last slot
+        below = ewma < threshold
+        first = np.where(below.any(axis=1), below.argmax(axis=1), horizon)
+        recovery_counts += np.bincount(first, minlength=horizon + 1)
+
+    cdf = np.cumsum(hist, axis=1) / n_samples
+    bin_upper = lo + width * np.arange(1, n_bins + 1)
+
+    bands = pd.DataFrame({"day_ahead": np.arange(1, horizon + 1)})
+    for q in quantiles:
+        bands[f"q{int(round(q * 100)):02d}"] = bin_upper[np.argmax(cdf >= q, axis=1)]
+    bands["mean_ewma"] = ewma_sum / n_samples
+    bands["p_recovered"] = np.cumsum(recovery_counts[:horizon]) / n_samples
+
+    recovery = pd.DataFrame({
+        "day_ahead": pd.array(list(range(1, horizon + 1)) + [None], dtype="Int64"),
+        "probability": recovery_counts / n_samples,
+    })
+
+    return bands, recovery
+
 def plot_forecast(
     bench: pd.DataFrame,
     scenarios: dict,
     threshold: float,
     last_date: pd.Timestamp,
     horizon: int,
-    history_window_days: int = 90
+    history_window_days: int = 90,
+    ax=None,
+    title: str = "EWMA Fatigue Forecasting Scenarios – Bench Press"
 ):
+    """
+    Draws observed EWMA stress and the forecast scenarios.
+
+    :param ax: Axes to draw on, default=None (a new pyplot figure)
+    :param title: Axes title
+    :return: Returns the figure drawn on
+    """
+    import matplotlib.dates as mdates
+
+    if ax is None:
+        import matplotlib.pyplot as plt
+        _, ax = plt.subplots(figsize=(12, 6))
+
     future_dates = pd.date_range(
         start=last_date + pd.Timedelta(days=1),
         periods=horizon,
@@ -148,9 +300,7 @@ def plot_forecast(
     cutoff_date = last_date - pd.Timedelta(days=history_window_days)
     bench_recent = bench[bench["date"] >= cutoff_date].copy()
 
-    plt.figure(figsize=(12, 6))
-
-    plt.plot(
+    ax.plot(
         bench_recent["date"],
         bench_recent["ewma_stress"],
         label="Observed",
@@ -159,11 +309,11 @@ def plot_forecast(
         color="steelblue"
     )
 
-    plt.axvline(float(mdates.date2num(last_date)), linestyle="--", color="black", alpha=0.6)
+    ax.axvline(float(mdates.date2num(last_date)), linestyle="--", color="black", alpha=0.6)
 
     xmin = float(mdates.date2num(last_date))
     xmax = float(mdates.date2num(future_dates[-1]))
-    plt.axvspan(xmin, xmax, color="gray", alpha=0.08)
+    ax.axvspan(xmin, xmax, color="gray", alpha=0.08)
 
     for name, forecast in scenarios.items():
         color_map = {
@@ -178,7 +328,7 @@ def plot_forecast(
             "deload": "-"
         }
 
-        plt.plot(
+        ax.plot(
             future_dates,
             forecast["forecasted_ewma"],
             label=name,
@@ -188,7 +338,7 @@ def plot_forecast(
         )
 
     if recovery_date is not None:
-        plt.axvline(
+        ax.axvline(
             float(mdates.date2num(recovery_date)),
             color="red",
             linestyle=":",
@@ -197,22 +347,23 @@ def plot_forecast(
             label="Deload Recovery Date"
         )
 
-        plt.axhline(
+        ax.axhline(
             threshold,
             color="gray",
             linestyle="--",
             alpha=0.5
         )
 
-    plt.title("EWMA Fatigue Forecasting Scenarios – Bench Press")
-    plt.xlabel("Date")
-    plt.ylabel("EWMA Fatigue")
-    plt.ylim(bottom=0)
-    plt.legend()
-    plt.tight_layout()
-    plt.show()
+    ax.set_title(title)
+    ax.set_xlabel("Date")
+    ax.set_ylabel("EWMA Fatigue")
+    ax.set_ylim(bottom=0)
+    ax.legend()
+    ax.figure.tight_layout()
 
-if __name__ == "__main__":
+    return ax.figure
+
+def main(plot: bool = True):
     processed_path = Path(__file__).resolve().parents[2] / "data" / "processed"
     df = pd.read_csv(processed_path / "training_lift_day_aggregates.csv")
 
@@ -245,14 +396,29 @@ if __name__ == "__main__":
     summary = summarize_scenarios(scenarios, threshold)
     print(summary)
 
-    plot_forecast(
-        bench=bench,
-        scenarios=scenarios,
+    if plot:
+        import matplotlib.pyplot as plt
+
+        plot_forecast(
+            bench=bench,
+            scenarios=scenarios,
+            threshold=threshold,
+            last_date=last_date,
+            horizon=horizon
+        )
+        plt.show()
+
+    mc_bands, mc_recovery = monte_carlo_fatigue_forecast(
+        bench,
         threshold=threshold,
-        last_date=last_date,
-        horizon=horizon
+        horizon=horizon,
+        method="frequency",
+        seed=0
     )
 
+    print("\nMonte Carlo fatigue bands (sampled training frequency):")
+    print(mc_bands)
+
     target_days = 7
 
     required_scale = required_scale_for_recovery(
@@ -263,4 +429,7 @@ if __name__ == "__main__":
     )
 
     print(f"\nTo recover within {target_days} days:")
-    print(f"Required stress scale ≈ {required_scale:.2f}")
\ No newline at end of file
+    print(f"Required stress scale ≈ {required_scale:.2f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
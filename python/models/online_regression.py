@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from models.regression import encode_fatigue_phase
+
+@dataclass
+class RidgeStats:
+    """
+    Sufficient statistics of a (possibly exponentially weighted) least squares problem.
+    """
+    n: float = 0.0
+    sum_x: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    sum_y: float = 0.0
+    xtx: np.ndarray = field(default_factory=lambda: np.zeros((0, 0)))
+    xty: np.ndarray = field(default_factory=lambda: np.zeros(0))
+
+class OnlineRidge:
+    """
+    Ridge regression kept current per group by maintaining X'X, X'y, counts and sums.
+
+    Each new lift-day costs O(p^2) to fold in and the Ridge system is solved only when coefficients are
+    requested. With `forgetting` < 1 every update first scales the existing statistics, so older training eras
+    fade with weight forgetting^(sessions since). With forgetting=1 the solution matches sklearn's Ridge fit
+    on the same rows (intercept unpenalized).
+    """
+
+    def __init__(
+        self,
+        features: list,
+        target: str = "max_weight",
+        alpha: float = 1.0,
+        forgetting: float = 1.0,
+        group_cols: tuple = ("exercise",),
+        phase_baseline: str = "accumulating"
+    ):
+        self.features = list(features)
+        self.target = target
+        self.alpha = alpha
+        self.forgetting = forgetting
+        self.group_cols = list(group_cols)
+        self.phase_baseline = phase_baseline
+        self.stats: dict = {}
+
+        phases = ["accumulating", "recovering", "stable"]
+        numeric = [f for f in self.features if f != "fatigue_phase"]
+        dummies = [f"fatigue_phase_{p}" for p in phases if p != phase_baseline] if "fatigue_phase" in self.features else []
+        self.feature_columns = numeric + dummies
+
+    def _design(self, rows: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        df = rows[self.features + [self.target]].dropna()
+        X = encode_fatigue_phase(df[self.features], baseline=self.phase_baseline) if "fatigue_phase" in self.features else df[self.features]
+        X = X.reindex(columns=self.feature_columns, fill_value=0)
+        return X.to_numpy(dtype=float), df[self.target].to_numpy(dtype=float)
+
+    def _update(self, key, X: np.ndarray, y: np.ndarray, sign: float = 1.0) -> None:
+        p = X.shape[1]
+        s = self.stats.get(key)
+        if s is None:
+            s = RidgeStats(sum_x=np.zeros(p), xtx=np.zeros((p, p)), xty=np.zeros(p))
+            self.stats[key] = s
+
+        m = len(y)
+        if self.forgetting < 1.0:
+            # row i of the batch ends up weighted forgetting^(m - 1 - i); existing stats decay by forgetting^m
+            w = self.forgetting ** np.arange(m - 1, -1, -1)
+            decay = self.forgetting ** m
+        else:
+            w = np.ones(m)
+            decay = 1.0
+
+        w = sign * w
+        Xw = X * w[:, None]
+        s.n = decay * s.n + w.sum()
+        s.sum_x = decay * s.sum_x + Xw.sum(axis=0)
+        s.sum_y = decay * s.sum_y + w @ y
+        s.xtx = decay * s.xtx + Xw.T @ X
+        s.xty = decay * s.xty + Xw.T @ y
+
+    def partial_fit(self, rows: pd.DataFrame) -> "OnlineRidge":
+        """
+        Folds new lift-day rows into the statistics of their groups.
+
+        :param rows: Lift-day rows in chronological order, with the group, feature and target columns
+        :type rows: pd.DataFrame
+        :return: Returns self
+        :rtype: OnlineRidge
+        """
+        for key, group in rows.groupby(self.group_cols, sort=False):
+            X, y = self._design(group)
+            if len(y):
+                self._update(key, X, y)
+
+        return self
+
+    def downdate(self, rows: pd.DataFrame) -> "OnlineRidge":
+        """
+        Removes rows previously folded in with partial_fit(), e.g. when they slide out of a training window.
+
+        :param rows: Rows to remove, exactly as they were added
+        :type rows: pd.DataFrame
+        :return: Returns self
+        :rtype: OnlineRidge
+        """
+        if self.forgetting < 1.0:
+            raise ValueError("Rows cannot be removed once statistics have been decayed (forgetting < 1).")
+
+        for key, group in rows.groupby(self.group_cols, sort=False):
+            X, y = self._design(group)
+            if len(y):
+                self._update(key, X, y, sign=-1.0)
+
+        return self
+
+    def solve(self, key) -> tuple[np.ndarray, float]:
+        """
+        Solves the Ridge system for one group from its current statistics.
+
+        :param key: Group key, a tuple of group_cols values
+        :return: Returns (coefficients, intercept)
+        :rtype: tuple[np.ndarray, float]
+        """
+        if key not in self.stats:
+            raise KeyError(f"No observations for group: {key}")
+
+        s = self.stats[key]
+        mean_x = s.sum_x / s.n
+        mean_y = s.sum_y / s.n
+
+        sxx = s.xtx - s.n * np.outer(mean_x, mean_x)
+        sxy = s.xty - s.n * mean_x * mean_y
+
+        coef = np.linalg.solve(sxx + self.alpha * np.eye(len(mean_x)), sxy)
+        return coef, float(mean_y - mean_x @ coef)
+
+    def coefficients(self) -> pd.DataFrame:
+        """
+        Solves every group and returns one row of coefficients per group.
+
+        :return: Returns a DataFrame indexed by group with one column per encoded feature plus `intercept` and `n`
+        :rtype: DataFrame
+        """
+        rows = {}
+        for key, s in self.stats.items():
+            coef, intercept = self.solve(key)
+            rows[key] = {**dict(zip(self.feature_columns, coef)), "intercept": intercept, "n": s.n}
+
+        out = pd.DataFrame.from_dict(rows, orient="index")
+        out.index.names = self.group_cols
+        return out
+
+    def predict(self, rows: pd.DataFrame) -> np.ndarray:
+        """
+        Predicts the target for rows using the current coefficients of each row's group.
+
+        :param rows: Rows with the group and feature columns
+        :type rows: pd.DataFrame
+        :return: Returns predictions aligned with rows (NaN where features are missing or the group is unseen)
+        :rtype: np.ndarray
+        """
+        out = np.full(len(rows), np.nan)
+        positions = pd.Series(np.arange(len(rows)), index=rows.index)
+
+        for key, group in rows.groupby(self.group_cols, sort=False):
+            if key not in self.stats:
+                continue
+
+            complete = group[self.features].dropna()
+            if complete.empty:
+                continue
+
+            X = encode_fatigue_phase(complete, baseline=self.phase_baseline) if "fatigue_phase" in self.features else complete
+            coef, intercept = self.solve(key)
+            out[positions[complete.index].to_numpy()] = X.reindex(columns=self.feature_columns, fill_value=0).to_numpy(dtype=float) @ coef + intercept
+
+        return out
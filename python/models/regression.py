@@ -1,8 +1,11 @@
+from __future__ import annotations
+
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression, Ridge
-from sklearn.metrics import mean_squared_error, r2_score
-from typing import Tuple, List
+from typing import TYPE_CHECKING, Tuple, List
+
+# sklearn is imported inside the functions that need it so importing this module stays cheap
+if TYPE_CHECKING:
+    from sklearn.linear_model import LinearRegression, Ridge
 
 def encode_fatigue_phase(X: pd.DataFrame, baseline: str) -> pd.DataFrame:
     phases = ["accumulating", "recovering", "stable"]
@@ -26,6 +29,10 @@ def encode_fatigue_phase(X: pd.DataFrame, baseline: str) -> pd.DataFrame:
     )
 
 def tune_ridge_alpha(data: pd.DataFrame, target: str, features: list, alphas: list, phase_baseline: str = "stable") -> pd.DataFrame:
+    from sklearn.linear_model import Ridge
+    from sklearn.metrics import mean_squared_error, r2_score
+    from sklearn.model_selection import train_test_split
+
     df = data[features + [target]].dropna()
 
     X = df[features]
@@ -69,6 +76,7 @@ def print_model_information(model, X_train: pd.DataFrame, X_test: pd.DataFrame,
     :param y_test: Test target
     :param model_name: Display name for the model
     """
+    from sklearn.metrics import mean_squared_error, r2_score
 
     y_pred = model.predict(X_test)
 
@@ -97,6 +105,9 @@ def print_model_information(model, X_train: pd.DataFrame, X_test: pd.DataFrame,
         )
 
 def train_regression_model(data: pd.DataFrame, target: str, features: list, phase_baseline: str = "accumulating") -> Tuple[LinearRegression, List[str]]:
+    from sklearn.linear_model import LinearRegression
+    from sklearn.model_selection import train_test_split
+
     # Select features + target
     df = data[features + [target]].copy()
 
@@ -129,7 +140,14 @@ def train_regression_model(data: pd.DataFrame, target: str, features: list, phas
 
     return model, X.columns.tolist()
 
-def train_ridge_regression(data: pd.DataFrame, target: str, features: list, alpha: float = 1.0, phase_baseline: str = "accumulating") -> Tuple[Ridge, List[str]]:
+def ridge_train_test_split(data: pd.DataFrame, target: str, features: list, phase_baseline: str = "accumulating") -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+    """
+    Builds the encoded design matrix and the fixed 80/20 split used by train_ridge_regression().
+
+    :return: Returns (X_train, X_test, y_train, y_test)
+    """
+    from sklearn.model_selection import train_test_split
+
     # Select features + target
     df = data[features + [target]].copy()
 
@@ -142,10 +160,15 @@ def train_ridge_regression(data: pd.DataFrame, target: str, features: list, alph
     # One-hot encode fatigue_phase
     X = encode_fatigue_phase(X, baseline=phase_baseline)
 
-    X_train, X_test, y_train, y_test = train_test_split(
+    return train_test_split(
         X, y, test_size=0.2, random_state=42
     )
 
+def train_ridge_regression(data: pd.DataFrame, target: str, features: list, alpha: float = 1.0, phase_baseline: str = "accumulating") -> Tuple[Ridge, List[str]]:
+    from sklearn.linear_model import Ridge
+
+    X_train, X_test, y_train, y_test = ridge_train_test_split(data, target, features, phase_baseline)
+
     model = Ridge(alpha=alpha)
     model.fit(X_train, y_train)
 
@@ -157,4 +180,4 @@ def train_ridge_regression(data: pd.DataFrame, target: str, features: list, alph
         model_name="Ridge Regression"
     )
 
-    return model, X.columns.tolist()
\ No newline at end of file
+    return model, X_train.columns.tolist()
\ No newline at end of file
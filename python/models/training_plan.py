@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+from models.regression import encode_fatigue_phase
+
+def _affine_ewma(const: np.ndarray, mat: np.ndarray, prev: float, alpha: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    EWMA of a series that is affine in the planned stress (series = const + mat @ s), returned in the same form.
+    """
+    horizon = len(const)
+    out_const = np.empty(horizon)
+    out_mat = np.empty_like(mat)
+
+    prev_const, prev_mat = prev, np.zeros(mat.shape[1])
+    for t in range(horizon):
+        prev_const = alpha * const[t] + (1 - alpha) * prev_const
+        prev_mat = alpha * mat[t] + (1 - alpha) * prev_mat
+        out_const[t], out_mat[t] = prev_const, prev_mat
+
+    return out_const, out_mat
+
+def fatigue_state_maps(last_row: pd.Series, horizon: int, load_span: int = 7, phase_span: int = 14, slope_span: int = 7) -> dict:
+    """
+    Expresses forecast EWMA and smoothed EWMA slope as affine functions of a per-day stress schedule.
+
+    Each quantity q over the horizon is q = const + mat @ stress, because every step of the feature pipeline
+    (EWMA, EWMA of EWMA, difference, EWMA of the difference) is linear.
+
+    :param last_row: Last lift-day row of the exercise, with ewma_stress, ewma_smooth and ewma_slope_smooth
+    :type last_row: pd.Series
+    :param horizon: Number of days to plan
+    :return: Returns a dict of (const, mat) pairs for `ewma_stress` and `ewma_slope_smooth`
+    :rtype: dict
+    """
+    identity = np.eye(horizon)
+
+    ewma = _affine_ewma(np.zeros(horizon), identity, float(last_row["ewma_stress"]), 2 / (load_span + 1))
+    smooth = _affine_ewma(*ewma, float(last_row["ewma_smooth"]), 2 / (phase_span + 1))
+
+    last_smooth = float(last_row["ewma_smooth"])
+    slope_const = np.diff(np.concatenate(([last_smooth], smooth[0])))
+    slope_mat = np.diff(np.vstack((np.zeros(horizon), smooth[1])), axis=0)
+
+    last_slope = last_row["ewma_slope_smooth"]
+    last_slope = 0.0 if pd.isna(last_slope) else float(last_slope)
+    slope_smooth = _affine_ewma(slope_const, slope_mat, last_slope, 2 / (slope_span + 1))
+
+    return {"ewma_stress": ewma, "ewma_slope_smooth": slope_smooth}
+
+def optimize_stress_schedule(
+    history: pd.DataFrame,
+    model,
+    feature_columns: list,
+    horizon: int = 14,
+    max_ewma: Optional[float] = None,
+    max_session_stress: Optional[float] = None,
+    min_rest_days: int = 0,
+    target_phase: Optional[str] = None,
+    tol: float = 5,
+    phase_baseline: str = "accumulating",
+    load_ewma_span: int = 7,
+    phase_ewma_span: int = 14,
+    slope_smooth_span: int = 7
+) -> Optional[tuple[pd.DataFrame, float]]:
+    """
+    Finds the per-day stress schedule that maximizes predicted performance on the last day of the plan.
+
+    The forecast EWMA and phase slope are affine in the schedule (fatigue_state_maps()), so the problem is a
+    small mixed-integer linear program: continuous stress per day, a binary training/rest flag per day, a linear
+    objective through the model's `ewma_stress` coefficient, and linear constraints for the EWMA cap and target
+    phase. Features other than `ewma_stress` and the phase are held at their last observed values.
+
+    :param history: Lift-day rows for one exercise, sorted by date, from the feature pipeline
+    :type history: pd.DataFrame
+    :param model: Fitted linear model from train_ridge_regression()
+    :param feature_columns: Encoded feature columns returned with the model
+    :param horizon: Number of days to plan
+    :param max_ewma: Upper bound on forecast EWMA on every day, default=None (no cap)
+    :param max_session_stress: Upper bound on stress per day, default=the exercise's historical max
+    :param min_rest_days: Minimum number of zero-stress days in the plan
+    :param target_phase: Fatigue phase required on the last day of the plan, default=None (any)
+    :param tol: Phase tolerance used by add_fatigue_phase()
+    :param phase_baseline: Baseline phase the model was encoded with
+    :param load_ewma_span: Load EWMA span the features were built with
+    :param phase_ewma_span: Phase EWMA span the features were built with
+    :param slope_smooth_span: Slope smoothing span the features were built with
+    :return: Returns (plan, predicted_performance), or None if the constraints are infeasible
+    :rtype: Optional[tuple[DataFrame, float]]
+    """
+    from scipy.optimize import Bounds, LinearConstraint, milp
+
+    last_row = history.iloc[-1]
+    maps = fatigue_state_maps(
+        last_row, horizon, load_span=load_ewma_span, phase_span=phase_ewma_span, slope_span=slope_smooth_span
+    )
+    ewma_const, ewma_mat = maps["ewma_stress"]
+    slope_const, slope_mat = maps["ewma_slope_smooth"]
+
+    if max_session_stress is None:
+        max_session_stress = float(history["stress"].max())
+
+    coef = pd.Series(model.coef_, index=feature_columns)
+    ewma_coef = float(coef.get("ewma_stress", 0.0))
+
+    # x = [stress_0..stress_{H-1}, train_0..train_{H-1}]
+    zeros = np.zeros((horizon, horizon))
+    c = np.concatenate((-ewma_coef * ewma_mat[-1], np.zeros(horizon)))
+
+    constraints = [
+        # stress only on training days
+        LinearConstraint(np.hstack((np.eye(horizon), -max_session_stress * np.eye(horizon))), -np.inf, 0),
+        LinearConstraint(np.concatenate((np.zeros(horizon), np.ones(horizon)))[None, :], -np.inf, horizon - min_rest_days),
+    ]
+
+    if max_ewma is not None:
+        constraints.append(LinearConstraint(np.hstack((ewma_mat, zeros)), -np.inf, max_ewma - ewma_const))
+
+    if target_phase is not None:
+        bounds = {
+            "accumulating": (tol, np.inf),
+            "recovering": (-np.inf, -tol),
+            "stable": (-tol, tol),
+        }
+        if target_phase not in bounds:
+            raise ValueError(f"Unknown target phase: {target_phase}")
+
+        lb, ub = bounds[target_phase]
+        row = np.concatenate((slope_mat[-1], np.zeros(horizon)))[None, :]
+        constraints.append(LinearConstraint(row, lb - slope_const[-1], ub - slope_const[-1]))
+
+    result = milp(
+        c,
+        integrality=np.concatenate((np.zeros(horizon), np.ones(horizon))),
+        bounds=Bounds(np.zeros(2 * horizon), np.concatenate((np.full(horizon, max_session_stress), np.ones(horizon)))),
+        constraints=constraints
+    )
+
+    if not result.success:
+        return None
+
+    # rest days are read off the schedule itself, so solver noise below 1e-9 is snapped to zero
+    stress = np.clip(result.x[:horizon], 0, None)
+    stress[stress < 1e-9] = 0.0
+    ewma = ewma_const + ewma_mat @ stress
+    slope = slope_const + slope_mat @ stress
+
+    plan = pd.DataFrame({
+        "day_ahead": np.arange(1, horizon + 1),
+        "planned_stress": stress,
+        "rest_day": stress == 0,
+        "forecasted_ewma": ewma,
+        "forecasted_slope_smooth": slope,
+    })
+
+    meet_row = history.iloc[[-1]].copy()
+    meet_row["ewma_stress"] = ewma[-1]
+    if target_phase is not None:
+        meet_row["fatigue_phase"] = target_phase
+
+    base_features = [c for c in ["ewma_stress", "fatigue_phase", "sessions_in_phase", "days_since_last_session"] if c in meet_row]
+    X = encode_fatigue_phase(meet_row[base_features], baseline=phase_baseline)
+    X = X.reindex(columns=feature_columns, fill_value=0)
+
+    return plan, float(model.predict(X)[0])
+
+def optimize_all_lifts(lift_day: pd.DataFrame, models: dict, **constraints) -> pd.DataFrame:
+    """
+    Runs optimize_stress_schedule() for every exercise that has a fitted model.
+
+    :param lift_day: The DataFrame produced by the feature pipeline
+    :type lift_day: pd.DataFrame
+    :param models: Dict of exercise -> (model, feature_columns)
+    :param constraints: Keyword arguments passed to optimize_stress_schedule()
+    :return: Returns the concatenated plans with `exercise` and `predicted_performance` columns; infeasible lifts are omitted
+    :rtype: DataFrame
+    """
+    plans = []
+
+    for exercise, history in lift_day.sort_values("date").groupby("exercise", sort=False):
+        if exercise not in models:
+            continue
+
+        model, feature_columns = models[exercise]
+        result = optimize_stress_schedule(history, model, feature_columns, **constraints)
+        if result is None:
+            continue
+
+        plan, predicted = result
+        plans.append(plan.assign(exercise=exercise, predicted_performance=predicted))
+
+    if not plans:
+        return pd.DataFrame()
+
+    return pd.concat(plans, ignore_index=True)
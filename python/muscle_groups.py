@@ -0,0 +1,164 @@
+import re
+import numpy as np
+import pandas as pd
+from feature_engineering import PHASE_LABELS, fatigue_phase_engine, grouped_ewma
+
+# Ordered (pattern, weights) rules matched against normalized exercise names; the first match wins, so more
+# specific patterns (e.g. "leg curl", "reverse fly") come before the general ones they overlap with.
+MUSCLE_GROUP_RULES = [
+    (r"leg curl", {"hamstrings": 1.0}),
+    (r"leg extension", {"quads": 1.0}),
+    (r"calf raise", {"calves": 1.0}),
+    (r"wrist|reverse curl", {"forearms": 1.0}),
+    (r"jefferson curl", {"hamstrings": 0.5, "lower_back": 0.5}),
+    (r"hip thrust|glute kickback|hip abductor", {"glutes": 1.0}),
+    (r"hip adductor", {"adductors": 1.0}),
+    (r"farmers carry|suitcase", {"forearms": 0.4, "core": 0.3, "upper_back": 0.3}),
+    (r"deadlift|rack pull|good morning|back extension|kettlebell swing|hang clean",
+     {"hamstrings": 0.35, "glutes": 0.3, "lower_back": 0.25, "upper_back": 0.1}),
+    (r"squat|leg press|lunge|step-up", {"quads": 0.6, "glutes": 0.3, "adductors": 0.1}),
+    (r"reverse fly|face pull", {"shoulders": 0.6, "upper_back": 0.4}),
+    (r"fly|crossover", {"chest": 0.85, "shoulders": 0.15}),
+    (r"overhead press|shoulder press|arnold press|push press", {"shoulders": 0.7, "triceps": 0.3}),
+    (r"bench|chest press|floor press|iso-lateral (horizontal|incline|chest)|chest dip",
+     {"chest": 0.6, "triceps": 0.25, "shoulders": 0.15}),
+    (r"raise|lateral swing|external rotation|internal rotation|full can", {"shoulders": 1.0}),
+    (r"triceps|skullcrusher", {"triceps": 1.0}),
+    (r"curl", {"biceps": 0.85, "forearms": 0.15}),
+    (r"shrug", {"upper_back": 1.0}),
+    (r"row|pulldown|pull up|chin up|dead hang|pullover", {"upper_back": 0.8, "biceps": 0.2}),
+    (r"crunch|russian twist|pallof|core", {"core": 1.0}),
+]
+
+MOVEMENT_PATTERN_RULES = [
+    (r"leg curl|leg extension|calf raise|hip abductor|hip adductor|glute kickback", {"lower_isolation": 1.0}),
+    (r"farmers carry|suitcase", {"carry": 1.0}),
+    (r"deadlift|rack pull|good morning|back extension|kettlebell swing|hang clean|jefferson|hip thrust", {"hinge": 1.0}),
+    (r"squat|leg press|lunge|step-up", {"squat": 1.0}),
+    (r"overhead press|shoulder press|arnold press|push press", {"vertical_push": 1.0}),
+    (r"reverse fly|face pull", {"horizontal_pull": 1.0}),
+    (r"bench|chest press|floor press|iso-lateral (horizontal|incline|chest)|chest dip|fly|crossover", {"horizontal_push": 1.0}),
+    (r"pulldown|pull up|chin up|dead hang|pullover", {"vertical_pull": 1.0}),
+    (r"row", {"horizontal_pull": 1.0}),
+    (r"crunch|russian twist|pallof|core", {"core": 1.0}),
+    (r"curl|triceps|skullcrusher|raise|lateral swing|rotation|full can|shrug|wrist", {"upper_isolation": 1.0}),
+]
+
+MAPPING_LEVELS = {
+    "muscle_group": MUSCLE_GROUP_RULES,
+    "movement_pattern": MOVEMENT_PATTERN_RULES,
+}
+
+UNMAPPED_GROUP = "other"
+
+def build_exercise_mapping(exercises, rules: list = MUSCLE_GROUP_RULES):
+    """
+    Builds a sparse exercise -> group weight matrix from ordered pattern rules.
+
+    :param exercises: Normalized exercise names, one matrix row each
+    :param rules: Ordered (regex, {group: weight}) rules; unmatched exercises map to "other"
+    :return: Returns (matrix, groups): a CSR matrix of shape (len(exercises), len(groups)) and the group names
+    :rtype: tuple[csr_matrix, list]
+    """
+    from scipy.sparse import csr_matrix
+
+    compiled = [(re.compile(pattern), weights) for pattern, weights in rules]
+    groups = sorted({g for _, weights in rules for g in weights}) + [UNMAPPED_GROUP]
+    group_index = {g: i for i, g in enumerate(groups)}
+
+    rows, cols, vals = [], [], []
+    for i, name in enumerate(exercises):
+        weights = next((w for pattern, w in compiled if pattern.search(name)), {UNMAPPED_GROUP: 1.0})
+        for group, weight in weights.items():
+            rows.append(i)
+            cols.append(group_index[group])
+            vals.append(weight)
+
+    matrix = csr_matrix((vals, (rows, cols)), shape=(len(exercises), len(groups)))
+    return matrix, groups
+
+def aggregate_group_daily_fatigue(
+    lift_day: pd.DataFrame,
+    level: str = "muscle_group",
+    key_cols: tuple = ("date",),
+    ewma_span: int = 7,
+    phase_ewma_span: int = 14,
+    slope_smooth_span: int = 7,
+    tol: float = 5
+) -> pd.DataFrame:
+    """
+    Rolls lift-day stress up to muscle groups or movement patterns, with EWMA and fatigue phase per group.
+
+    Stress is arranged as a sparse (key x exercise) matrix and multiplied once by the exercise mapping. The
+    product in CSC form is already ordered group by group, so its column pointers (split further wherever a
+    non-date key such as athlete changes) are the run offsets used by the stacked EWMA and phase engine, and no
+    per-group Python loop is needed.
+
+    :param lift_day: The DataFrame produced from add_stress_metrics()
+    :type lift_day: pd.DataFrame
+    :param level: "muscle_group" or "movement_pattern"
+    :param key_cols: Columns identifying one day (add an athlete column for multi-athlete data; each athlete is
+        smoothed and phased separately)
+    :param ewma_span: Span for the group stress EWMA, as in add_rolling_load()
+    :param phase_ewma_span: Span for EWMA smoothing, as in add_fatigue_phase()
+    :param slope_smooth_span: Span for slope smoothing, as in add_fatigue_phase()
+    :param tol: Tolerance for classifying stable phase
+    :return: Returns one row per key and group with nonzero stress, with group EWMA and phase columns
+    :rtype: DataFrame
+    """
+    from scipy.sparse import csr_matrix
+
+    if level not in MAPPING_LEVELS:
+        raise ValueError(f"Level must be one of {list(MAPPING_LEVELS)}")
+
+    # Keys are ordered series first and date last, so each series (e.g. one athlete) is contiguous within a group
+    series_cols = [c for c in key_cols if c != "date"]
+    key_cols = list(key_cols)
+    sort_cols = series_cols + [c for c in key_cols if c == "date"]
+    key_codes = lift_day.groupby(sort_cols, sort=True).ngroup().to_numpy()
+    keys = lift_day[key_cols].drop_duplicates().sort_values(sort_cols).reset_index(drop=True)
+
+    ex_codes, exercises = pd.factorize(lift_day["exercise"])
+    mapping, groups = build_exercise_mapping(exercises, MAPPING_LEVELS[level])
+
+    stress = csr_matrix(
+        (lift_day["stress"].to_numpy(dtype=float), (key_codes, ex_codes)),
+        shape=(len(keys), len(exercises))
+    )
+
+    group_stress = (stress @ mapping).tocsc()
+    group_stress.eliminate_zeros()
+    group_stress.sort_indices()
+
+    # A new EWMA / phase run starts at every group, and within a group wherever a non-date key column changes
+    nonempty = np.diff(group_stress.indptr) > 0
+    run_start = np.zeros(group_stress.nnz, dtype=bool)
+    run_start[group_stress.indptr[:-1][nonempty]] = True
+    if series_cols:
+        series = keys.groupby(series_cols, sort=True).ngroup().to_numpy()[group_stress.indices]
+        run_start[1:] |= series[1:] != series[:-1]
+    group_starts = np.flatnonzero(run_start)
+    group_names = np.repeat(np.array(groups, dtype=object), np.diff(group_stress.indptr))
+
+    values = group_stress.data
+    ewma = grouped_ewma(values, 2 / (ewma_span + 1), group_starts)[0]
+    smooth = grouped_ewma(ewma, 2 / (phase_ewma_span + 1), group_starts)[0]
+
+    slope = np.full(len(smooth), np.nan)
+    slope[1:] = np.diff(smooth)
+    slope[group_starts] = np.nan
+    slope_smooth = grouped_ewma(slope, 2 / (slope_smooth_span + 1), group_starts)[0]
+
+    phases = fatigue_phase_engine(slope_smooth, group_starts, tol=tol)
+
+    out = keys.iloc[group_stress.indices].reset_index(drop=True)
+    out[level] = group_names
+    out["stress"] = values
+    out["ewma_stress"] = ewma
+    out["ewma_smooth"] = smooth
+    out["ewma_slope_smooth"] = slope_smooth
+    out["fatigue_phase"] = PHASE_LABELS[phases["phase_code"]]
+    out["phase_group"] = phases["phase_group"]
+    out["sessions_in_phase"] = phases["sessions_in_phase"]
+
+    return out
@@ -0,0 +1,164 @@
+import itertools
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from feature_engineering import (
+    PHASE_ACCUMULATING,
+    PHASE_LABELS,
+    PHASE_RECOVERING,
+    PHASE_STABLE,
+    classify_phase_codes,
+    group_offsets,
+    grouped_ewma,
+    phase_runs,
+)
+from models.regression import encode_fatigue_phase
+
+def _alpha(span) -> np.ndarray:
+    return 2 / (np.asarray(span, dtype=float) + 1)
+
+def _grouped_diff(values: np.ndarray, group_starts: np.ndarray) -> np.ndarray:
+    diff = np.full(values.shape, np.nan)
+    diff[:, 1:] = values[:, 1:] - values[:, :-1]
+    diff[:, group_starts] = np.nan
+    return diff
+
+def _fit_ridge(X: pd.DataFrame, y: np.ndarray, alpha: float) -> dict:
+    if len(X) < 5:
+        return {"model_mse": np.nan, "model_r2": np.nan}
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
+
+    model = Ridge(alpha=alpha)
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+
+    return {
+        "model_mse": mean_squared_error(y_test, y_pred),
+        "model_r2": r2_score(y_test, y_pred),
+    }
+
+def sweep_fatigue_parameters(
+    lift_day: pd.DataFrame,
+    load_spans=(7,),
+    phase_spans=(14,),
+    slope_spans=(7,),
+    tols=(5,),
+    exit_tol: float | None = None,
+    pattern: str = "bench press",
+    target: str = "max_weight",
+    alpha: float = 1e4,
+    phase_baseline: str = "accumulating",
+    n_jobs: int = -1,
+) -> pd.DataFrame:
+    """
+    Evaluates a grid of fatigue-model hyperparameters in one batched computation.
+
+    Every span is applied as one stacked EWMA over the shared stress array: all load spans at once, then all
+    phase spans on each resulting EWMA, then all slope spans on each slope. Tolerances reuse the same smoothed
+    slopes. Per-combination Ridge fits for the lifts matching `pattern` run in parallel worker processes.
+
+    :param lift_day: The DataFrame produced from add_stress_metrics() and add_time_since_last_session()
+    :type lift_day: pd.DataFrame
+    :param load_spans: Candidate `ewma_span` values for add_rolling_load()
+    :param phase_spans: Candidate `ewma_span` values for add_fatigue_phase()
+    :param slope_spans: Candidate `slope_smooth_span` values for add_fatigue_phase()
+    :param tols: Candidate `tol` values for add_fatigue_phase()
+    :param exit_tol: Optional hysteresis tolerance, shared by all combinations
+    :param pattern: Exercise name pattern used for the downstream model fit
+    :param target: Target column for the downstream model
+    :param alpha: Ridge alpha for the downstream model
+    :param phase_baseline: Baseline phase for one-hot encoding
+    :param n_jobs: Number of worker processes for model fits, default=-1 (all cores)
+    :return: Returns one row per combination with phase statistics and model fit metrics
+    :rtype: DataFrame
+    """
+    df = lift_day.sort_values(["exercise", "date"])
+    group_starts = group_offsets(df["exercise"].to_numpy())
+    stress = df["stress"].to_numpy(dtype=float)
+
+    load_spans, phase_spans, slope_spans, tols = map(list, (load_spans, phase_spans, slope_spans, tols))
+    n_load, n_phase, n_slope = len(load_spans), len(phase_spans), len(slope_spans)
+
+    # (n_load, n) -> (n_load * n_phase, n) -> (n_load * n_phase * n_slope, n)
+    ewma = grouped_ewma(stress, _alpha(load_spans), group_starts)
+
+    smooth = grouped_ewma(
+        np.repeat(ewma, n_phase, axis=0),
+        np.tile(_alpha(phase_spans), n_load),
+        group_starts
+    )
+
+    slope_smooth = grouped_ewma(
+        np.repeat(_grouped_diff(smooth, group_starts), n_slope, axis=0),
+        np.tile(_alpha(slope_spans), n_load * n_phase),
+        group_starts
+    )
+
+    in_model = df["exercise"].str.contains(pattern, na=False).to_numpy()
+    model_base = df.loc[in_model, ["days_since_last_session", target]]
+
+    rows = []
+    model_inputs = []
+
+    for (i, load_span), (j, phase_span), (k, slope_span), tol in itertools.product(
+        enumerate(load_spans), enumerate(phase_spans), enumerate(slope_spans), tols
+    ):
+        slope_row = (i * n_phase + j) * n_slope + k
+        codes = classify_phase_codes(slope_smooth[slope_row], group_starts, tol=tol, exit_tol=exit_tol)
+        runs = phase_runs(codes, group_starts)
+
+        n_runs = int(runs["phase_transition"].sum())
+        rows.append({
+            "load_ewma_span": load_span,
+            "phase_ewma_span": phase_span,
+            "slope_smooth_span": slope_span,
+            "tol": tol,
+            "n_phases": n_runs,
+            "mean_sessions_per_phase": len(codes) / n_runs if n_runs else np.nan,
+            "share_accumulating": np.mean(codes == PHASE_ACCUMULATING),
+            "share_recovering": np.mean(codes == PHASE_RECOVERING),
+            "share_stable": np.mean(codes == PHASE_STABLE),
+        })
+
+        model_df = model_base.assign(
+            ewma_stress=ewma[i, in_model],
+            fatigue_phase=PHASE_LABELS[codes[in_model]],
+            sessions_in_phase=runs["sessions_in_phase"][in_model],
+        ).dropna()
+
+        X = encode_fatigue_phase(
+            model_df[["ewma_stress", "fatigue_phase", "sessions_in_phase", "days_since_last_session"]],
+            baseline=phase_baseline
+        )
+        model_inputs.append((X, model_df[target].to_numpy()))
+
+    fits = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_ridge)(X, y, alpha) for X, y in model_inputs
+    )
+
+    return pd.concat([pd.DataFrame(rows), pd.DataFrame(fits)], axis=1)
+
+if __name__ == "__main__":
+    from pathlib import Path
+    from run_pipeline import RIDGE_ALPHA_V1
+
+    processed_path = Path(__file__).resolve().parents[1] / "data" / "processed"
+    lift_day = pd.read_csv(processed_path / "training_lift_day_aggregates.csv", parse_dates=["date"])
+
+    results = sweep_fatigue_parameters(
+        lift_day,
+        load_spans=(5, 7, 10, 14),
+        phase_spans=(7, 14, 21),
+        slope_spans=(3, 7, 14),
+        tols=(2, 5, 10),
+        alpha=RIDGE_ALPHA_V1
+    )
+
+    print(results.sort_values("model_mse").head(10))
+    results.to_csv(processed_path / "fatigue_parameter_sweep.csv", index=False)
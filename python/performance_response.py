@@ -1,6 +1,5 @@
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
 def performance_response_curve(
     model,
@@ -9,7 +8,18 @@ def performance_response_curve(
     fatigue_min: float | None = None,
     fatigue_max: float | None = None,
     n_points: int = 100,
+    bootstrap=None,
+    level: float = 0.95,
 ) -> pd.DataFrame:
+    """
+    Predicts performance across a range of one fatigue feature, holding the other features at base_row.
+
+    :param bootstrap: Optional RidgeBootstrap from models.bootstrap.bootstrap_ridge(); adds `lower` and `upper`
+        percentile bands computed from every replicate in one matrix product
+    :param level: Band coverage
+    :return: Returns one row per grid point
+    :rtype: DataFrame
+    """
 
     if fatigue_feature not in base_row.index:
         raise ValueError(f"{fatigue_feature} not in base_row")
@@ -28,14 +38,11 @@ def performance_response_curve(
         int(n_points)
     )
 
-    rows = []
-
-    for val in fatigue_range:
-        row = base_row.copy()
-        row[fatigue_feature] = val
-        rows.append(row)
-
-    X = pd.DataFrame(rows)
+    X = pd.DataFrame(
+        np.tile(base_row.to_numpy(dtype=float), (len(fatigue_range), 1)),
+        columns=base_row.index
+    )
+    X[fatigue_feature] = fatigue_range
 
     predictions = model.predict(X)
 
@@ -44,6 +51,13 @@ def performance_response_curve(
         "predicted_performance": predictions
     })
 
+    if bootstrap is not None:
+        from models.bootstrap import percentile_interval
+
+        lower, upper = percentile_interval(bootstrap.predict(X[bootstrap.feature_names]), level, axis=0)
+        response_df["lower"] = lower
+        response_df["upper"] = upper
+
     response_df["is_current"] = np.isclose(
         response_df[fatigue_feature],
         base_value,
@@ -52,58 +66,99 @@ def performance_response_curve(
 
     return response_df
 
-def plot_predictions(response_df: pd.DataFrame, fatigue_feature: str = "ewma_stress") -> None:
-    plt.figure(figsize=(10, 6))
+def plot_predictions(response_df: pd.DataFrame, fatigue_feature: str = "ewma_stress", ax=None, title: str = "Predicted Performance vs Fatigue"):
+    """
+    Draws a response curve from performance_response_curve().
+
+    :param ax: Axes to draw on, default=None (a new pyplot figure)
+    :param title: Axes title
+    :return: Returns the figure drawn on
+    """
+    if ax is None:
+        import matplotlib.pyplot as plt
+        _, ax = plt.subplots(figsize=(10, 6))
 
-    plt.plot(
+    ax.plot(
         response_df[fatigue_feature],
         response_df["predicted_performance"],
         linewidth=2
     )
 
+    if "lower" in response_df:
+        ax.fill_between(
+            response_df[fatigue_feature],
+            response_df["lower"],
+            response_df["upper"],
+            alpha=0.2
+        )
+
     current_row = response_df[response_df["is_current"]]
 
     if not current_row.empty:
         current_fatigue = current_row[fatigue_feature].iloc[0]
         current_perf = current_row["predicted_performance"].iloc[0]
 
-        plt.axvline(
+        ax.axvline(
             current_fatigue,
             linestyle="--",
             linewidth=1.5
         )
 
-        plt.scatter(
+        ax.scatter(
             current_fatigue,
             current_perf,
             s=60,
             zorder=3
         )
 
-    plt.xlabel("Fatigue Level")
-    plt.ylabel("Predicted Performance")
-    plt.title("Predicted Performance vs Fatigue")
-    plt.tight_layout()
-    plt.show()
-
-def simulate_adaptation_gain(ewma_coef: float, current_ewma: float, pct_increase: float) -> dict:
+    ax.set_xlabel("Fatigue Level")
+    ax.set_ylabel("Predicted Performance")
+    ax.set_title(title)
+    ax.figure.tight_layout()
+
+    return ax.figure
+
+def simulate_adaptation_gain(ewma_coef: float, current_ewma: float, pct_increase: float, coef_samples: np.ndarray | None = None, level: float = 0.95) -> dict:
+    """
+    Predicts the strength gain from raising chronic load (EWMA stress) by a percentage.
+
+    :param ewma_coef: Point estimate of the ewma_stress coefficient
+    :param current_ewma: Current EWMA stress
+    :param pct_increase: Relative change in EWMA stress, e.g. 0.1
+    :param coef_samples: Optional bootstrap samples of the coefficient (RidgeBootstrap.coef_samples("ewma_stress")),
+        which add a percentile interval for the gain
+    :param level: Interval coverage
+    :return: Returns the scenario and its predicted gain
+    :rtype: dict
+    """
     target_ewma = current_ewma * (1 + pct_increase)
     delta_ewma = target_ewma - current_ewma
     predicted_gain = ewma_coef * delta_ewma
 
-    return {
+    result = {
         "pct_increase": pct_increase,
         "target_ewma": target_ewma,
         "delta_ewma": delta_ewma,
         "predicted_strength_gain": predicted_gain
     }
+
+    if coef_samples is not None:
+        from models.bootstrap import percentile_interval
+
+        lower, upper = percentile_interval(np.asarray(coef_samples) * delta_ewma, level)
+        result["gain_lower"] = lower
+        result["gain_upper"] = upper
+
+    return result
     
 
 if __name__ == "__main__":
     from pathlib import Path
     import pandas as pd
+    from models.bootstrap import bootstrap_ridge, percentile_interval
     from models.regression import (
         train_ridge_regression,
+        ridge_train_test_split,
         encode_fatigue_phase,
     )
 
@@ -143,6 +198,15 @@ if __name__ == "__main__":
 
     print("Elasticity:", elasticity)
 
+    X_train, _, y_train, _ = ridge_train_test_split(df, target, features, phase_baseline="accumulating")
+    boot = bootstrap_ridge(X_train[feature_columns], y_train, alpha=RIDGE_ALPHA_V1)
+
+    print("\nBootstrap Coefficient Intervals (95%):")
+    print(boot.coefficient_intervals())
+
+    elasticity_lower, elasticity_upper = percentile_interval(boot.coef_samples("ewma_stress") * mean_ewma / mean_perf)
+    print(f"Elasticity 95% interval: [{elasticity_lower:.4f}, {elasticity_upper:.4f}]")
+
     df_model = df[features + [target]].dropna().copy()
 
     X = encode_fatigue_phase(
@@ -157,7 +221,8 @@ if __name__ == "__main__":
     response_df = performance_response_curve(
         model=model,
         base_row=base_row,
-        fatigue_feature="ewma_stress"
+        fatigue_feature="ewma_stress",
+        bootstrap=boot
     )
 
     print("\nPerformance Response Curve Preview:")
@@ -176,7 +241,8 @@ if __name__ == "__main__":
         result = simulate_adaptation_gain(
             ewma_coef=ewma_coef,
             current_ewma=current_ewma,
-            pct_increase=pct
+            pct_increase=pct,
+            coef_samples=boot.coef_samples("ewma_stress")
         )
         results.append(result)
 
@@ -185,4 +251,7 @@ if __name__ == "__main__":
     print("\nAdaptation Simulation (Chronic Load Increase):")
     print(results_df)
 
-    plot_predictions(response_df)
\ No newline at end of file
+    import matplotlib.pyplot as plt
+
+    plot_predictions(response_df)
+    plt.show()
\ No newline at end of file
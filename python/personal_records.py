@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+RECORD_COLUMNS = ["datetime", "date", "e1rm", "weight", "reps", "previous_best"]
+
+class PersonalRecordIndex:
+    """
+    Running-max index of estimated 1RM per exercise, maintained incrementally as sets arrive.
+
+    `best` holds the current best e1RM per group, and `records` holds every set that beat its group's previous best,
+    kept in datetime order. Current bests are a dictionary read and PRs in a date range are a binary search over
+    the record timestamps, so neither query scans set history.
+    """
+
+    def __init__(self, key_cols: tuple = ("exercise",), value_col: str = "e1rm"):
+        self.key_cols = list(key_cols)
+        self.value_col = value_col
+        self.best = pd.DataFrame(columns=self.key_cols + [value_col, "datetime"]).set_index(self.key_cols)
+        self.records = pd.DataFrame(columns=self.key_cols + RECORD_COLUMNS)
+
+    @classmethod
+    def from_sets(cls, sets: pd.DataFrame, key_cols: tuple = ("exercise",), value_col: str = "e1rm") -> "PersonalRecordIndex":
+        """
+        Builds the index from a full set history.
+
+        :param sets: The DataFrame loaded from load_training_data()
+        :type sets: pd.DataFrame
+        :param key_cols: Columns identifying one record series (add an athlete column for multi-athlete data)
+        :param value_col: Column to track, default="e1rm"
+        :return: Returns the populated index
+        :rtype: PersonalRecordIndex
+        """
+        return cls(key_cols, value_col).update(sets)
+
+    def update(self, new_sets: pd.DataFrame) -> "PersonalRecordIndex":
+        """
+        Folds new sets into the index.
+
+        Within the batch, each set is compared with the running max of earlier sets in the batch and the stored best
+        for its group, all with a grouped cummax, so the cost is proportional to the new sets only.
+
+        :param new_sets: Sets logged after those already indexed
+        :type new_sets: pd.DataFrame
+        :return: Returns self
+        :rtype: PersonalRecordIndex
+        """
+        df = new_sets.dropna(subset=[self.value_col])
+        if df.empty:
+            return self
+
+        df = df.sort_values(self.key_cols + ["datetime", "set"] if "set" in df else self.key_cols + ["datetime"])
+        grouped = df.groupby(self.key_cols, sort=False)[self.value_col]
+
+        prior_in_batch = grouped.cummax().groupby([df[c] for c in self.key_cols], sort=False).shift()
+
+        keys = pd.MultiIndex.from_frame(df[self.key_cols])
+        stored = self.best[self.value_col].reindex(keys).to_numpy(dtype=float) if len(self.best) else np.full(len(df), np.nan)
+
+        previous = np.fmax(prior_in_batch.to_numpy(dtype=float), stored)
+        values = df[self.value_col].to_numpy(dtype=float)
+        is_record = np.isnan(previous) | (values > previous)
+
+        records = df.loc[is_record, self.key_cols + ["datetime", "date", "weight", "reps"]].copy()
+        records["e1rm"] = values[is_record]
+        records["previous_best"] = previous[is_record]
+
+        self.records = (
+            pd.concat([self.records, records[self.key_cols + RECORD_COLUMNS]], ignore_index=True)
+            if len(self.records) else records[self.key_cols + RECORD_COLUMNS].reset_index(drop=True)
+        )
+        if not self.records["datetime"].is_monotonic_increasing:
+            self.records = self.records.sort_values("datetime", kind="stable").reset_index(drop=True)
+
+        latest = records.groupby(self.key_cols, sort=False).tail(1).set_index(self.key_cols)
+        latest = latest.rename(columns={"e1rm": self.value_col})[[self.value_col, "datetime"]]
+        self.best = pd.concat([self.best.drop(latest.index, errors="ignore"), latest]) if len(self.best) else latest
+
+        return self
+
+    def current_best(self, exercise: Optional[str] = None) -> pd.DataFrame:
+        """
+        Returns the current best per group, optionally filtered by exercise name pattern.
+
+        :param exercise: Exercise name pattern
+        :return: Returns one row per group with the best value and when it was set
+        :rtype: DataFrame
+        """
+        best = self.best.reset_index()
+        if exercise is not None:
+            best = best[best["exercise"].str.contains(exercise, na=False)]
+        return best
+
+    def records_between(self, start, end, exercise: Optional[str] = None) -> pd.DataFrame:
+        """
+        Returns PRs set within the inclusive date range [start, end].
+
+        :param start: Range start date
+        :param end: Range end date (the whole day is included)
+        :param exercise: Exercise name pattern
+        :return: Returns the PR rows in datetime order
+        :rtype: DataFrame
+        """
+        times = self.records["datetime"].to_numpy(dtype="datetime64[ns]")
+        lo = np.searchsorted(times, np.datetime64(pd.Timestamp(start)), side="left")
+        hi = np.searchsorted(times, np.datetime64(pd.Timestamp(end) + pd.Timedelta(days=1)), side="left")
+
+        records = self.records.iloc[lo:hi]
+        if exercise is not None:
+            records = records[records["exercise"].str.contains(exercise, na=False)]
+        return records
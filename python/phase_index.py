@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+_DAY = np.timedelta64(1, "D")
+
+def _days(dates) -> np.ndarray:
+    return (pd.to_datetime(pd.Series(dates)).to_numpy(dtype="datetime64[D]") - np.datetime64(0, "D")) // _DAY
+
+class PhaseIntervalIndex:
+    """
+    Sorted interval index over fatigue phase summaries for point-in-time lookups.
+
+    Phases of one exercise never overlap, so each group's runs are stored as start/end day arrays sorted by
+    start (ends are then sorted too). All groups share one array keyed by (group code, day), which lets point,
+    range and bulk join queries run as np.searchsorted calls, O(log n) per query.
+    """
+
+    def __init__(self, summary: pd.DataFrame, key_cols: tuple = ("exercise",)):
+        """
+        :param summary: The DataFrame produced from aggregate_fatigue_phases()
+        :type summary: pd.DataFrame
+        :param key_cols: Columns identifying one phase series (add an athlete column for multi-athlete data)
+        """
+        self.key_cols = list(key_cols)
+
+        summary = summary.copy()
+        summary["_group"] = summary.groupby(self.key_cols, sort=True).ngroup()
+        summary["_start"] = _days(summary["start_date"])
+        summary["_end"] = _days(summary["end_date"])
+        self.summary = summary.sort_values(["_group", "_start"]).reset_index(drop=True)
+
+        self.groups = {
+            (key if isinstance(key, tuple) else (key,)): code
+            for key, code in self.summary.groupby(self.key_cols, sort=True)["_group"].first().items()
+        }
+
+        group = self.summary["_group"].to_numpy(dtype=np.int64)
+        self._starts = self._composite(group, self.summary["_start"].to_numpy())
+        self._ends = self._composite(group, self.summary["_end"].to_numpy())
+
+    @staticmethod
+    def _composite(group: np.ndarray, days: np.ndarray) -> np.ndarray:
+        # days since epoch fit comfortably in 32 bits, so group code and day pack into one sortable int64
+        return (np.asarray(group, dtype=np.int64) << 32) + (np.asarray(days, dtype=np.int64) + (1 << 31))
+
+    def _group_code(self, key) -> Optional[int]:
+        return self.groups.get(key if isinstance(key, tuple) else (key,))
+
+    def _locate(self, group: np.ndarray, days: np.ndarray, asof: bool) -> np.ndarray:
+        query = self._composite(group, days)
+        pos = np.searchsorted(self._starts, query, side="right") - 1
+
+        valid = (pos >= 0) & (group >= 0)
+        pos_safe = np.maximum(pos, 0)
+        valid &= self.summary["_group"].to_numpy()[pos_safe] == group
+        if not asof:
+            valid &= self._ends[pos_safe] >= query
+
+        return np.where(valid, pos, -1)
+
+    def lookup(self, key, date, asof: bool = False) -> Optional[pd.Series]:
+        """
+        Finds the phase in effect for one group on one date.
+
+        :param key: Group key, e.g. an exercise name
+        :param date: Date to look up
+        :param asof: Between phases (no session), return the most recent phase instead of None
+        :return: Returns the phase summary row, or None
+        :rtype: Optional[Series]
+        """
+        code = self._group_code(key)
+        if code is None:
+            return None
+
+        pos = self._locate(np.array([code]), _days([date]), asof)[0]
+        if pos < 0:
+            return None
+
+        return self.summary.iloc[pos].drop(["_group", "_start", "_end"])
+
+    def overlapping(self, key, start, end) -> pd.DataFrame:
+        """
+        Returns the phases of one group that overlap the inclusive date range [start, end].
+
+        :param key: Group key, e.g. an exercise name
+        :param start: Range start date
+        :param end: Range end date
+        :return: Returns the overlapping phase summary rows
+        :rtype: DataFrame
+        """
+        code = self._group_code(key)
+        if code is None:
+            return self.summary.iloc[0:0].drop(columns=["_group", "_start", "_end"])
+
+        lo = np.searchsorted(self._ends, self._composite(code, _days([start])[0]), side="left")
+        hi = np.searchsorted(self._starts, self._composite(code, _days([end])[0]), side="right")
+
+        return self.summary.iloc[lo:max(lo, hi)].drop(columns=["_group", "_start", "_end"])
+
+    def join(self, events: pd.DataFrame, date_col: str = "date", asof: bool = False, columns: tuple = ("phase_group", "fatigue_phase", "start_date", "end_date")) -> pd.DataFrame:
+        """
+        Attaches the phase in effect to every event row (e.g. PR attempts or injuries) in one vectorized pass.
+
+        :param events: Rows with the index key columns and a date column
+        :type events: pd.DataFrame
+        :param date_col: Event date column
+        :param asof: Between phases, use the most recent phase instead of leaving the row unmatched
+        :param columns: Phase summary columns to attach
+        :return: Returns events with the phase columns added (NaN where no phase matches)
+        :rtype: DataFrame
+        """
+        keys = pd.MultiIndex.from_frame(events[self.key_cols])
+        lookup = pd.Series(self.groups)
+        lookup.index = pd.MultiIndex.from_tuples(lookup.index, names=self.key_cols)
+        group = lookup.reindex(keys).fillna(-1).to_numpy(dtype=np.int64)
+
+        pos = self._locate(group, _days(events[date_col]), asof)
+        matched = pos >= 0
+
+        out = events.copy()
+        for col in columns:
+            values = self.summary[col].iloc[np.maximum(pos, 0)].to_numpy()
+            out[col] = pd.Series(values, index=events.index).where(matched)
+
+        return out
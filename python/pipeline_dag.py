@@ -0,0 +1,309 @@
+import ast
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+PYTHON_DIR = Path(__file__).resolve().parent
+CACHE_DIR = Path(__file__).resolve().parents[1] / "data" / "cache"
+DEFAULT_CACHE_BYTES = 512 * 1024 ** 2
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One node of the pipeline DAG.
+
+    `func` is called as func(*outputs_of_inputs, **params). `sources` are files read by the stage
+    (e.g. the raw CSV) whose contents are part of the cache key.
+    """
+    name: str
+    func: Callable
+    inputs: tuple = ()
+    params: dict = field(default_factory=dict)
+    sources: tuple = ()
+
+def file_checksum(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def atomic_write(path: Path, write: Callable[[Any], None], mode: str = "wb") -> str:
+    """
+    Writes a file through a temporary file in the same directory and renames it into place, so readers and
+    crashes never observe a partial file.
+
+    :param path: Destination path
+    :param write: Called with the open temporary file object
+    :param mode: File mode, "wb" or "w"
+    :return: Returns the SHA-256 checksum of the written file
+    :rtype: str
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        checksum = file_checksum(Path(tmp))
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+    return checksum
+
+def _module_file(name: str) -> Optional[Path]:
+    # Only modules under python/ are part of the pipeline's code; library modules are ignored
+    parts = name.split(".")
+    for candidate in (PYTHON_DIR.joinpath(*parts).with_suffix(".py"), PYTHON_DIR.joinpath(*parts, "__init__.py")):
+        if candidate.exists():
+            return candidate.resolve()
+    return None
+
+def _imported_files(path: Path) -> set:
+    """
+    Repo modules imported anywhere in a file, including imports inside functions.
+    """
+    names = set()
+    for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names.add(node.module)
+            names.update(f"{node.module}.{alias.name}" for alias in node.names)
+
+    return {f for f in map(_module_file, names) if f is not None}
+
+def module_closure(paths: Iterable[Path]) -> set:
+    """
+    :param paths: Repo module files
+    :return: Returns the files together with every repo module they import, transitively
+    :rtype: set
+    """
+    seen = set()
+    pending = [Path(p).resolve() for p in paths]
+    while pending:
+        path = pending.pop()
+        if path not in seen:
+            seen.add(path)
+            pending.extend(_imported_files(path) - seen)
+    return seen
+
+def _code_objects(code) -> Iterable:
+    yield code
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            yield from _code_objects(const)
+
+def _function_dependencies(func: Callable, own_file: Path, seen: set) -> set:
+    """
+    Repo module files a function's code can reach: modules of the globals it references (helpers defined in the
+    same file are followed into their own references) and modules it imports lazily.
+    """
+    files = set()
+    for code in _code_objects(func.__code__):
+        for name in code.co_names:
+            obj = func.__globals__.get(name)
+
+            if obj is None:
+                lazy = _module_file(name)
+                if lazy is not None:
+                    files |= module_closure([lazy])
+                continue
+
+            module = inspect.getmodule(obj)
+            path = getattr(module, "__file__", None)
+            if path is None or _module_file(module.__name__) is None:
+                continue
+
+            path = Path(path).resolve()
+            if path == own_file:
+                if inspect.isfunction(obj) and obj not in seen:
+                    seen.add(obj)
+                    files |= _function_dependencies(obj, own_file, seen)
+            else:
+                files |= module_closure([path])
+    return files
+
+def code_version(func: Callable) -> str:
+    """
+    Hashes the source of func's file and of every repo module func depends on, so an edit to the library code
+    behind a thin stage wrapper (e.g. feature_engineering.py behind run_pipeline.build_fatigue_phases)
+    invalidates the stage.
+
+    :param func: Stage function
+    :return: Returns a hex digest identifying the code version
+    :rtype: str
+    """
+    try:
+        own_file = Path(inspect.getsourcefile(func)).resolve()
+    except (TypeError, OSError):
+        return f"{func.__module__}.{getattr(func, '__qualname__', repr(func))}"
+
+    files = {own_file}
+    if inspect.isfunction(func):
+        files |= _function_dependencies(func, own_file, {func})
+
+    h = hashlib.sha256()
+    for path in sorted(files):
+        h.update(path.name.encode())
+        h.update(file_checksum(path).encode())
+    return h.hexdigest()
+
+def stage_key(stage: Stage, upstream_keys: Iterable[str]) -> str:
+    """
+    Builds the content-hash cache key for a stage from its upstream keys, parameters, sources and code version.
+
+    :param stage: The stage to key
+    :type stage: Stage
+    :param upstream_keys: Cache keys of the stage inputs, in order
+    :return: Returns a hex digest
+    :rtype: str
+    """
+    h = hashlib.sha256()
+    h.update(stage.name.encode())
+    h.update(code_version(stage.func).encode())
+
+    for key in upstream_keys:
+        h.update(key.encode())
+
+    h.update(repr(sorted(stage.params.items())).encode())
+
+    for source in stage.sources:
+        h.update(file_checksum(Path(source)).encode())
+
+    return h.hexdigest()
+
+class StageCache:
+    """
+    On-disk pickle cache of stage outputs with least-recently-used, size-bounded eviction.
+
+    File modification time doubles as the access time: hits touch the file, and eviction removes
+    the oldest files until the cache fits in `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return False, None
+
+        os.utime(path)
+        return True, value
+
+    def put(self, key: str, value: Any) -> None:
+        atomic_write(self._path(key), lambda f: pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL))
+
+        self.evict()
+
+    def evict(self) -> None:
+        entries = [(p.stat().st_mtime, p.stat().st_size, p) for p in self.cache_dir.glob("*.pkl")]
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+def resolve_keys(stages: list[Stage], targets: Optional[Iterable[str]] = None) -> dict:
+    """
+    Computes the cache key of every stage needed for `targets`, without running anything.
+
+    :param stages: All stages in the pipeline
+    :type stages: list[Stage]
+    :param targets: Names of stages whose outputs are wanted, default=all stages
+    :return: Returns a dict of stage name -> key in topological order (inputs before the stages that use them)
+    :rtype: dict
+    """
+    by_name = {s.name: s for s in stages}
+    targets = list(targets) if targets is not None else list(by_name)
+
+    keys: dict[str, str] = {}
+
+    def key_of(name: str, path: tuple = ()) -> str:
+        if name in keys:
+            return keys[name]
+        if name in path:
+            raise ValueError(f"Cycle detected in pipeline at stage: {name}")
+        if name not in by_name:
+            raise KeyError(f"Unknown pipeline stage: {name}")
+
+        stage = by_name[name]
+        upstream = [key_of(d, path + (name,)) for d in stage.inputs]
+        keys[name] = stage_key(stage, upstream)
+        return keys[name]
+
+    for target in targets:
+        key_of(target)
+
+    return keys
+
+def run_dag(stages: list[Stage], targets: Optional[Iterable[str]] = None, cache: Optional[StageCache] = None, verbose: bool = True) -> dict:
+    """
+    Runs the stages needed for `targets`, reusing cached outputs whose keys are unchanged.
+
+    Changing a stage's parameters only changes its key and those of its descendants, so a parameter
+    sweep recomputes just the affected downstream stages.
+
+    :param stages: All stages in the pipeline
+    :type stages: list[Stage]
+    :param targets: Names of stages whose outputs are wanted, default=all stages
+    :param cache: Stage cache, default=None (no caching)
+    :param verbose: Print whether each stage was computed or loaded from cache
+    :return: Returns a dict of stage name -> output for every stage that was resolved
+    :rtype: dict
+    """
+    by_name = {s.name: s for s in stages}
+    targets = list(targets) if targets is not None else list(by_name)
+
+    keys = resolve_keys(stages, targets)
+    outputs: dict[str, Any] = {}
+
+    # Keys depend only on parameters and sources, so upstream outputs are loaded only on a miss
+    def materialize(name: str) -> Any:
+        if name in outputs:
+            return outputs[name]
+
+        if cache is not None:
+            hit, value = cache.get(keys[name])
+            if hit:
+                if verbose:
+                    print(f"[cache] {name}")
+                outputs[name] = value
+                return value
+
+        stage = by_name[name]
+        value = stage.func(*[materialize(d) for d in stage.inputs], **stage.params)
+        if verbose:
+            print(f"[run]   {name}")
+
+        if cache is not None:
+            cache.put(keys[name], value)
+
+        outputs[name] = value
+        return value
+
+    for target in targets:
+        materialize(target)
+
+    return outputs
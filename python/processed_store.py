@@ -0,0 +1,242 @@
+import pandas as pd
+from pathlib import Path
+from typing import Iterator, Optional
+
+PROCESSED_DIR = Path(__file__).resolve().parents[1] / "data" / "processed"
+
+# Table name -> (file under data/processed/, date columns)
+TABLES = {
+    "sets": ("training_sets_normalized.csv", ("date", "datetime")),
+    "lift_day": ("training_lift_day_aggregates.csv", ("date",)),
+    "daily": ("training_global_daily_fatigue.csv", ("date",)),
+    "phase_summary": ("fatigue_phase_summary.csv", ("start_date", "end_date")),
+    "muscle_group_daily": ("training_muscle_group_daily_fatigue.csv", ("date",)),
+    "movement_pattern_daily": ("training_movement_pattern_daily_fatigue.csv", ("date",)),
+    "personal_records": ("training_personal_records.csv", ("datetime", "date")),
+    "model_bench_regression": ("model_bench_regression.csv", ("date",)),
+    "rollup_lift_day": ("rollup_lift_day.csv", ("date",)),
+    "rollup_session": ("rollup_session.csv", ("datetime", "date")),
+    "rollup_week": ("rollup_week.csv", ("week_start",)),
+    "rollup_exercise_week": ("rollup_exercise_week.csv", ("week_start",)),
+    "rollup_block": ("rollup_block.csv", ("block_start",)),
+    "rollup_exercise_block": ("rollup_exercise_block.csv", ("block_start",)),
+}
+
+FILTER_OPS = ("==", "!=", "<", "<=", ">", ">=", "in", "not in", "contains", "notnull")
+DEFAULT_BATCH_ROWS = 64 * 1024
+
+def _has_module(name: str) -> bool:
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
+
+class ProcessedStore:
+    """
+    In-process query layer over the processed outputs in "data/processed/", with no database server.
+
+    Every output is registered as a table (see TABLES). Scans read only the projected columns plus the columns
+    that filters need, parse the file in batches, and filter each batch as it is read, so at most one batch of
+    unfiltered rows is ever in memory. CSV cannot skip rows, so filters are applied after parsing rather than
+    pushed into the read: every row of the needed columns is still parsed. With pyarrow installed, batches are Arrow RecordBatches read by the
+    multithreaded Arrow CSV reader; otherwise they are pandas DataFrames read with the C parser. With duckdb
+    installed, query() also runs SQL over the same tables, and DuckDB pushes filters and projections into its scan.
+
+    Filters are (column, op, value) tuples combined with AND, with op one of FILTER_OPS. "contains" is a regex
+    match like Series.str.contains(), so ("exercise", "contains", "bench press") selects every bench variant.
+    """
+
+    def __init__(self, processed_dir: Path = PROCESSED_DIR, batch_rows: int = DEFAULT_BATCH_ROWS, engine: Optional[str] = None):
+        """
+        :param processed_dir: Directory holding the processed outputs
+        :param batch_rows: Target rows per streamed batch
+        :param engine: "arrow" or "pandas", default=arrow when pyarrow is installed
+        """
+        self.processed_dir = Path(processed_dir)
+        self.batch_rows = batch_rows
+        self.engine = engine or ("arrow" if _has_module("pyarrow") else "pandas")
+        self._duckdb = None
+
+    def path(self, table: str) -> Path:
+        if table not in TABLES:
+            raise KeyError(f"Unknown table: {table}. Tables: {list(TABLES)}")
+
+        path = self.processed_dir / TABLES[table][0]
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {path}")
+        return path
+
+    def tables(self) -> list:
+        """
+        :return: Returns the registered tables whose files exist
+        :rtype: list
+        """
+        return [t for t, (filename, _) in TABLES.items() if (self.processed_dir / filename).exists()]
+
+    def columns(self, table: str) -> list:
+        """
+        :return: Returns the column names of a table, read from its header only
+        :rtype: list
+        """
+        return list(pd.read_csv(self.path(table), nrows=0).columns)
+
+    def _plan(self, table: str, columns: Optional[list], filters: list) -> tuple[list, list, list]:
+        available = self.columns(table)
+        columns = list(available) if columns is None else list(columns)
+
+        for col, op, _ in filters:
+            if op not in FILTER_OPS:
+                raise ValueError(f"Filter op must be one of {FILTER_OPS}")
+            if col not in available:
+                raise KeyError(f"Unknown column {col} in table {table}")
+        missing = set(columns) - set(available)
+        if missing:
+            raise KeyError(f"Unknown columns {sorted(missing)} in table {table}")
+
+        needed = [c for c in available if c in set(columns) | {col for col, _, _ in filters}]
+        dates = [c for c in TABLES[table][1] if c in needed]
+        return columns, needed, dates
+
+    def scan(self, table: str, columns: Optional[list] = None, filters: Optional[list] = None) -> Iterator:
+        """
+        Streams the rows of a table that match the filters, projected to `columns`.
+
+        :param table: Table name from TABLES
+        :param columns: Columns to return, default=all
+        :param filters: (column, op, value) tuples, ANDed
+        :return: Yields pyarrow.RecordBatch (arrow engine) or DataFrame (pandas engine) batches
+        """
+        filters = list(filters or [])
+        columns, needed, dates = self._plan(table, columns, filters)
+
+        if self.engine == "arrow":
+            yield from self._scan_arrow(table, columns, needed, dates, filters)
+        else:
+            yield from self._scan_pandas(table, columns, needed, dates, filters)
+
+    def _scan_pandas(self, table: str, columns: list, needed: list, dates: list, filters: list) -> Iterator[pd.DataFrame]:
+        reader = pd.read_csv(self.path(table), usecols=needed, parse_dates=dates, chunksize=self.batch_rows)
+        for chunk in reader:
+            mask = pd.Series(True, index=chunk.index)
+            for col, op, value in filters:
+                mask &= _pandas_predicate(chunk[col], op, value)
+
+            batch = chunk.loc[mask, columns]
+            if len(batch):
+                yield batch
+
+    def _scan_arrow(self, table: str, columns: list, needed: list, dates: list, filters: list) -> Iterator:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pacsv
+
+        reader = pacsv.open_csv(
+            self.path(table),
+            read_options=pacsv.ReadOptions(block_size=1 << 22),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=needed,
+                column_types={c: pa.timestamp("ns") for c in dates},
+            ),
+        )
+        for batch in reader:
+            mask = None
+            for col, op, value in filters:
+                predicate = _arrow_predicate(pc, batch.column(col), op, value)
+                mask = predicate if mask is None else pc.and_kleene(mask, predicate)
+
+            if mask is not None:
+                batch = batch.filter(pc.fill_null(mask, False))
+            if batch.num_rows:
+                yield batch.select(columns)
+
+    def read(self, table: str, columns: Optional[list] = None, filters: Optional[list] = None) -> pd.DataFrame:
+        """
+        Runs scan() and collects the batches into one DataFrame.
+
+        :return: Returns the matching rows, projected to `columns`
+        :rtype: DataFrame
+        """
+        batches = list(self.scan(table, columns, filters))
+        if not batches:
+            columns, _, _ = self._plan(table, columns, list(filters or []))
+            return pd.DataFrame(columns=columns)
+
+        if self.engine == "arrow":
+            import pyarrow as pa
+            return pa.Table.from_batches(batches).to_pandas()
+
+        return pd.concat(batches, ignore_index=True)
+
+    def connect(self):
+        """
+        Opens an in-memory DuckDB connection with every existing processed output registered as a view.
+
+        :return: Returns the duckdb connection
+        """
+        if self._duckdb is None:
+            try:
+                import duckdb
+            except ImportError as e:
+                raise ImportError("SQL queries need the duckdb package; scan() and read() work without it") from e
+
+            con = duckdb.connect()
+            for table in self.tables():
+                path = str(self.path(table)).replace("'", "''")
+                con.execute(f"CREATE VIEW {table} AS SELECT * FROM read_csv_auto('{path}')")
+            self._duckdb = con
+
+        return self._duckdb
+
+    def query(self, sql: str, params: Optional[list] = None) -> pd.DataFrame:
+        """
+        Runs SQL over the registered tables, e.g. "SELECT date, max_weight FROM lift_day WHERE exercise = ?".
+
+        :param sql: SQL query
+        :param params: Positional query parameters
+        :return: Returns the result
+        :rtype: DataFrame
+        """
+        return self.connect().execute(sql, params or []).df()
+
+    def query_batches(self, sql: str, params: Optional[list] = None) -> Iterator:
+        """
+        Runs SQL over the registered tables and streams the result.
+
+        :return: Yields pyarrow.RecordBatch batches
+        """
+        result = self.connect().execute(sql, params or []).fetch_record_batch(self.batch_rows)
+        yield from result
+
+def _pandas_predicate(series: pd.Series, op: str, value) -> pd.Series:
+    if op == "contains":
+        return series.astype("string").str.contains(value, na=False).astype(bool)
+    if op == "notnull":
+        return series.notna()
+    if op in ("in", "not in"):
+        mask = series.isin(list(value))
+        return ~mask if op == "not in" else mask
+
+    value = pd.Timestamp(value) if pd.api.types.is_datetime64_any_dtype(series) else value
+    return {
+        "==": series.__eq__, "!=": series.__ne__, "<": series.__lt__,
+        "<=": series.__le__, ">": series.__gt__, ">=": series.__ge__,
+    }[op](value).fillna(False).astype(bool)
+
+def _arrow_predicate(pc, array, op: str, value):
+    import pyarrow as pa
+
+    if op == "contains":
+        return pc.match_substring_regex(array, value)
+    if op == "notnull":
+        return pc.is_valid(array)
+    if op in ("in", "not in"):
+        mask = pc.is_in(array, value_set=pa.array(list(value)))
+        return pc.invert(mask) if op == "not in" else mask
+
+    if pa.types.is_timestamp(array.type):
+        value = pa.scalar(pd.Timestamp(value).to_pydatetime(), type=array.type)
+    return {
+        "==": pc.equal, "!=": pc.not_equal, "<": pc.less,
+        "<=": pc.less_equal, ">": pc.greater, ">=": pc.greater_equal,
+    }[op](array, value)
@@ -0,0 +1,233 @@
+import json
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from pathlib import Path
+from pipeline_dag import atomic_write
+
+DEFAULT_COMPRESSION = 200
+COHORT_METRICS = ("ewma_stress", "stress", "max_weight")
+COHORT_SKETCH_FILE = "cohort_sketches.json" # One run's own sketches, written next to its processed outputs
+COHORT_MERGED_FILE = "cohort_sketches_merged.json" # Every batch partition merged: the cohort percentiles are scored against
+
+def _compress(means: np.ndarray, weights: np.ndarray, compression: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merges sorted centroids so that each one spans at most one unit of the t-digest scale function
+    k(q) = compression / (2 pi) * asin(2q - 1), which keeps centroids small in the tails and large near the median.
+    """
+    order = np.argsort(means, kind="stable")
+    means, weights = means[order], weights[order]
+
+    total = weights.sum()
+    q_left = (np.cumsum(weights) - weights) / total
+    k = compression / (2 * np.pi) * np.arcsin(np.clip(2 * q_left - 1, -1, 1))
+    cluster = np.floor(k - k[0]).astype(np.int64)
+
+    starts = np.flatnonzero(np.concatenate(([True], cluster[1:] != cluster[:-1])))
+    merged_weights = np.add.reduceat(weights, starts)
+    merged_means = np.add.reduceat(means * weights, starts) / merged_weights
+    return merged_means, merged_weights
+
+@dataclass
+class TDigest:
+    """
+    Mergeable quantile sketch (t-digest) holding about compression / 2 weighted centroids.
+
+    Building sorts a batch once and merges neighbours with np.add.reduceat; merging two digests concatenates
+    their centroids and compresses again, so partitions can be summarized independently and combined in any order.
+    """
+    means: np.ndarray
+    weights: np.ndarray
+    min: float
+    max: float
+    compression: float = DEFAULT_COMPRESSION
+
+    @classmethod
+    def from_values(cls, values, compression: float = DEFAULT_COMPRESSION) -> "TDigest":
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return cls(np.zeros(0), np.zeros(0), np.nan, np.nan, compression)
+
+        means, weights = _compress(values, np.ones(len(values)), compression)
+        return cls(means, weights, float(values.min()), float(values.max()), compression)
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            return other
+
+        means, weights = _compress(
+            np.concatenate((self.means, other.means)),
+            np.concatenate((self.weights, other.weights)),
+            self.compression
+        )
+        return TDigest(means, weights, min(self.min, other.min), max(self.max, other.max), self.compression)
+
+    def _knots(self) -> tuple[np.ndarray, np.ndarray]:
+        # Centroid centres on the cumulative weight axis, anchored by the exact min and max
+        centres = np.cumsum(self.weights) - self.weights / 2
+        return (
+            np.concatenate(([self.min], self.means, [self.max])),
+            np.concatenate(([0.0], centres, [self.count])),
+        )
+
+    def quantile(self, q):
+        """
+        :param q: Quantile(s) in [0, 1]
+        :return: Returns the estimated value(s) at q
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        values, ranks = self._knots()
+        return np.interp(np.asarray(q, dtype=float) * self.count, ranks, values)
+
+    def cdf(self, x):
+        """
+        :param x: Value(s)
+        :return: Returns the estimated fraction of observations at or below x
+        """
+        if self.count == 0:
+            return np.full(np.shape(x), np.nan) if np.ndim(x) else np.nan
+        values, ranks = self._knots()
+        return np.interp(np.asarray(x, dtype=float), values, ranks) / self.count
+
+    def to_dict(self) -> dict:
+        return {
+            "min": self.min, "max": self.max, "compression": self.compression,
+            "means": self.means.tolist(), "weights": self.weights.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "TDigest":
+        return cls(
+            np.asarray(state["means"], dtype=float), np.asarray(state["weights"], dtype=float),
+            state["min"], state["max"], state["compression"]
+        )
+
+class CohortSketches:
+    """
+    One TDigest per (key, metric), e.g. per (exercise, "ewma_stress"), for cohort percentile lookups.
+
+    Sketches are built per partition during feature computation, merged across partitions, and persisted as
+    JSON. A lookup interpolates over at most ~compression centroids, so its cost does not grow with the cohort.
+    """
+
+    def __init__(self, sketches: dict | None = None, key_cols: tuple = ("exercise",), compression: float = DEFAULT_COMPRESSION):
+        self.sketches: dict = sketches or {}
+        self.key_cols = list(key_cols)
+        self.compression = compression
+
+    @classmethod
+    def build(cls, lift_day: pd.DataFrame, metrics: tuple = COHORT_METRICS, key_cols: tuple = ("exercise",), compression: float = DEFAULT_COMPRESSION) -> "CohortSketches":
+        """
+        Sketches every metric per key from lift-day rows.
+
+        :param lift_day: The DataFrame produced from add_fatigue_phase() (or any frame with the metric columns)
+        :type lift_day: pd.DataFrame
+        :param metrics: Metric columns to sketch
+        :param key_cols: Columns identifying one cohort distribution
+        :param compression: t-digest compression; larger is more accurate and larger on disk
+        :return: Returns the sketches
+        :rtype: CohortSketches
+        """
+        sketches = {}
+        for key, rows in lift_day.groupby(list(key_cols), sort=True):
+            key = key if isinstance(key, tuple) else (key,)
+            for metric in metrics:
+                sketches[(key, metric)] = TDigest.from_values(rows[metric].to_numpy(dtype=float), compression)
+
+        return cls(sketches, key_cols, compression)
+
+    def merge(self, other: "CohortSketches") -> "CohortSketches":
+        """
+        :return: Returns new sketches covering both cohorts
+        :rtype: CohortSketches
+        """
+        merged = dict(self.sketches)
+        for k, digest in other.sketches.items():
+            merged[k] = merged[k].merge(digest) if k in merged else digest
+        return CohortSketches(merged, self.key_cols, self.compression)
+
+    def _digest(self, key, metric: str) -> TDigest | None:
+        return self.sketches.get((key if isinstance(key, tuple) else (key,), metric))
+
+    def percentile(self, key, metric: str, value) -> float:
+        """
+        :return: Returns where value falls in the cohort distribution, 0-100 (NaN for unknown keys)
+        :rtype: float
+        """
+        digest = self._digest(key, metric)
+        return np.nan if digest is None else 100 * digest.cdf(value)
+
+    def quantile(self, key, metric: str, q):
+        """
+        :return: Returns the cohort value at quantile q (0-1)
+        """
+        digest = self._digest(key, metric)
+        return np.nan if digest is None else digest.quantile(q)
+
+    def add_percentiles(self, df: pd.DataFrame, metrics: tuple = COHORT_METRICS) -> pd.DataFrame:
+        """
+        Adds `<metric>_cohort_pct` columns (0-100) to rows that carry the key columns, one cdf call per key.
+
+        :return: Returns df with the percentile columns added
+        :rtype: DataFrame
+        """
+        df = df.copy()
+        for metric in metrics:
+            out = np.full(len(df), np.nan)
+            for key, idx in df.groupby(self.key_cols, sort=False).indices.items():
+                digest = self._digest(key, metric)
+                if digest is not None:
+                    out[idx] = 100 * digest.cdf(df[metric].to_numpy(dtype=float)[idx])
+            df[f"{metric}_cohort_pct"] = out
+        return df
+
+    def save(self, path: Path) -> str:
+        """
+        Writes the sketches atomically as JSON.
+
+        :return: Returns the file checksum
+        :rtype: str
+        """
+        state = {
+            "key_cols": self.key_cols,
+            "compression": self.compression,
+            "sketches": [
+                {"key": list(key), "metric": metric, **digest.to_dict()}
+                for (key, metric), digest in self.sketches.items()
+            ],
+        }
+        return atomic_write(Path(path), lambda f: json.dump(state, f), mode="w")
+
+    @classmethod
+    def load(cls, path: Path) -> "CohortSketches":
+        with open(path) as f:
+            state = json.load(f)
+
+        sketches = {(tuple(s["key"]), s["metric"]): TDigest.from_dict(s) for s in state["sketches"]}
+        return cls(sketches, tuple(state["key_cols"]), state["compression"])
+
+def merge_sketch_files(paths, out_path: Path) -> CohortSketches:
+    """
+    Merges per-partition sketch files into one cohort file.
+
+    :param paths: Sketch files written by CohortSketches.save()
+    :param out_path: Destination for the merged sketches
+    :return: Returns the merged sketches
+    :rtype: CohortSketches
+    """
+    merged = None
+    for path in paths:
+        sketches = CohortSketches.load(path)
+        merged = sketches if merged is None else merged.merge(sketches)
+
+    if merged is not None:
+        merged.save(out_path)
+    return merged
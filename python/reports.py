@@ -0,0 +1,243 @@
+"""
+Headless report figures: one set of PNGs per (athlete, lift), rendered in parallel worker processes.
+
+Figures are drawn on matplotlib.figure.Figure objects rather than through pyplot, so nothing depends on a
+display or GUI backend, no global figure state leaks between lifts, and each figure is freed once saved.
+"""
+import re
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from processed_store import PROCESSED_DIR, ProcessedStore
+from quantile_sketch import COHORT_MERGED_FILE, COHORT_METRICS, CohortSketches
+
+REPORTS_DIR = Path(__file__).resolve().parents[1] / "data" / "reports"
+
+PHASE_COLORS = {
+    "accumulating": "red",
+    "stable": "gray",
+    "recovering": "green",
+}
+
+REPORT_COLUMNS = ["date", "exercise", "stress", "max_weight", "ewma_stress", "ewma_smooth", "ewma_slope_smooth", "fatigue_phase", "days_since_last_session"]
+RESPONSE_FEATURES = ["ewma_stress", "days_since_last_session", "fatigue_phase"]
+COHORT_FILE = "cohort_percentiles.csv"
+FORECAST_HORIZON = 21
+MIN_SESSIONS = 10
+
+def phase_segments(dates, values, phases) -> tuple[list, list]:
+    """
+    Splits a line into one polyline per run of consecutive points in the same phase.
+
+    Each segment between points i-1 and i takes the phase of point i, and every run starts at the last point
+    of the previous run so the line stays continuous.
+
+    :param dates: Dates, sorted ascending
+    :param values: Line values
+    :param phases: Phase label per point
+    :return: Returns (polylines as (k, 2) arrays of matplotlib date numbers and values, phase per polyline)
+    :rtype: tuple[list, list]
+    """
+    import matplotlib.dates as mdates
+
+    x = mdates.date2num(np.asarray(dates, dtype="datetime64[ns]"))
+    points = np.column_stack((x, np.asarray(values, dtype=float)))
+    phases = pd.Series(phases).to_numpy()
+
+    if len(points) < 2:
+        return [], []
+
+    # Segment i joins points i-1 and i; a new run starts wherever the segment phase changes
+    seg_phase = phases[1:]
+    starts = np.flatnonzero(np.concatenate(([True], seg_phase[1:] != seg_phase[:-1])))
+    ends = np.append(starts[1:], len(seg_phase))
+
+    lines = [points[s:e + 1] for s, e in zip(starts, ends)]
+    return lines, list(seg_phase[starts])
+
+def plot_phase_ewma(ax, dates, values, phases, linewidth: float = 1.5):
+    """
+    Draws a phase-colored EWMA line as a single LineCollection holding one polyline per phase run.
+
+    :param ax: Axes to draw on
+    :return: Returns the LineCollection
+    """
+    from matplotlib.collections import LineCollection
+    from matplotlib.lines import Line2D
+
+    lines, run_phases = phase_segments(dates, values, phases)
+    collection = LineCollection(lines, colors=[PHASE_COLORS.get(p, "gray") for p in run_phases], linewidths=linewidth)
+
+    ax.add_collection(collection)
+    ax.xaxis_date()
+    ax.autoscale_view()
+
+    legend_elements = [Line2D([0], [0], color=color, lw=2, label=phase.capitalize()) for phase, color in PHASE_COLORS.items()]
+    ax.legend(handles=legend_elements, title="Fatigue Phase", loc="upper left")
+    return collection
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", str(name).lower()).strip("_")
+
+def render_lift_figures(rows: pd.DataFrame, athlete: str, exercise: str, out_dir: Path, dpi: int = 100, horizon: int = FORECAST_HORIZON) -> list:
+    """
+    Renders the figure set for one lift: the phase-colored EWMA history with its smoothed slope, the fatigue
+    forecast scenarios, and the predicted performance response to fatigue from a Ridge model fit on the lift.
+
+    :param rows: Lift-day rows of one lift with REPORT_COLUMNS
+    :param athlete: Athlete / partition name, used for the output directory
+    :param exercise: Normalized exercise name
+    :param out_dir: Reports root; figures go to "<out_dir>/<athlete>/<exercise>_<figure>.png"
+    :param dpi: Output resolution
+    :param horizon: Forecast horizon in days
+    :return: Returns the written paths
+    :rtype: list
+    """
+    import matplotlib.dates as mdates
+    from matplotlib.figure import Figure
+    from models.ewma_forecast import forecast_fatigue_scenario, plot_forecast
+    from models.regression import encode_fatigue_phase
+    from performance_response import performance_response_curve, plot_predictions
+    from run_pipeline import RIDGE_ALPHA_V1
+    from sklearn.linear_model import Ridge
+
+    rows = rows.sort_values("date")
+    target_dir = Path(out_dir) / _slug(athlete)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    stem = _slug(exercise)
+    paths = []
+
+    fig = Figure(figsize=(12, 6))
+    ax1 = fig.add_subplot()
+    plot_phase_ewma(ax1, rows["date"], rows["ewma_smooth"], rows["fatigue_phase"])
+    ax1.set_ylabel("Fatigue Level (EWMA)")
+
+    ax2 = ax1.twinx()
+    # Dotted purple so the trend cannot be mistaken for a phase segment (red, gray, green) of the EWMA line
+    ax2.plot(rows["date"], rows["ewma_slope_smooth"], label="Smoothed EWMA Slope", color="tab:purple", linestyle=":", linewidth=1.2)
+    ax2.axhline(0, color="tab:purple", linestyle="--", linewidth=0.8, alpha=0.5)
+    ax2.legend(loc="upper right")
+    ax2.set_ylabel("Fatigue Trend (Δ)")
+
+    ax1.xaxis.set_major_locator(mdates.MonthLocator(interval=6))
+    ax1.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m"))
+    ax1.tick_params(axis="x", labelrotation=45)
+    title = f"{exercise.title()} Fatigue Level and Trend"
+    if "ewma_stress_cohort_pct" in rows and pd.notna(rows["ewma_stress_cohort_pct"].iloc[-1]):
+        title += f" (latest EWMA at cohort percentile {rows['ewma_stress_cohort_pct'].iloc[-1]:.0f})"
+    ax1.set_title(title)
+    ax1.set_xlabel("Date")
+    fig.tight_layout()
+
+    paths.append(target_dir / f"{stem}_phases.png")
+    fig.savefig(paths[-1], dpi=dpi)
+
+    scenarios = {
+        "maintain": forecast_fatigue_scenario(rows, horizon=horizon, mode="maintain"),
+        "reduce_30": forecast_fatigue_scenario(rows, horizon=horizon, mode="reduce"),
+        "deload": forecast_fatigue_scenario(rows, horizon=horizon, mode="deload"),
+    }
+
+    fig = Figure(figsize=(12, 6))
+    plot_forecast(
+        bench=rows,
+        scenarios=scenarios,
+        threshold=rows["ewma_stress"].quantile(0.25),
+        last_date=rows["date"].iloc[-1],
+        horizon=horizon,
+        ax=fig.add_subplot(),
+        title=f"EWMA Fatigue Forecasting Scenarios – {exercise.title()}"
+    )
+
+    paths.append(target_dir / f"{stem}_forecast.png")
+    fig.savefig(paths[-1], dpi=dpi)
+
+    # Same model as the bench regression, fit on this lift's own sessions
+    model_rows = rows[RESPONSE_FEATURES + ["max_weight"]].dropna()
+    if len(model_rows) >= MIN_SESSIONS:
+        X = encode_fatigue_phase(model_rows[RESPONSE_FEATURES], baseline="accumulating")
+        model = Ridge(alpha=RIDGE_ALPHA_V1).fit(X, model_rows["max_weight"])
+
+        fig = Figure(figsize=(10, 6))
+        plot_predictions(
+            performance_response_curve(model, X.iloc[-1], fatigue_feature="ewma_stress", n_points=101),
+            ax=fig.add_subplot(),
+            title=f"Predicted Performance vs Fatigue – {exercise.title()}"
+        )
+
+        paths.append(target_dir / f"{stem}_response.png")
+        fig.savefig(paths[-1], dpi=dpi)
+
+    return paths
+
+def cohort_percentile_table(lift_day: pd.DataFrame, cohort: CohortSketches, metrics: tuple = COHORT_METRICS) -> pd.DataFrame:
+    """
+    Scores each lift's latest session against the cohort: where its stress, EWMA and top weight fall among
+    every athlete's lift-days of that exercise.
+
+    :param lift_day: Lift-day rows of one athlete
+    :param cohort: Cohort sketches, e.g. the merged "data/processed/cohort_sketches.json" of a batch run
+    :param metrics: Metrics to score
+    :return: Returns one row per exercise with the metrics and their `<metric>_cohort_pct` columns
+    :rtype: DataFrame
+    """
+    latest = lift_day.sort_values("date").groupby("exercise", sort=True).tail(1)
+    columns = ["exercise", "date"] + [c for m in metrics for c in (m, f"{m}_cohort_pct")]
+    return cohort.add_percentiles(latest, metrics)[columns].sort_values("exercise").reset_index(drop=True)
+
+def _render_job(job: tuple) -> tuple:
+    athlete, exercise, rows, out_dir, dpi = job
+    return athlete, exercise, render_lift_figures(rows, athlete, exercise, out_dir, dpi=dpi)
+
+def _report_jobs(processed_dirs: dict, out_dir: Path, exercises: Optional[list], min_sessions: int, dpi: int, cohort: Optional[CohortSketches]):
+    for athlete, processed_dir in processed_dirs.items():
+        filters = [("exercise", "in", list(exercises))] if exercises else None
+        lift_day = ProcessedStore(processed_dir).read("lift_day", columns=REPORT_COLUMNS, filters=filters)
+
+        if cohort is not None and len(lift_day):
+            lift_day = cohort.add_percentiles(lift_day, ("ewma_stress",))
+            target_dir = out_dir / _slug(athlete)
+            target_dir.mkdir(parents=True, exist_ok=True)
+            cohort_percentile_table(lift_day, cohort).to_csv(target_dir / COHORT_FILE, index=False)
+
+        for exercise, rows in lift_day.groupby("exercise", sort=True):
+            if len(rows) >= min_sessions:
+                yield athlete, exercise, rows, out_dir, dpi
+
+def render_reports(
+    processed_dirs: Optional[dict] = None,
+    out_dir: Path = REPORTS_DIR,
+    exercises: Optional[list] = None,
+    min_sessions: int = MIN_SESSIONS,
+    max_workers: Optional[int] = None,
+    dpi: int = 100,
+    cohort_path: Optional[Path] = None
+) -> dict:
+    """
+    Renders every (athlete, lift) figure set to files across a pool of worker processes.
+
+    When merged cohort sketches exist, each athlete also gets "<out_dir>/<athlete>/cohort_percentiles.csv" scoring every
+    lift's latest session against the cohort, and the phase figures show the latest EWMA's cohort percentile.
+
+    :param processed_dirs: Dict of athlete name -> processed output directory, default={"default": "data/processed/"}
+    :param out_dir: Reports root directory
+    :param exercises: Only render these exercises, default=all with at least `min_sessions` lift-days
+    :param min_sessions: Lifts with fewer lift-days are skipped
+    :param max_workers: Worker processes, default=CPU count
+    :param dpi: Output resolution
+    :param cohort_path: Cohort sketch file, default="data/processed/cohort_sketches_merged.json" from `batch`
+        (skipped if missing)
+    :return: Returns a dict of (athlete, exercise) -> written paths
+    :rtype: dict
+    """
+    processed_dirs = {"default": PROCESSED_DIR} if processed_dirs is None else processed_dirs
+    cohort_path = PROCESSED_DIR / COHORT_MERGED_FILE if cohort_path is None else Path(cohort_path)
+    cohort = CohortSketches.load(cohort_path) if cohort_path.exists() else None
+    jobs = _report_jobs(processed_dirs, Path(out_dir), exercises, min_sessions, dpi, cohort)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(_render_job, jobs, chunksize=4)
+        return {(athlete, exercise): paths for athlete, exercise, paths in results}
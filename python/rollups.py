@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Optional
+from pipeline_dag import atomic_write
+
+PROCESSED_DIR = Path(__file__).resolve().parents[1] / "data" / "processed"
+CUBE_LEVELS = ("lift_day", "session", "week", "exercise_week", "block", "exercise_block")
+
+def _codes(*code_arrays: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Combines already factorized integer codes into one dense code per distinct combination.
+
+    :return: Returns (codes, first_row) where first_row[g] is the first row of combination g
+    """
+    combined = code_arrays[0].astype(np.int64)
+    for codes in code_arrays[1:]:
+        combined = combined * (int(codes.max()) + 1 if len(codes) else 1) + codes
+
+    _, first_row, inverse = np.unique(combined, return_index=True, return_inverse=True)
+    return inverse, first_row
+
+def _measures(codes: np.ndarray, n: int, weight: np.ndarray, reps: np.ndarray, rpe: np.ndarray, volume: np.ndarray, set_order: np.ndarray, ex_codes: np.ndarray) -> dict:
+    has_rpe = ~np.isnan(rpe)
+
+    max_weight = np.full(n, -np.inf)
+    np.maximum.at(max_weight, codes, weight)
+
+    rpe_count = np.bincount(codes, weights=has_rpe, minlength=n)
+    rpe_sum = np.bincount(codes, weights=np.where(has_rpe, rpe, 0.0), minlength=n)
+
+    pair_codes, _ = _codes(codes, ex_codes)
+    _, pair_first = np.unique(pair_codes, return_index=True)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_rpe = rpe_sum / rpe_count
+
+    return {
+        "total_volume": np.bincount(codes, weights=volume, minlength=n),
+        "max_weight": max_weight,
+        # counted like aggregate_lift_day(): rows whose Set Order parsed as a number
+        "total_sets": np.bincount(codes, weights=~np.isnan(set_order), minlength=n).astype(np.int64),
+        "total_reps": np.bincount(codes, weights=reps, minlength=n),
+        "mean_rpe": mean_rpe,
+        "num_lifts": np.bincount(codes[pair_first], minlength=n),
+    }
+
+def build_rollup_cube(sets: pd.DataFrame, block_weeks: int = 4) -> dict:
+    """
+    Aggregates set-level data to lift-day, session, week and training-block levels in one pass.
+
+    Dates, exercises and sessions are factorized once; week and block codes are derived per distinct date and
+    broadcast back, and every level is then a set of np.bincount reductions over the same set arrays. Stress is
+    defined per lift-day (as in add_stress_metrics()), so higher levels sum lift-day stress through the lift-day codes.
+
+    :param sets: The DataFrame loaded from load_training_data()
+    :type sets: pd.DataFrame
+    :param block_weeks: Number of calendar weeks per training block
+    :return: Returns a dict of level name -> DataFrame for every level in CUBE_LEVELS
+    :rtype: dict
+    """
+    date_codes, dates = pd.factorize(sets["date"], sort=True)
+    ex_codes, exercises = pd.factorize(sets["exercise"], sort=True)
+    session_codes, _ = pd.factorize(sets["datetime"], sort=True)
+
+    dates = pd.DatetimeIndex(dates)
+    week_starts = (dates - pd.to_timedelta(dates.weekday, unit="D")).normalize()
+    week_of_date, weeks = pd.factorize(week_starts, sort=True)
+    weeks = pd.DatetimeIndex(weeks)
+    block_of_week = ((weeks - weeks.min()).days // (7 * block_weeks)).to_numpy()
+
+    week_codes = week_of_date[date_codes]
+    block_codes = block_of_week[week_codes]
+
+    weight = sets["weight"].to_numpy(dtype=float)
+    reps = sets["reps"].to_numpy(dtype=float)
+    rpe = sets["rpe"].to_numpy(dtype=float)
+    volume = sets["volume"].to_numpy(dtype=float)
+    set_order = sets["set"].to_numpy(dtype=float)
+    arrays = (weight, reps, rpe, volume, set_order, ex_codes)
+
+    # Lift-day level and its stress, shared by the coarser levels
+    ld_codes, ld_first = _codes(date_codes, ex_codes)
+    lift_day = pd.DataFrame({
+        "date": dates[date_codes[ld_first]],
+        "exercise": exercises[ex_codes[ld_first]],
+        **_measures(ld_codes, len(ld_first), *arrays),
+    }).drop(columns="num_lifts")
+    lift_day["rpe_coverage"] = (
+        np.bincount(ld_codes, weights=~np.isnan(rpe), minlength=len(ld_first))
+        / np.bincount(ld_codes, minlength=len(ld_first))
+    )
+    lift_day["stress"] = np.where(
+        lift_day["rpe_coverage"] > 0,
+        lift_day["total_volume"] * lift_day["mean_rpe"],
+        lift_day["total_volume"]
+    )
+    ld_stress = lift_day["stress"].to_numpy()
+
+    def stress_by(codes: np.ndarray, n: int) -> np.ndarray:
+        # each lift-day row belongs to exactly one group of any coarser date-based level
+        return np.bincount(codes[ld_first], weights=ld_stress, minlength=n)
+
+    cube = {"lift_day": lift_day}
+
+    n_sessions = int(session_codes.max()) + 1 if len(session_codes) else 0
+    _, session_first = np.unique(session_codes, return_index=True)
+    session_stress_codes, session_stress_first = _codes(session_codes, ex_codes)
+    session = pd.DataFrame({
+        "datetime": sets["datetime"].to_numpy()[session_first],
+        "date": dates[date_codes[session_first]],
+        "workout": sets["workout"].to_numpy()[session_first],
+        "duration_min": sets["duration_min"].to_numpy(dtype=float)[session_first] if "duration_min" in sets else np.nan,
+        **_measures(session_codes, n_sessions, *arrays),
+    })
+    cube["session"] = session
+
+    # A date can hold several sessions, so session stress is split back from its (session, exercise) volume share
+    pair_volume = np.bincount(session_stress_codes, weights=volume)
+    ld_of_pair = ld_codes[session_stress_first]
+    ld_volume = lift_day["total_volume"].to_numpy()[ld_of_pair]
+    pair_stress = ld_stress[ld_of_pair] * np.divide(pair_volume, ld_volume, out=np.zeros_like(pair_volume), where=ld_volume > 0)
+    session["total_stress"] = np.bincount(session_codes[session_stress_first], weights=pair_stress, minlength=n_sessions)
+
+    session_duration = session["duration_min"].fillna(0).to_numpy()
+    session_week = week_codes[session_first]
+    session_block = block_codes[session_first]
+
+    for level, codes, labels, session_level in (
+        ("week", week_codes, {"week_start": weeks}, session_week),
+        ("block", block_codes, {"block": np.arange(int(block_codes.max()) + 1 if len(block_codes) else 0)}, session_block),
+    ):
+        n = len(next(iter(labels.values())))
+        frame = pd.DataFrame({
+            **labels,
+            **_measures(codes, n, *arrays),
+            "total_stress": stress_by(codes, n),
+            "num_sessions": np.bincount(session_level, minlength=n),
+            "total_duration_min": np.bincount(session_level, weights=session_duration, minlength=n),
+        })
+        if level == "block":
+            frame.insert(1, "block_start", weeks.min() + pd.to_timedelta(frame["block"] * 7 * block_weeks, unit="D"))
+        cube[level] = frame.loc[np.bincount(codes, minlength=n) > 0].reset_index(drop=True)
+
+        ex_level_codes, ex_level_first = _codes(codes, ex_codes)
+        ex_frame = pd.DataFrame({
+            next(iter(labels)): next(iter(labels.values()))[codes[ex_level_first]],
+            "exercise": exercises[ex_codes[ex_level_first]],
+            **_measures(ex_level_codes, len(ex_level_first), *arrays),
+            "total_stress": np.bincount(ex_level_codes[ld_first], weights=ld_stress, minlength=len(ex_level_first)),
+        }).drop(columns="num_lifts")
+        cube[f"exercise_{level}"] = ex_frame
+
+    return cube
+
+def write_rollup_cube(cube: dict, out_dir: Path = PROCESSED_DIR) -> dict:
+    """
+    Materializes every cube level as "data/processed/rollup_<level>.csv".
+
+    :param cube: The dict produced from build_rollup_cube()
+    :param out_dir: Output directory
+    :return: Returns a dict of filename -> checksum
+    :rtype: dict
+    """
+    checksums = {}
+    for level, frame in cube.items():
+        filename = f"rollup_{level}.csv"
+        checksums[filename] = atomic_write(Path(out_dir) / filename, lambda f: frame.to_csv(f, index=False), mode="w")
+
+    return checksums
+
+def query_cube(cube: dict, level: str, start: Optional[str] = None, end: Optional[str] = None, exercise: Optional[str] = None) -> pd.DataFrame:
+    """
+    Reads one cube level filtered by date range and exercise pattern, without touching set-level data.
+
+    :param cube: The dict produced from build_rollup_cube()
+    :param level: One of CUBE_LEVELS
+    :param start: Inclusive start date
+    :param end: Inclusive end date
+    :param exercise: Exercise name pattern (levels with an exercise column only)
+    :return: Returns the matching rows
+    :rtype: DataFrame
+    """
+    if level not in cube:
+        raise ValueError(f"Level must be one of {list(cube)}")
+
+    frame = cube[level]
+    date_col = next((c for c in ("date", "week_start", "block_start") if c in frame), None)
+
+    mask = np.ones(len(frame), dtype=bool)
+    if date_col is not None and start is not None:
+        mask &= (frame[date_col] >= pd.Timestamp(start)).to_numpy()
+    if date_col is not None and end is not None:
+        mask &= (frame[date_col] <= pd.Timestamp(end)).to_numpy()
+    if exercise is not None:
+        if "exercise" not in frame:
+            raise ValueError(f"Level {level} has no exercise column")
+        mask &= frame["exercise"].str.contains(exercise, na=False).to_numpy()
+
+    return frame.loc[mask]
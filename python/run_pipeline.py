@@ -1,5 +1,7 @@
-from load_data import load_training_data
+from load_data import DATA_DIR, load_training_data
+import json
 import pandas as pd
+from datetime import datetime, timezone
 from pathlib import Path
 from feature_engineering import (
     aggregate_lift_day,
@@ -14,11 +16,20 @@ from feature_engineering import (
     add_stress_deviation
 )
 from models.regression import train_regression_model, train_ridge_regression
+from muscle_groups import aggregate_group_daily_fatigue
+from personal_records import PersonalRecordIndex
+from feature_store import FeatureStore
+from pipeline_dag import Stage, StageCache, atomic_write, run_dag
+from processed_store import TABLES
+from quantile_sketch import COHORT_SKETCH_FILE, CohortSketches
+from rollups import build_rollup_cube, write_rollup_cube
 
 PROCESSED_DIR = Path(__file__).resolve().parents[1] / "data" / "processed"
 RIDGE_ALPHA_V1 = 1e4 # Pre-determined best alpha from prior tuning using tune_ridge_alpha
+FEATURE_VERSION_FILE = "feature_version.json" # Feature store version the processed files were committed as
+TRAINING_RUN_FILE = "ridge_regression_training.json" # Provenance of ridge_regression_coefficients.csv
 
-def write_output(df: pd.DataFrame, filename: str) -> None:
+def write_output(df: pd.DataFrame, filename: str, out_dir: Path = PROCESSED_DIR) -> str:
     """
     Helper function to write output files and print a notification to console.
     
@@ -26,37 +37,178 @@ def write_output(df: pd.DataFrame, filename: str) -> None:
     :type df: pd.DataFrame
     :param filename: Filename for output ex:"training_sets_normalized.csv". Writes to path "data/processed/---"
     :type filename: str
+    :param out_dir: Output directory, default="data/processed/"
+    :return: Returns the checksum of the written file
+    :rtype: str
     """
-    out_path = PROCESSED_DIR / filename
-    df.to_csv(out_path, index=False)
+    out_path = Path(out_dir) / filename
+    checksum = atomic_write(out_path, lambda f: df.to_csv(f, index=False), mode="w")
 
     print(f"Saved normalized data to {out_path}")
+    return checksum
     
 
-def main():
-    PROCESSED_DIR.mkdir(exist_ok=True)
-
-    df = load_training_data()
+def build_lift_day(df: pd.DataFrame) -> pd.DataFrame:
+    lift_day = aggregate_lift_day(df)
+    return add_stress_metrics(lift_day)
 
-    write_output(df, "training_sets_normalized.csv")
+def build_training_load(lift_day: pd.DataFrame, windows=(7, 14), ewma_span: int = 7) -> pd.DataFrame:
+    lift_day = add_rolling_load(lift_day, windows=windows, ewma_span=ewma_span)
+    return add_time_since_last_session(lift_day)
 
-    lift_day = aggregate_lift_day(df)
-    lift_day = add_stress_metrics(lift_day)
-    lift_day = add_rolling_load(lift_day)
-    lift_day = add_time_since_last_session(lift_day)
-    lift_day = add_fatigue_phase(lift_day)
+def build_fatigue_phases(lift_day: pd.DataFrame, ewma_span: int = 14, slope_smooth_span: int = 7, tol: float = 5, exit_tol: float | None = None, method: str = "slope", penalty: float = 3.0) -> pd.DataFrame:
+    lift_day = add_fatigue_phase(
+        lift_day,
+        ewma_span=ewma_span,
+        slope_smooth_span=slope_smooth_span,
+        tol=tol,
+        exit_tol=exit_tol,
+        method=method,
+        penalty=penalty
+    )
     lift_day = add_phase_dynamics(lift_day)
     lift_day = add_phase_transition_flags(lift_day)
-    lift_day = add_stress_deviation(lift_day)
-    write_output(lift_day, "training_lift_day_aggregates.csv")
+    return add_stress_deviation(lift_day)
 
-    daily = aggregate_global_daily_fatigue(lift_day)
-    write_output(daily, "training_global_daily_fatigue.csv")
+def build_personal_records(sets: pd.DataFrame) -> PersonalRecordIndex:
+    return PersonalRecordIndex.from_sets(sets)
 
-    phase_summary = aggregate_fatigue_phases(lift_day)
-    write_output(phase_summary, "fatigue_phase_summary.csv")
+def build_cohort_sketches(lift_day: pd.DataFrame) -> CohortSketches:
+    return CohortSketches.build(lift_day)
 
+def build_pipeline_stages(filename: str = "strong_workouts.csv", windows=(7, 14), load_ewma_span: int = 7, phase_ewma_span: int = 14, slope_smooth_span: int = 7, tol: float = 5, exit_tol: float | None = None, phase_method: str = "slope", changepoint_penalty: float = 3.0, block_weeks: int = 4, e1rm_formula: str = "epley") -> list[Stage]:
+    """
+    Describes the feature pipeline as a DAG of cacheable stages.
+
+    Each parameter belongs to exactly one stage, so changing e.g. `tol` reuses the cached ingestion,
+    aggregation and rolling-load outputs and only recomputes the phase stage and phase summary.
+
+    :param filename: Raw export under "data/raw/"
+    :param windows: Rolling stress windows passed to add_rolling_load()
+    :param load_ewma_span: `ewma_span` passed to add_rolling_load()
+    :param phase_ewma_span: `ewma_span` passed to add_fatigue_phase()
+    :param slope_smooth_span: `slope_smooth_span` passed to add_fatigue_phase()
+    :param tol: `tol` passed to add_fatigue_phase()
+    :param exit_tol: `exit_tol` passed to add_fatigue_phase()
+    :param phase_method: `method` passed to add_fatigue_phase()
+    :param changepoint_penalty: `penalty` passed to add_fatigue_phase()
+    :param block_weeks: Training block length passed to build_rollup_cube()
+    :param e1rm_formula: `e1rm_formula` passed to load_training_data()
+    :return: Returns the list of pipeline stages
+    :rtype: list[Stage]
+    """
+    return [
+        Stage("sets", load_training_data, params={"filename": filename, "e1rm_formula": e1rm_formula}, sources=(DATA_DIR / filename,)),
+        Stage("lift_day", build_lift_day, inputs=("sets",)),
+        Stage("training_load", build_training_load, inputs=("lift_day",),
+              params={"windows": tuple(windows), "ewma_span": load_ewma_span}),
+        Stage("fatigue_phases", build_fatigue_phases, inputs=("training_load",),
+              params={"ewma_span": phase_ewma_span, "slope_smooth_span": slope_smooth_span, "tol": tol, "exit_tol": exit_tol,
+                      "method": phase_method, "penalty": changepoint_penalty}),
+        Stage("daily", aggregate_global_daily_fatigue, inputs=("training_load",)),
+        Stage("phase_summary", aggregate_fatigue_phases, inputs=("fatigue_phases",)),
+        Stage("rollup_cube", build_rollup_cube, inputs=("sets",), params={"block_weeks": block_weeks}),
+        Stage("muscle_group_daily", aggregate_group_daily_fatigue, inputs=("lift_day",),
+              params={"level": "muscle_group", "ewma_span": load_ewma_span, "phase_ewma_span": phase_ewma_span,
+                      "slope_smooth_span": slope_smooth_span, "tol": tol}),
+        Stage("movement_pattern_daily", aggregate_group_daily_fatigue, inputs=("lift_day",),
+              params={"level": "movement_pattern", "ewma_span": load_ewma_span, "phase_ewma_span": phase_ewma_span,
+                      "slope_smooth_span": slope_smooth_span, "tol": tol}),
+        Stage("personal_records", build_personal_records, inputs=("sets",)),
+        Stage("cohort_sketches", build_cohort_sketches, inputs=("fatigue_phases",)),
+    ]
+
+def build_features(use_cache: bool = True, snapshot: bool = True) -> dict:
+    """
+    Runs the feature pipeline and writes the processed outputs to "data/processed/".
 
+    :param use_cache: Reuse cached stage outputs from "data/cache/"
+    :param snapshot: Also commit the outputs as a new version in the feature store ("data/feature_store/")
+    :return: Returns a dict of stage name -> output
+    :rtype: dict
+    """
+    PROCESSED_DIR.mkdir(exist_ok=True)
+
+    outputs = run_dag(
+        build_pipeline_stages(),
+        cache=StageCache() if use_cache else None
+    )
+    write_feature_outputs(outputs, PROCESSED_DIR)
+
+    version = None
+    if snapshot:
+        version = FeatureStore().commit(feature_tables(outputs))
+        print(f"Committed feature version {version}")
+
+    # Without a snapshot the processed files match no stored version, so a stale version id is cleared
+    atomic_write(PROCESSED_DIR / FEATURE_VERSION_FILE, lambda f: json.dump({"version": version}, f), mode="w")
+
+    return outputs
+
+def processed_feature_version(processed_dir: Path = PROCESSED_DIR) -> int | None:
+    """
+    :return: Returns the feature store version the processed files were committed as, or None if they were
+        built without a snapshot
+    :rtype: int | None
+    """
+    path = Path(processed_dir) / FEATURE_VERSION_FILE
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)["version"]
+
+def feature_frames(outputs: dict) -> dict:
+    """
+    :param outputs: The dict produced from run_dag() over build_pipeline_stages()
+    :return: Returns a dict of processed filename -> DataFrame
+    :rtype: dict
+    """
+    return {
+        "training_sets_normalized.csv": outputs["sets"],
+        "training_lift_day_aggregates.csv": outputs["fatigue_phases"],
+        "training_global_daily_fatigue.csv": outputs["daily"],
+        "fatigue_phase_summary.csv": outputs["phase_summary"],
+        "training_muscle_group_daily_fatigue.csv": outputs["muscle_group_daily"],
+        "training_movement_pattern_daily_fatigue.csv": outputs["movement_pattern_daily"],
+        "training_personal_records.csv": outputs["personal_records"].records,
+    }
+
+def feature_tables(outputs: dict) -> dict:
+    """
+    :return: Returns the processed frames keyed by their ProcessedStore / FeatureStore table name, e.g. "lift_day"
+    :rtype: dict
+    """
+    frames = feature_frames(outputs)
+    return {table: frames[filename] for table, (filename, _) in TABLES.items() if filename in frames}
+
+def write_feature_outputs(outputs: dict, out_dir: Path = PROCESSED_DIR) -> dict:
+    """
+    Writes the processed feature files for one pipeline run.
+
+    :param outputs: The dict produced from run_dag() over build_pipeline_stages()
+    :param out_dir: Output directory
+    :return: Returns a dict of filename -> checksum
+    :rtype: dict
+    """
+    checksums = {filename: write_output(df, filename, out_dir) for filename, df in feature_frames(outputs).items()}
+
+    checksums.update(write_rollup_cube(outputs["rollup_cube"], out_dir))
+    print(f"Saved rollup cube levels to {out_dir}")
+
+    checksums[COHORT_SKETCH_FILE] = outputs["cohort_sketches"].save(Path(out_dir) / COHORT_SKETCH_FILE)
+    print(f"Saved cohort quantile sketches to {Path(out_dir) / COHORT_SKETCH_FILE}")
+
+    return checksums
+
+def train_models(lift_day: pd.DataFrame, feature_version: int | None = None):
+    """
+    Trains the bench press Ridge model and records which features it was trained on next to its coefficients.
+
+    :param lift_day: Lift-day features, from the processed files or a feature store version
+    :param feature_version: Feature store version of lift_day, default=None (unversioned)
+    :return: Returns (model, feature columns)
+    :rtype: tuple
+    """
     bench_data = lift_day[
         lift_day["exercise"].str.contains("bench press", na=False)
     ].copy()
@@ -90,6 +242,24 @@ def main():
 
     print(ridge_model[0].coef_)
 
+    training_run = {
+        "feature_version": feature_version,
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "model": "ridge_regression",
+        "coefficients": "ridge_regression_coefficients.csv",
+        "alpha": RIDGE_ALPHA_V1,
+        "rows": len(bench_data),
+        "features": ridge_model[1],
+    }
+    atomic_write(PROCESSED_DIR / TRAINING_RUN_FILE, lambda f: json.dump(training_run, f, indent=2), mode="w")
+    print(f"Trained on feature version {feature_version if feature_version is not None else '(unversioned)'}")
+
+    return ridge_model
+
+def main(use_cache: bool = True):
+    outputs = build_features(use_cache=use_cache)
+    train_models(outputs["fatigue_phases"], feature_version=processed_feature_version())
+
 
 
 if __name__ == "__main__":
@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+
+@dataclass
+class PairMoments:
+    """
+    Pairwise-complete second moments of p columns, the state pandas' DataFrame.corr() needs.
+
+    Entry [i, j] describes the rows where both column i and column j are present:
+        n[i, j]    row count
+        mean[i, j] mean of column i over those rows
+        m2[i, j]   sum of squared deviations of column i over those rows
+        c[i, j]    sum of cross deviations of columns i and j (symmetric)
+    """
+    n: np.ndarray = field(default_factory=lambda: np.zeros((0, 0)))
+    mean: np.ndarray = field(default_factory=lambda: np.zeros((0, 0)))
+    m2: np.ndarray = field(default_factory=lambda: np.zeros((0, 0)))
+    c: np.ndarray = field(default_factory=lambda: np.zeros((0, 0)))
+
+    @classmethod
+    def empty(cls, p: int) -> "PairMoments":
+        return cls(np.zeros((p, p)), np.zeros((p, p)), np.zeros((p, p)), np.zeros((p, p)))
+
+    @classmethod
+    def from_array(cls, X: np.ndarray) -> "PairMoments":
+        """
+        Moments of one batch from a handful of (p x n) @ (n x p) products, with NaN marking missing values.
+        """
+        valid = ~np.isnan(X)
+        V = valid.astype(float)
+
+        # Shifting by the column means first keeps the sums small, so the subtractions below stay accurate
+        shift = np.zeros(X.shape[1])
+        present = valid.any(axis=0)
+        shift[present] = np.nanmean(X[:, present], axis=0)
+        Z = np.where(valid, X - shift, 0.0)
+
+        n = V.T @ V
+        safe_n = np.where(n > 0, n, 1.0)
+        s = Z.T @ V                 # s[i, j] = sum of column i over rows where i and j are present
+        mean_shifted = s / safe_n
+
+        m2 = (Z * Z).T @ V - s * mean_shifted
+        c = Z.T @ Z - s * s.T / safe_n
+        mean = np.where(n > 0, mean_shifted + shift[:, None], 0.0)
+        return cls(n, mean, np.maximum(m2, 0.0), c)
+
+    def merge(self, other: "PairMoments") -> "PairMoments":
+        """
+        Chan et al.'s parallel update: combines two disjoint sets of rows without revisiting either.
+        """
+        n = self.n + other.n
+        safe_n = np.where(n > 0, n, 1.0)
+        weight = self.n * other.n / safe_n
+        delta = other.mean - self.mean
+
+        return PairMoments(
+            n=n,
+            mean=self.mean + delta * other.n / safe_n,
+            m2=self.m2 + other.m2 + delta * delta * weight,
+            c=self.c + other.c + delta * delta.T * weight,
+        )
+
+class StreamingMoments:
+    """
+    Mergeable per-group and global covariance / correlation over a stream of row batches.
+
+    Memory is O(groups * p^2) regardless of how many rows are streamed: each batch is reduced to PairMoments
+    and folded in, and accumulators built on different partitions combine with merge(). Missing values are
+    handled pairwise, as in DataFrame.corr() / DataFrame.cov(), so results match pandas on the same rows.
+    """
+
+    def __init__(self, columns: list, group_cols: tuple = ("exercise",)):
+        self.columns = list(columns)
+        self.group_cols = list(group_cols)
+        self.groups: dict = {}
+        self.total = PairMoments.empty(len(self.columns))
+
+    def update(self, batch) -> "StreamingMoments":
+        """
+        Folds one batch of rows into the group and global moments.
+
+        :param batch: DataFrame or pyarrow.RecordBatch with the moment and group columns
+        :return: Returns self
+        :rtype: StreamingMoments
+        """
+        df = batch if isinstance(batch, pd.DataFrame) else batch.to_pandas()
+        X = df[self.columns].to_numpy(dtype=float)
+
+        self.total = self.total.merge(PairMoments.from_array(X))
+
+        if self.group_cols:
+            for key, idx in df.groupby(self.group_cols, sort=False).indices.items():
+                key = key if isinstance(key, tuple) else (key,)
+                moments = PairMoments.from_array(X[idx])
+                self.groups[key] = self.groups[key].merge(moments) if key in self.groups else moments
+
+        return self
+
+    def merge(self, other: "StreamingMoments") -> "StreamingMoments":
+        """
+        :return: Returns new moments covering the rows of both accumulators
+        :rtype: StreamingMoments
+        """
+        merged = StreamingMoments(self.columns, tuple(self.group_cols))
+        merged.total = self.total.merge(other.total)
+        merged.groups = dict(self.groups)
+        for key, moments in other.groups.items():
+            merged.groups[key] = merged.groups[key].merge(moments) if key in merged.groups else moments
+        return merged
+
+    def _moments(self, group) -> PairMoments:
+        if group is None:
+            return self.total
+        return self.groups[group if isinstance(group, tuple) else (group,)]
+
+    def count(self, group=None) -> pd.DataFrame:
+        """
+        :param group: Group key, default=None (all rows)
+        :return: Returns the pairwise complete row counts
+        :rtype: DataFrame
+        """
+        return pd.DataFrame(self._moments(group).n, index=self.columns, columns=self.columns)
+
+    def covariance(self, group=None, ddof: int = 1, min_periods: int = 1) -> pd.DataFrame:
+        """
+        :param group: Group key, default=None (all rows)
+        :param ddof: Delta degrees of freedom
+        :param min_periods: Pairs with fewer complete rows are NaN
+        :return: Returns the covariance matrix
+        :rtype: DataFrame
+        """
+        m = self._moments(group)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = np.where((m.n >= max(min_periods, ddof + 1)), m.c / (m.n - ddof), np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self, group=None, min_periods: int = 1) -> pd.DataFrame:
+        """
+        :param group: Group key, default=None (all rows)
+        :param min_periods: Pairs with fewer complete rows are NaN
+        :return: Returns the Pearson correlation matrix
+        :rtype: DataFrame
+        """
+        m = self._moments(group)
+
+        # A column that is constant over a pair's rows has no correlation (NaN, as in pandas), even when
+        # rounding leaves its m2 slightly above zero
+        constant = m.m2 <= m.n * (8 * np.finfo(float).eps * np.abs(m.mean)) ** 2
+        valid = (m.n >= max(min_periods, 2)) & ~constant & ~constant.T
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = np.where(valid, np.clip(m.c / np.sqrt(m.m2 * m.m2.T), -1.0, 1.0), np.nan)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def correlation_table(self, min_periods: int = 2) -> pd.DataFrame:
+        """
+        Long-format correlations of every column pair for every group.
+
+        :param min_periods: Pairs with fewer complete rows are NaN
+        :return: Returns one row per (group, pair) with the correlation and row count
+        :rtype: DataFrame
+        """
+        i, j = np.triu_indices(len(self.columns), k=1)
+        rows = []
+        for key in sorted(self.groups):
+            corr = self.correlation(key, min_periods).to_numpy()
+            n = self.groups[key].n
+            for a, b in zip(i, j):
+                rows.append((*key, self.columns[a], self.columns[b], corr[a, b], int(n[a, b])))
+
+        return pd.DataFrame(rows, columns=self.group_cols + ["feature_a", "feature_b", "correlation", "rows"])
+
+def stream_moments(batches, columns: list, group_cols: tuple = ("exercise",)) -> StreamingMoments:
+    """
+    Accumulates moments over an iterable of batches, e.g. ProcessedStore().scan("lift_day", ...).
+
+    :return: Returns the accumulated moments
+    :rtype: StreamingMoments
+    """
+    moments = StreamingMoments(columns, group_cols)
+    for batch in batches:
+        moments.update(batch)
+    return moments
+
+def partition_moments(processed_dirs: list, columns: list, group_cols: tuple = ("exercise",), table: str = "lift_day", n_jobs: int = -1) -> StreamingMoments:
+    """
+    Accumulates moments over many processed output directories (e.g. the per-partition directories written
+    by batch_runner.run_batch()) in parallel worker processes, then merges them.
+
+    :param processed_dirs: Directories holding processed outputs
+    :param columns: Moment columns
+    :param group_cols: Group columns
+    :param table: ProcessedStore table to stream
+    :param n_jobs: joblib workers
+    :return: Returns the merged moments
+    :rtype: StreamingMoments
+    """
+    from joblib import Parallel, delayed
+
+    parts = Parallel(n_jobs=n_jobs)(
+        delayed(_directory_moments)(d, columns, group_cols, table) for d in processed_dirs
+    )
+
+    merged = StreamingMoments(columns, group_cols)
+    for part in parts:
+        merged = merged.merge(part)
+    return merged
+
+def _directory_moments(processed_dir, columns: list, group_cols: tuple, table: str) -> StreamingMoments:
+    from processed_store import ProcessedStore
+
+    store = ProcessedStore(processed_dir)
+    return stream_moments(store.scan(table, columns=list(group_cols) + columns), columns, group_cols)
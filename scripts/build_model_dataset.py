@@ -1,18 +1,12 @@
-import pandas as pd
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[1] / "python"))
+from processed_store import ProcessedStore
+
 DATA_DIR = Path(__file__).resolve().parents[1] / "data" / "processed"
 
 def build_bench_regression_dataset():
-    df = pd.read_csv(
-        DATA_DIR / "training_lift_day_aggregates.csv",
-        parse_dates=["date"]
-    )
-
-    bench = df[
-        df["exercise"].str.contains("bench press", na=False)
-    ].copy()
-
     features = [
         "date",
         "ewma_stress",
@@ -23,7 +17,11 @@ def build_bench_regression_dataset():
         "max_weight"
     ]
 
-    bench = bench[features].dropna()
+    bench = ProcessedStore(DATA_DIR).read(
+        "lift_day",
+        columns=features,
+        filters=[("exercise", "contains", "bench press")]
+    ).dropna()
 
     out_path = DATA_DIR / "model_bench_regression.csv"
     bench.to_csv(out_path, index=False)
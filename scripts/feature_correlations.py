@@ -1,6 +1,9 @@
-import pandas as pd
+import sys
+from pathlib import Path
 
-df = pd.read_csv("data/processed/training_lift_day_aggregates.csv")
+sys.path.append(str(Path(__file__).resolve().parents[1] / "python"))
+from processed_store import ProcessedStore
+from streaming_moments import partition_moments, stream_moments
 
 features = [
     "ewma_stress",
@@ -9,5 +12,21 @@ features = [
     "max_weight"
 ]
 
-corr = df[features].corr()
+# Moments are accumulated batch by batch, so memory does not grow with the history. Pass several processed
+# directories (e.g. data/processed/<partition>/ from a batch run) to accumulate them in parallel and merge.
+processed_dirs = sys.argv[1:]
+
+if processed_dirs:
+    moments = partition_moments(processed_dirs, features)
+else:
+    moments = stream_moments(ProcessedStore().scan("lift_day", columns=["exercise"] + features), features)
+
+corr = moments.correlation()
 print(corr)
+
+min_rows = 30
+table = moments.correlation_table()
+table = table[table["rows"] >= min_rows]
+
+print(f"\nPer-exercise correlations (pairs with at least {min_rows} rows):")
+print(table.to_string(index=False))
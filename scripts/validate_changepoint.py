@@ -0,0 +1,63 @@
+"""
+Brute-force check of changepoint.pelt_linear(): PELT with pruning must reach the same objective (segment costs
+plus one penalty per segment) as exhaustive optimal partitioning over every split with segments of at least
+min_size points.
+"""
+import sys
+import numpy as np
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "python"))
+from changepoint import pelt_linear
+
+TOLERANCE = 1e-6
+
+def segment_cost(y: np.ndarray) -> float:
+    # Residual sum of squares of a least squares line, as in pelt_linear()
+    if len(y) < 2:
+        return 0.0
+    x = np.arange(len(y), dtype=float)
+    A = np.column_stack((x, np.ones(len(y))))
+    residuals = y - A @ np.linalg.lstsq(A, y, rcond=None)[0]
+    return float(residuals @ residuals)
+
+def objective(y: np.ndarray, ends: np.ndarray, penalty: float) -> float:
+    starts = np.concatenate(([0], ends[:-1]))
+    return sum(segment_cost(y[s:e]) for s, e in zip(starts, ends)) + penalty * len(ends)
+
+def optimal_objective(y: np.ndarray, penalty: float, min_size: int) -> float:
+    """
+    Exhaustive optimal partitioning: best[t] is the cheapest segmentation of y[:t], trying every last split.
+    """
+    n = len(y)
+    if n <= min_size:
+        return segment_cost(y) + penalty
+
+    best = np.full(n + 1, np.inf)
+    best[0] = 0.0
+    for t in range(min_size, n + 1):
+        for s in range(0, t - min_size + 1):
+            if np.isfinite(best[s]):
+                best[t] = min(best[t], best[s] + segment_cost(y[s:t]) + penalty)
+    return float(best[n])
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    worse = 0
+    series = 0
+
+    for min_size in (1, 2, 3, 5):
+        for _ in range(200):
+            y = np.cumsum(rng.normal(size=rng.integers(10, 41)))
+            penalty = float(10 ** rng.uniform(-2, 1))
+
+            found = objective(y, pelt_linear(y, penalty, min_size), penalty)
+            optimal = optimal_objective(y, penalty, min_size)
+            series += 1
+
+            if found > optimal + TOLERANCE * max(1.0, abs(optimal)):
+                worse += 1
+                print(f"min_size={min_size} n={len(y)} penalty={penalty:.3f}: PELT {found:.6f} > optimal {optimal:.6f}")
+
+    print(f"{series - worse} of {series} random walks segmented optimally")
+    sys.exit(1 if worse else 0)
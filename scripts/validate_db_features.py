@@ -0,0 +1,53 @@
+"""
+Parity check between the pandas feature pipeline and the in-database engine (sql/07_feature_engine.sql).
+
+Requires a local Postgres with sql/00-07 applied and the PG* variables from .env. Loads the normalized sets
+into analytics.training_sets, computes lift-day features on both sides and compares every column.
+"""
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "python"))
+from db import load_training_sets, read_lift_day_features
+from load_data import load_training_data
+from run_pipeline import build_fatigue_phases, build_lift_day, build_training_load
+
+TOLERANCE = 1e-9
+
+def compare_features(local: pd.DataFrame, remote: pd.DataFrame) -> list:
+    """
+    Compares two lift-day feature frames column by column.
+
+    :return: Returns the names of columns that differ (floats compared with a relative tolerance)
+    :rtype: list
+    """
+    mismatched = []
+    for col in local.columns:
+        a, b = local[col], remote[col]
+        if a.dtype.kind in "fi":
+            same = np.allclose(a.astype(float), b.astype(float), rtol=TOLERANCE, atol=TOLERANCE, equal_nan=True)
+        else:
+            same = (a.astype(str).to_numpy() == b.astype(str).to_numpy()).all()
+        if not same:
+            mismatched.append(col)
+
+    return mismatched
+
+if __name__ == "__main__":
+    sets = load_training_data()
+    print("Loaded sets:", load_training_sets())
+
+    for exit_tol in (None, 2.0):
+        local = build_fatigue_phases(build_training_load(build_lift_day(sets)), exit_tol=exit_tol)
+        local = local.sort_values(["exercise", "date"]).reset_index(drop=True)
+        remote = read_lift_day_features(exit_tol=exit_tol)
+
+        if len(local) != len(remote):
+            sys.exit(f"Row count mismatch (exit_tol={exit_tol}): pandas={len(local)} postgres={len(remote)}")
+
+        mismatched = compare_features(local, remote[local.columns])
+        print(f"exit_tol={exit_tol}: {len(local)} rows,", "OK" if not mismatched else f"mismatched {mismatched}")
+        if mismatched:
+            sys.exit(1)
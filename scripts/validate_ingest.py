@@ -0,0 +1,34 @@
+import shutil
+import sys
+import tempfile
+import pandas as pd
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "python"))
+from ingest import ingest_directory
+from load_data import DATA_DIR, load_training_data
+
+# Ingesting an export uploaded twice must yield exactly the sets load_training_data() reads from it once:
+# repeats across exports are dropped, while duplicate-looking rows within one export are distinct sets and kept.
+FILENAME = sys.argv[1] if len(sys.argv) > 1 else "strong_workouts.csv"
+SORT_COLUMNS = ["datetime", "exercise", "set", "weight", "reps"]
+
+def canonical(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    return df[columns].sort_values(SORT_COLUMNS, na_position="first", kind="mergesort").reset_index(drop=True)
+
+expected = load_training_data(FILENAME)
+
+with tempfile.TemporaryDirectory() as tmp:
+    raw_dir = Path(tmp) / "raw"
+    raw_dir.mkdir()
+    for name in ("export_1.csv", "export_2.csv"):
+        shutil.copy(DATA_DIR / FILENAME, raw_dir / name)
+
+    ingested = ingest_directory(raw_dir, index_dir=Path(tmp) / "ingest")
+
+print(f"load_training_data: {len(expected)} sets")
+print(f"ingest_directory:   {len(ingested)} sets from two copies of the export")
+
+columns = list(expected.columns)
+pd.testing.assert_frame_equal(canonical(ingested, columns), canonical(expected, columns), check_dtype=False)
+print("Ingested sets match load_training_data()")
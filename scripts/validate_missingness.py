@@ -1,10 +1,30 @@
+import sys
 import pandas as pd
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "python"))
+from processed_store import ProcessedStore
 
 def report_missingness(df, name="DataFrame"):
     missing = df.isna().mean().sort_values(ascending=False)
     print(f"\nMissingness report for {name}:")
     print((missing * 100).round(2))
 
+def report_missingness_batches(batches, name="DataFrame"):
+    # Null counts are summed batch by batch, so the table is never held in memory at once
+    nulls, rows = None, 0
+    for batch in batches:
+        df = batch if isinstance(batch, pd.DataFrame) else batch.to_pandas()
+        nulls = df.isna().sum() if nulls is None else nulls + df.isna().sum()
+        rows += len(df)
+
+    if nulls is None or rows == 0:
+        print(f"\nMissingness report for {name}: no rows")
+        return
+
+    missing = (nulls / rows).sort_values(ascending=False)
+    print(f"\nMissingness report for {name}:")
+    print((missing * 100).round(2))
+
 if __name__ == "__main__":
-    df = pd.read_csv("data/processed/training_lift_day_aggregates.csv")
-    report_missingness(df, "Lift-Day Aggregates")
+    report_missingness_batches(ProcessedStore().scan("lift_day"), "Lift-Day Aggregates")
@@ -1,4 +1,8 @@
 import pandas as pd
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from python.phase_index import PhaseIntervalIndex
 
 # Load data
 
@@ -19,19 +23,22 @@ PATTERN = "bench press"
 ld = lift_day[lift_day["exercise"].str.contains(PATTERN, na=False)].copy()
 ps = phase_summary[phase_summary["exercise"].str.contains(PATTERN, na=False)].copy()
 
-# Count actual lift sessions per phase
+# Count actual lift sessions per phase by joining each lift-day to its phase
 
-computed_lift_days = []
+index = PhaseIntervalIndex(ps)
+joined = index.join(ld)
 
-for row in ps.itertuples():
-    count = (
-        (ld["date"] >= row.start_date) &
-        (ld["date"] <= row.end_date)
-    ).sum()
-
-    computed_lift_days.append(int(count))
+computed_lift_days = (
+    joined.dropna(subset=["phase_group"])
+    .groupby(["exercise", "phase_group"])
+    .size()
+)
 
-ps["computed_lift_days"] = computed_lift_days
+ps["computed_lift_days"] = (
+    computed_lift_days
+    .reindex(pd.MultiIndex.from_frame(ps[["exercise", "phase_group"]]), fill_value=0)
+    .to_numpy()
+)
 
 # Print comparison table
 
@@ -49,16 +56,6 @@ print(
 
 # Verify full coverage (no gaps, no overlaps)
 
-covered_idx = set()
-
-for row in ps.itertuples():
-    idx = ld[
-        (ld["date"] >= row.start_date) &
-        (ld["date"] <= row.end_date)
-    ].index
-
-    covered_idx.update(idx)
-
 print("\nCoverage check:")
 print("Lift-day rows:", len(ld))
-print("Covered rows:", len(covered_idx))
+print("Covered rows:", int(joined["phase_group"].notna().sum()))
@@ -5,6 +5,7 @@ CREATE TABLE analytics.training_lift_day (
     exercise TEXT,
     total_volume DOUBLE PRECISION,
     max_weight DOUBLE PRECISION,
+    max_e1rm DOUBLE PRECISION,
     total_sets INTEGER,
     total_reps DOUBLE PRECISION,
     mean_rpe DOUBLE PRECISION,
@@ -21,6 +22,7 @@ CREATE TABLE analytics.training_lift_day (
     ewma_slope_smooth DOUBLE PRECISION,
     fatigue_phase TEXT,
     phase_group INTEGER,
+    phase_method TEXT,
     sessions_in_phase INTEGER,
     ewma_slope_magnitude DOUBLE PRECISION
 );
\ No newline at end of file
@@ -3,3 +3,6 @@ ON analytics.training_lift_day (exercise);
 
 CREATE INDEX IF NOT EXISTS idx_training_lift_day_date
 ON analytics.training_lift_day (date);
+
+CREATE INDEX IF NOT EXISTS idx_training_lift_day_exercise_date
+ON analytics.training_lift_day (exercise, date);
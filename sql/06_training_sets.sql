@@ -0,0 +1,18 @@
+DROP TABLE IF EXISTS analytics.training_sets;
+
+CREATE TABLE analytics.training_sets (
+    date DATE,
+    datetime TIMESTAMP,
+    workout TEXT,
+    duration_min DOUBLE PRECISION,
+    exercise TEXT,
+    set_order DOUBLE PRECISION,
+    weight DOUBLE PRECISION,
+    reps DOUBLE PRECISION,
+    rpe DOUBLE PRECISION,
+    volume DOUBLE PRECISION,
+    e1rm DOUBLE PRECISION
+);
+
+CREATE INDEX IF NOT EXISTS idx_training_sets_exercise_date
+ON analytics.training_sets (exercise, date);
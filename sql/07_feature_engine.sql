@@ -0,0 +1,222 @@
+-- In-database version of the lift-day feature pipeline (feature_engineering.py, method="slope").
+-- Reads analytics.training_sets and produces the columns of training_lift_day_aggregates.csv.
+
+-- EWMA with adjust=False as a running aggregate: the first non-null value seeds the state and null inputs
+-- carry it forward, as in pandas ewm(adjust=False) / grouped_ewma(). Used as a window aggregate with an
+-- UNBOUNDED PRECEDING frame, Postgres advances one transition state per partition, so it is O(n).
+CREATE OR REPLACE FUNCTION analytics.ewma_step(state DOUBLE PRECISION, x DOUBLE PRECISION, alpha DOUBLE PRECISION)
+RETURNS DOUBLE PRECISION
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT CASE
+        WHEN state IS NULL THEN x
+        WHEN x IS NULL THEN state
+        ELSE alpha * x + (1 - alpha) * state
+    END
+$$;
+
+CREATE OR REPLACE AGGREGATE analytics.ewma(DOUBLE PRECISION, DOUBLE PRECISION) (
+    SFUNC = analytics.ewma_step,
+    STYPE = DOUBLE PRECISION
+);
+
+CREATE OR REPLACE FUNCTION analytics.lift_day_features(
+    ewma_span INTEGER DEFAULT 7,
+    phase_ewma_span INTEGER DEFAULT 14,
+    slope_smooth_span INTEGER DEFAULT 7,
+    tol DOUBLE PRECISION DEFAULT 5,
+    exit_tol DOUBLE PRECISION DEFAULT NULL
+)
+RETURNS TABLE (
+    date DATE,
+    exercise TEXT,
+    total_volume DOUBLE PRECISION,
+    max_weight DOUBLE PRECISION,
+    max_e1rm DOUBLE PRECISION,
+    total_sets INTEGER,
+    total_reps DOUBLE PRECISION,
+    mean_rpe DOUBLE PRECISION,
+    rpe_coverage DOUBLE PRECISION,
+    stress_volume DOUBLE PRECISION,
+    stress_rpe DOUBLE PRECISION,
+    stress DOUBLE PRECISION,
+    rolling_stress_7d DOUBLE PRECISION,
+    rolling_stress_14d DOUBLE PRECISION,
+    ewma_stress DOUBLE PRECISION,
+    days_since_last_session DOUBLE PRECISION,
+    ewma_smooth DOUBLE PRECISION,
+    ewma_slope DOUBLE PRECISION,
+    ewma_slope_smooth DOUBLE PRECISION,
+    fatigue_phase TEXT,
+    phase_group INTEGER,
+    phase_method TEXT,
+    sessions_in_phase INTEGER,
+    ewma_slope_magnitude DOUBLE PRECISION,
+    phase_transition BOOLEAN,
+    stress_deviation DOUBLE PRECISION
+)
+LANGUAGE sql STABLE PARALLEL SAFE
+AS $$
+WITH lift_day AS (
+    -- aggregate_lift_day() and add_stress_metrics()
+    SELECT
+        s.date,
+        s.exercise,
+        SUM(s.volume) AS total_volume,
+        MAX(s.weight) AS max_weight,
+        MAX(s.e1rm) AS max_e1rm,
+        COUNT(s.set_order)::INTEGER AS total_sets,
+        SUM(s.reps) AS total_reps,
+        AVG(s.rpe) AS mean_rpe,
+        COUNT(s.rpe)::DOUBLE PRECISION / COUNT(*) AS rpe_coverage
+    FROM analytics.training_sets s
+    GROUP BY s.date, s.exercise
+),
+stressed AS (
+    SELECT
+        l.*,
+        l.total_volume AS stress_volume,
+        l.total_volume * l.mean_rpe AS stress_rpe,
+        CASE WHEN l.rpe_coverage > 0 THEN l.total_volume * l.mean_rpe ELSE l.total_volume END AS stress
+    FROM lift_day l
+),
+loaded AS (
+    -- add_rolling_load() and add_time_since_last_session(); pandas rolling windows count sessions, not days
+    SELECT
+        s.*,
+        SUM(s.stress) OVER (PARTITION BY s.exercise ORDER BY s.date ROWS BETWEEN 6 PRECEDING AND CURRENT ROW) AS rolling_stress_7d,
+        SUM(s.stress) OVER (PARTITION BY s.exercise ORDER BY s.date ROWS BETWEEN 13 PRECEDING AND CURRENT ROW) AS rolling_stress_14d,
+        analytics.ewma(s.stress, 2.0 / (ewma_span + 1)) OVER running AS ewma_stress,
+        (s.date - LAG(s.date) OVER (PARTITION BY s.exercise ORDER BY s.date))::DOUBLE PRECISION AS days_since_last_session
+    FROM stressed s
+    WINDOW running AS (PARTITION BY s.exercise ORDER BY s.date ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW)
+),
+smoothed AS (
+    SELECT
+        l.*,
+        analytics.ewma(l.ewma_stress, 2.0 / (phase_ewma_span + 1)) OVER running AS ewma_smooth
+    FROM loaded l
+    WINDOW running AS (PARTITION BY l.exercise ORDER BY l.date ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW)
+),
+sloped AS (
+    SELECT
+        s.*,
+        s.ewma_smooth - LAG(s.ewma_smooth) OVER (PARTITION BY s.exercise ORDER BY s.date) AS ewma_slope
+    FROM smoothed s
+),
+slope_smoothed AS (
+    SELECT
+        s.*,
+        analytics.ewma(s.ewma_slope, 2.0 / (slope_smooth_span + 1)) OVER running AS ewma_slope_smooth
+    FROM sloped s
+    WINDOW running AS (PARTITION BY s.exercise ORDER BY s.date ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW)
+),
+banded AS (
+    -- classify_phase_codes(): with hysteresis, a slope inside (exit_tol, tol] keeps the phase entered by the
+    -- last row outside that band. A running count of out-of-band rows numbers each band run with its anchor row.
+    SELECT
+        s.*,
+        COALESCE(s.ewma_slope_smooth > exit_tol AND s.ewma_slope_smooth <= tol, FALSE) AS acc_band,
+        COALESCE(s.ewma_slope_smooth < -exit_tol AND s.ewma_slope_smooth >= -tol, FALSE) AS rec_band
+    FROM slope_smoothed s
+),
+anchored AS (
+    SELECT
+        b.*,
+        COUNT(*) FILTER (WHERE NOT b.acc_band) OVER running AS acc_anchor,
+        COUNT(*) FILTER (WHERE NOT b.rec_band) OVER running AS rec_anchor
+    FROM banded b
+    WINDOW running AS (PARTITION BY b.exercise ORDER BY b.date ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW)
+),
+held AS (
+    SELECT
+        a.*,
+        a.acc_band AND a.acc_anchor > 0 AND BOOL_OR(COALESCE(a.ewma_slope_smooth > tol, FALSE))
+            OVER (PARTITION BY a.exercise, a.acc_anchor) AS acc_held,
+        a.rec_band AND a.rec_anchor > 0 AND BOOL_OR(COALESCE(a.ewma_slope_smooth < -tol, FALSE))
+            OVER (PARTITION BY a.exercise, a.rec_anchor) AS rec_held
+    FROM anchored a
+),
+phased AS (
+    SELECT
+        h.*,
+        CASE
+            WHEN h.ewma_slope_smooth > tol OR h.acc_held THEN 'accumulating'
+            WHEN h.ewma_slope_smooth < -tol OR h.rec_held THEN 'recovering'
+            ELSE 'stable'
+        END AS fatigue_phase
+    FROM held h
+),
+flagged AS (
+    -- phase_runs()
+    SELECT
+        p.*,
+        p.fatigue_phase IS DISTINCT FROM LAG(p.fatigue_phase) OVER (PARTITION BY p.exercise ORDER BY p.date) AS phase_transition
+    FROM phased p
+),
+grouped AS (
+    SELECT
+        f.*,
+        (COUNT(*) FILTER (WHERE f.phase_transition) OVER (PARTITION BY f.exercise ORDER BY f.date ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW))::INTEGER AS phase_group
+    FROM flagged f
+)
+SELECT
+    g.date,
+    g.exercise,
+    g.total_volume,
+    g.max_weight,
+    g.max_e1rm,
+    g.total_sets,
+    g.total_reps,
+    g.mean_rpe,
+    g.rpe_coverage,
+    g.stress_volume,
+    g.stress_rpe,
+    g.stress,
+    g.rolling_stress_7d,
+    g.rolling_stress_14d,
+    g.ewma_stress,
+    g.days_since_last_session,
+    g.ewma_smooth,
+    g.ewma_slope,
+    g.ewma_slope_smooth,
+    g.fatigue_phase,
+    g.phase_group,
+    'slope'::TEXT AS phase_method,
+    (ROW_NUMBER() OVER (PARTITION BY g.exercise, g.phase_group ORDER BY g.date))::INTEGER AS sessions_in_phase,
+    ABS(g.ewma_slope_smooth) AS ewma_slope_magnitude,
+    g.phase_transition,
+    g.stress - g.ewma_smooth AS stress_deviation
+FROM grouped g
+ORDER BY g.exercise, g.date
+$$;
+
+-- Rebuilds analytics.training_lift_day from analytics.training_sets without leaving the database
+CREATE OR REPLACE FUNCTION analytics.refresh_training_lift_day(
+    ewma_span INTEGER DEFAULT 7,
+    phase_ewma_span INTEGER DEFAULT 14,
+    slope_smooth_span INTEGER DEFAULT 7,
+    tol DOUBLE PRECISION DEFAULT 5,
+    exit_tol DOUBLE PRECISION DEFAULT NULL
+)
+RETURNS BIGINT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    n BIGINT;
+BEGIN
+    TRUNCATE analytics.training_lift_day;
+
+    INSERT INTO analytics.training_lift_day
+    SELECT
+        f.date, f.exercise, f.total_volume, f.max_weight, f.max_e1rm, f.total_sets, f.total_reps,
+        f.mean_rpe, f.rpe_coverage, f.stress_volume, f.stress_rpe, f.stress,
+        f.rolling_stress_7d, f.rolling_stress_14d, f.ewma_stress, f.days_since_last_session,
+        f.ewma_smooth, f.ewma_slope, f.ewma_slope_smooth, f.fatigue_phase, f.phase_group,
+        f.phase_method, f.sessions_in_phase, f.ewma_slope_magnitude
+    FROM analytics.lift_day_features(ewma_span, phase_ewma_span, slope_smooth_span, tol, exit_tol) f;
+
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END
+$$;